@@ -0,0 +1,100 @@
+"""
+Declarative column schemas for Basketball Reference tables.
+A schema is a list of Columns: the output key, the data-stat(s) it is read
+from (the first one the table has wins — BBRef renames columns between
+layouts), a dtype and the default for missing or unparseable cells.
+apply() maps a whole table at once: the records from read_table() become
+one DataFrame and each output column is one vectorized coercion over it, so
+the cost grows with the number of columns rather than cells x Python calls.
+The same schema validates the table: a column none of whose sources the
+table has is reported, and rows failing a column's `pattern` are dropped.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# dtype is "float", "int", "minutes" ("MM:SS" or a number), "str", "const"
+# (a value passed to apply(), else the default) or a function of the table
+# DataFrame returning a Series, for keys derived from several columns.
+Column = namedtuple("Column", "key sources dtype default pattern", defaults=(0.0, None))
+
+
+def numbers(series, default=0.0):
+    """Series as floats; None, blanks and anything unparseable become `default`."""
+    try:
+        # read_table() columns are already numbers or None: one C-level cast
+        values = pd.Series(np.asarray(series.to_numpy(), dtype=float), index=series.index)
+    except (TypeError, ValueError):
+        values = pd.to_numeric(series, errors="coerce").astype(float)
+    return values.fillna(default)
+
+
+def minutes(series, default=0.0):
+    """Minutes played from "29:06" (to 0.1 min) or a plain number."""
+    text = series.astype(object).where(series.notna(), "").astype(str)
+    clock = text.str.contains(":", regex=False)
+    parts = text.str.split(":", n=1, expand=True).reindex(columns=[0, 1])
+    clocked = numbers(parts[0], float("nan")) + numbers(parts[1], float("nan")) / 60
+    values = clocked.where(clock, numbers(series, default)).fillna(default).tolist()
+    # Round in Python, not NumPy: round() is exact on ties like 29.05, np.round is not.
+    return pd.Series([round(v, 1) if c else v for v, c in zip(values, clock.tolist())], index=series.index)
+
+
+def text(series, default=""):
+    return series.astype(object).where(series.notna(), default).astype(str)
+
+
+def pick(table, *stats):
+    """The first of `stats` the table has as a column, or an all-None Series."""
+    for stat in stats:
+        if stat in table.columns:
+            return table[stat]
+    return pd.Series([None] * len(table), index=table.index, dtype=object)
+
+
+COERCE = {
+    "float": numbers,
+    "int": lambda s, default: numbers(s, default).astype(int),
+    "minutes": minutes,
+    "str": text,
+}
+
+
+def missing_columns(table, schema):
+    """Keys of `schema` whose sources are all absent from `table`."""
+    return [c.key for c in schema
+            if c.sources and not callable(c.dtype) and not any(s in table.columns for s in c.sources)]
+
+
+def apply(rows, schema, consts=None, label="table"):
+    """Records of `rows` (read_table() output) mapped through `schema`, in schema key order.
+
+    consts fills "const" columns; a warning is printed for columns the table
+    lacks (they get their default), and rows failing a pattern are dropped.
+    """
+    if not rows:
+        return []
+    table = pd.DataFrame(rows, dtype=object)
+    missing = missing_columns(table, schema)
+    if missing:
+        print(f"    Warning: {label} has no column for {', '.join(missing)}")
+    consts = consts or {}
+    out = {}
+    for col in schema:
+        if callable(col.dtype):
+            out[col.key] = col.dtype(table)
+        elif col.dtype == "const":
+            out[col.key] = consts.get(col.key, col.default)
+        else:
+            out[col.key] = COERCE[col.dtype](pick(table, *col.sources), col.default)
+    keep = pd.Series(True, index=table.index)
+    for col in schema:
+        if col.pattern is not None:
+            keep &= text(pd.Series(out[col.key], index=table.index)).str.match(col.pattern)
+    n = int(keep.sum())
+    # Assemble records from whole columns; DataFrame.to_dict("records") boxes cell by cell.
+    columns = [values[keep].tolist() if isinstance(values, pd.Series) else [values] * n for values in out.values()]
+    keys = list(out)
+    return [dict(zip(keys, values)) for values in zip(*columns)]
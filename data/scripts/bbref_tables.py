@@ -0,0 +1,94 @@
+"""
+Table extraction for Basketball Reference pages.
+BBRef ships most stats tables inside HTML comments (they are uncommented by
+JavaScript in the browser). Rather than parsing the whole page and every
+comment, locate_tables() scans the raw HTML once for the wanted table ids —
+live or commented out — and only those fragments get parsed, by read_table(),
+straight from lxml into records keyed by each cell's data-stat attribute.
+"""
+
+import re
+
+from lxml import html as lxml_html
+
+TABLE_OPEN = re.compile(r"<table\b[^>]*?\bid=[\"']([^\"']+)[\"']", re.IGNORECASE)
+
+
+def locate_tables(html, table_ids=None):
+    """{table_id: "<table ...>...</table>"} for each wanted id found in `html`.
+
+    Tables inside comments are found the same way as live ones. BBRef does not
+    nest tables, so each fragment ends at the next closing tag. The first
+    occurrence of an id wins.
+    """
+    wanted = set(table_ids) if table_ids is not None else None
+    fragments = {}
+    for m in TABLE_OPEN.finditer(html):
+        table_id = m.group(1)
+        if table_id in fragments or (wanted is not None and table_id not in wanted):
+            continue
+        end = html.find("</table>", m.end())
+        if end == -1:
+            continue
+        fragments[table_id] = html[m.start():end + len("</table>")]
+        if wanted is not None and len(fragments) == len(wanted):
+            break
+    return fragments
+
+
+INT = re.compile(r"^[+-]?\d+$")
+FLOAT = re.compile(r"^[+-]?(\d+\.\d*|\.\d+)$")
+KIND_RANK = {int: 0, float: 1, str: 2}
+
+
+def _kind(value):
+    if INT.match(value):
+        return int
+    if FLOAT.match(value):
+        return float
+    return str
+
+
+def read_table(fragment):
+    """Parse one table fragment into a list of dicts keyed by data-stat.
+
+    data-stat names (e.g. "pts_per_g", "game_location") stay put when BBRef
+    relabels its visible headers. Header rows — the <thead> and the "thead"
+    rows repeated inside the body — are skipped. Each column is typed as a
+    whole, to the narrowest of int/float/str that fits every non-empty cell;
+    empty cells are None, and every record carries every column.
+    """
+    table = lxml_html.fragment_fromstring(fragment)
+    rows = []
+    kinds = {}
+    for tr in table.iter("tr"):
+        if tr.getparent().tag == "thead" or "thead" in (tr.get("class") or "").split():
+            continue
+        row = {}
+        for cell in tr:
+            stat = cell.get("data-stat") if cell.tag in ("td", "th") else None
+            if not stat:
+                continue
+            value = cell.text_content().strip()
+            if value:
+                row[stat] = value
+                kind = _kind(value)
+                if KIND_RANK[kind] > KIND_RANK[kinds.setdefault(stat, kind)]:
+                    kinds[stat] = kind
+            else:
+                kinds.setdefault(stat, int)
+        if row:
+            rows.append(row)
+    return [
+        {stat: None if stat not in row else kind(row[stat]) for stat, kind in kinds.items()}
+        for row in rows
+    ]
+
+
+def first(row, *stats, default=None):
+    """Value of the first of `stats` that the table has as a column.
+    BBRef's older layouts use different data-stat names (date_game vs date)."""
+    for stat in stats:
+        if stat in row:
+            return row[stat]
+    return default
@@ -0,0 +1,199 @@
+"""
+End-to-end benchmark of the fetch scripts against recorded fixtures.
+Starts standin.py in-process, points fetch_stats.py / fetch_bbref.py at it with
+the cache off and every politeness delay and retry wait set to zero, and times
+full main() runs. What is left is the pipeline's own cost: request plumbing,
+parsing, aggregation and writing (split out from each run's report, see
+runreport.py). Each run writes its output, report, step state and store to
+temp dirs. The only file outside them it touches is the history file
+(data/.cache/bench_history.jsonl, --history): each run appends a line with
+the git commit, so the numbers can be compared across commits.
+
+With --golden DIR, the last run's output files are also compared with the
+"data" of a saved set (--save-golden writes that set), so a parser rewrite
+can be checked for identical output against the same recorded pages.
+
+Usage:
+    python data/scripts/bench_pipeline.py data/fixtures/2026-10
+    python data/scripts/bench_pipeline.py data/fixtures/2026-10 --scripts bbref --repeat 5 --latency 0.05
+    python data/scripts/bench_pipeline.py data/fixtures/2026-10 --golden data/fixtures/2026-10/golden
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import standin
+from columnar import read_json
+from output import MANIFEST
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY = os.path.join(os.path.dirname(SCRIPTS_DIR), ".cache", "bench_history.jsonl")
+SCRIPTS = ("stats", "bbref")
+
+
+def scratch_args(url, work_dir):
+    """Flags that keep a run's report, step state and store in `work_dir`, away from data/.cache."""
+    return ["--no-cache", "--standin", url, "--report", os.path.join(work_dir, "report.json"),
+            "--state", os.path.join(work_dir, "steps.json"), "--store", os.path.join(work_dir, "store.sqlite")]
+
+
+def run_stats(url, output_dir, work_dir):
+    import fetch_stats
+    fetch_stats.OUTPUT_DIR = output_dir
+    fetch_stats.REQUEST_RATE = 1e6
+    fetch_stats.RETRY_WAIT = 0
+    sys.argv = ["fetch_stats.py", *scratch_args(url, work_dir)]
+    fetch_stats.main()
+
+
+def run_bbref(url, output_dir, work_dir):
+    import fetch_bbref
+    fetch_bbref.OUTPUT_DIR = output_dir
+    fetch_bbref.REQUEST_INTERVAL = 0
+    fetch_bbref.RETRY_WAIT = 0
+    sys.argv = ["fetch_bbref.py", *scratch_args(url, work_dir)]
+    fetch_bbref.main()
+
+
+RUNNERS = {"stats": run_stats, "bbref": run_bbref}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def check_golden(output_dir, golden_dir, save=False):
+    """Differences between the "data" of each output file and its copy in golden_dir
+    (with save, replace the copies instead and return no differences)."""
+    outputs = {f for f in os.listdir(output_dir) if f.endswith(".json") and f != MANIFEST}
+    if save:
+        os.makedirs(golden_dir, exist_ok=True)
+        for f in outputs:
+            with open(os.path.join(golden_dir, f), "w") as out:
+                json.dump(read_json(os.path.join(output_dir, f))["data"], out, indent=1, sort_keys=True)
+        return []
+    golden = {f for f in os.listdir(golden_dir) if f.endswith(".json")} if os.path.isdir(golden_dir) else set()
+    diffs = [f"{f}: not in the golden set" for f in sorted(outputs - golden)]
+    diffs += [f"{f}: not written" for f in sorted(golden - outputs)]
+    for f in sorted(outputs & golden):
+        with open(os.path.join(golden_dir, f)) as g:
+            expected = json.load(g)
+        if json.dumps(read_json(os.path.join(output_dir, f))["data"], sort_keys=True) != json.dumps(expected, sort_keys=True):
+            diffs.append(f"{f}: data differs")
+    return diffs
+
+
+def time_script(name, server, repeat, verbose, golden=None, save_golden=False):
+    """Wall times of `repeat` full runs, plus the bytes written and run report totals of the last one,
+    and its differences from the golden set in `golden`, if given."""
+    times = []
+    written = 0
+    totals = {}
+    diffs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as output_dir, tempfile.TemporaryDirectory() as work_dir:
+            report_path = os.path.join(work_dir, "report.json")
+            log = io.StringIO()
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(sys.stdout if verbose else log):
+                RUNNERS[name](server.url, output_dir, work_dir)
+            times.append(time.perf_counter() - started)
+            written = sum(os.path.getsize(os.path.join(output_dir, f)) for f in os.listdir(output_dir))
+            with open(report_path) as f:
+                totals = json.load(f)["totals"]
+            if golden is not None:
+                diffs = check_golden(output_dir, golden, save_golden)
+    return times, written, totals, diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", help="fixture directory written by --record")
+    parser.add_argument("--scripts", default=",".join(SCRIPTS), help="which pipelines to run: stats, bbref")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per script")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the stand-in adds to every response")
+    parser.add_argument("--history", default=HISTORY, help="JSON-lines file results are appended to")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show the scripts' own output")
+    parser.add_argument("--golden", metavar="DIR",
+                        help="compare each script's output data with DIR/<script>/ (fails on a difference)")
+    parser.add_argument("--save-golden", action="store_true", help="write the output data to --golden instead")
+    args = parser.parse_args()
+
+    names = [n for n in args.scripts.split(",") if n]
+    unknown = set(names) - set(SCRIPTS)
+    if unknown:
+        parser.error(f"unknown script: {', '.join(sorted(unknown))}")
+    if args.save_golden and not args.golden:
+        parser.error("--save-golden needs --golden DIR")
+
+    server = standin.start(args.fixtures, latency=args.latency)
+    results = {}
+    diffs = {}
+    try:
+        for name in names:
+            golden = os.path.join(args.golden, name) if args.golden else None
+            times, written, totals, diffs[name] = time_script(name, server, args.repeat, args.verbose,
+                                                              golden, args.save_golden)
+            results[name] = {
+                "best_s": round(min(times), 4),
+                "median_s": round(statistics.median(times), 4),
+                "runs": len(times),
+                "bytes_written": written,
+                "network_s": totals.get("network_s"),
+                "parse_s": totals.get("parse_s"),
+                "write_s": totals.get("write_s"),
+            }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"{'script':<8} {'best s':>8} {'median s':>9} {'runs':>5} {'written KB':>11} {'net s':>7} {'parse s':>8} {'write s':>8}")
+    for name, r in results.items():
+        print(f"{name:<8} {r['best_s']:>8.3f} {r['median_s']:>9.3f} {r['runs']:>5} {r['bytes_written'] / 1024:>11.1f}"
+              f" {r['network_s']:>7.3f} {r['parse_s']:>8.3f} {r['write_s']:>8.3f}")
+    print(f"Stand-in: {server.counts}")
+    if server.counts["missing"]:
+        print("  Warning: some requests were not in the fixtures; re-record them with --record")
+
+    entry = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "fixtures": os.path.abspath(args.fixtures),
+        "latency": args.latency,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+    print(f"Appended to {args.history}")
+
+    if args.save_golden:
+        print(f"Golden output saved to {args.golden}")
+    elif args.golden:
+        failed = {name: d for name, d in diffs.items() if d}
+        for name, d in failed.items():
+            for line in d:
+                print(f"  {name}: {line}")
+        print(f"Golden check: {'FAILED' if failed else 'ok'}")
+        if failed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark BBRef table extraction on saved pages.
+Compares the old path (full BeautifulSoup parse, re-parse every commented-out
+table, search the DOM, pandas.read_html) with locate_tables() + read_table(),
+reporting time and peak traced memory per page, and checks both find the same
+number of data rows.
+
+Usage:
+    python data/scripts/bench_tables.py                 # BBRef pages in the response cache
+    python data/scripts/bench_tables.py a.html b.html   # specific saved pages
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+import tracemalloc
+from io import StringIO
+
+import pandas as pd
+from bs4 import BeautifulSoup, Comment
+
+from bbref_tables import locate_tables, read_table
+from http_cache import CACHE_DIR
+
+DEFAULT_TABLES = ["per_game_stats", "per_game", "advanced", "player_game_log_reg", "pgl_basic", "shooting", "on-off"]
+
+
+def legacy_read_table(table_html):
+    df = pd.read_html(StringIO(table_html))[0]
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = ["_".join(str(c) for c in col).strip("_") for col in df.columns]
+    if "Rk" in df.columns:
+        df = df[df["Rk"] != "Rk"]
+    return df.to_dict("records")
+
+
+def legacy_tables(html, table_ids):
+    """The pre-locator path: parse the page, uncomment every table, then find each one."""
+    soup = BeautifulSoup(html, "lxml")
+    for comment in soup.find_all(string=lambda t: isinstance(t, Comment)):
+        if "<table" in str(comment):
+            comment.replace_with(BeautifulSoup(str(comment), "lxml"))
+    tables = {}
+    for table_id in table_ids:
+        table = soup.find("table", {"id": table_id})
+        if table:
+            tables[table_id] = legacy_read_table(str(table))
+    return tables
+
+
+def located_tables(html, table_ids):
+    return {tid: read_table(fragment) for tid, fragment in locate_tables(html, table_ids).items()}
+
+
+def measure(fn, html, table_ids, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(html, table_ids)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    fn(html, table_ids)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def cached_pages():
+    try:
+        with open(os.path.join(CACHE_DIR, "index.json")) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return [
+        os.path.join(CACHE_DIR, key[:2], key)
+        for key, entry in index.items()
+        if "basketball-reference.com" in str(entry.get("label"))
+    ]
+
+
+def data_rows(rows):
+    """Rows holding data: not blank, and not a repeated header (a cell equal to its column name)."""
+    return [
+        r for r in rows
+        if any(not pd.isna(v) for v in r.values()) and not any(str(v) == str(k).split("_")[-1] for k, v in r.items())
+    ]
+
+
+def same_rows(a, b):
+    """Data-row counts match per table. The old path keys rows by header text and the new
+    one by data-stat, so values are not compared directly."""
+    return a.keys() == b.keys() and all(len(data_rows(a[t])) == len(b[t]) for t in a)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", help="saved HTML pages (default: BBRef pages in the response cache)")
+    parser.add_argument("--tables", default=",".join(DEFAULT_TABLES), help="comma-separated table ids to extract")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per page (best is reported)")
+    args = parser.parse_args()
+
+    pages = [p for pattern in args.pages for p in glob.glob(pattern)] or cached_pages()
+    if not pages:
+        parser.error("no pages given and none found in the response cache")
+    table_ids = [t for t in args.tables.split(",") if t]
+
+    print(f"{'page':<32} {'tables':>6} {'old ms':>9} {'new ms':>9} {'speedup':>8} {'old MB':>8} {'new MB':>8}  same")
+    totals = [0.0, 0.0, 0, 0]
+    for path in pages:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        old, old_t, old_mem = measure(legacy_tables, html, table_ids, args.repeat)
+        new, new_t, new_mem = measure(located_tables, html, table_ids, args.repeat)
+        totals = [totals[0] + old_t, totals[1] + new_t, max(totals[2], old_mem), max(totals[3], new_mem)]
+        print(f"{os.path.basename(path)[:32]:<32} {len(new):>6} {old_t * 1000:>9.1f} {new_t * 1000:>9.1f} "
+              f"{old_t / new_t:>7.1f}x {old_mem / 2**20:>8.1f} {new_mem / 2**20:>8.1f}  {'yes' if same_rows(old, new) else 'differs'}")
+    print(f"{'total':<32} {'':>6} {totals[0] * 1000:>9.1f} {totals[1] * 1000:>9.1f} "
+          f"{totals[0] / totals[1]:>7.1f}x {totals[2] / 2**20:>8.1f} {totals[3] / 2**20:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
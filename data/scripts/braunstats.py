@@ -0,0 +1,75 @@
+"""
+BraunStats command line — one entry point for both fetchers.
+Only the module of the chosen source is imported (nba_api and pandas for
+nba; pandas and lxml for bbref), and nothing heavy is imported to parse the
+command line or print help. Flags not listed below are passed through to
+the fetcher, e.g. --offline, --incremental or --shard.
+
+Usage:
+    python data/scripts/braunstats.py fetch --source nba --steps game_logs,shot_chart --seasons 2025-26
+    python data/scripts/braunstats.py fetch --source bbref --plan
+    python data/scripts/braunstats.py steps --source nba
+"""
+
+import argparse
+import importlib
+
+SOURCES = {"nba": "fetch_stats", "bbref": "fetch_bbref"}
+
+
+def load(source):
+    """The fetch module of `source`, imported on first use."""
+    return importlib.import_module(SOURCES[source])
+
+
+def fetch(args, extra):
+    argv = list(extra)
+    if args.steps:
+        argv += ["--steps", args.steps]
+    if args.seasons:
+        argv += ["--seasons", args.seasons]
+    if args.plan:
+        argv.append("--plan")
+    load(args.source).main(argv)
+
+
+def list_steps(args, extra):
+    from steps import step_key
+
+    module = load(args.source)
+    for step in module.plan_steps(module.build_parser().parse_args(extra)):
+        reads = f"  (reads {', '.join(step.inputs)})" if step.inputs else ""
+        print(f"{step_key(step):<18}{', '.join(step.outputs)}{reads}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("fetch", help="fetch data and write the JSON files",
+                              description="Run a fetcher. Unlisted flags are passed on to it "
+                                          "(see fetch_stats.py --help / fetch_bbref.py --help).")
+    run.add_argument("--source", choices=list(SOURCES), default="nba",
+                     help="site to fetch from (default: nba)")
+    run.add_argument("--steps", metavar="STEP,...",
+                     help="only run these steps, e.g. game_logs,shot_chart (see the steps command)")
+    run.add_argument("--seasons", metavar="SEASON,...",
+                     help="only fetch these seasons, e.g. 2025-26; other seasons on disk are kept")
+    run.add_argument("--plan", action="store_true",
+                     help="dry run: print the requests, the cache entries they would hit and the "
+                          "rate-limited wall time, then exit")
+    run.set_defaults(handler=fetch)
+
+    show = commands.add_parser("steps", help="list the steps of a source")
+    show.add_argument("--source", choices=list(SOURCES), default="nba")
+    show.set_defaults(handler=list_steps)
+    return parser
+
+
+def main(argv=None):
+    args, extra = build_parser().parse_known_args(argv)
+    args.handler(args, extra)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Columnar encoding for the large per-row outputs (game_log.json, shot_chart.json).
+Each list of row dicts under `data` becomes a struct of arrays: one entry per
+column, stored in whichever of these encodings is smallest for it.
+
+    const   every row has the same value
+    dict    low-cardinality values (zones, action types, matchups) + int codes
+    date    dates as day offsets from the previous row, in the column's string format
+    delta   ints, or fixed-width digit strings (game ids), as differences from the previous row
+    plain   the values as they are
+
+decode_data() turns an encoded `data` back into exactly the rows it came from,
+and read_json() loads either format, so readers need not care which was written.
+"""
+
+import json
+from datetime import date, datetime
+
+FORMAT = "columnar"
+SCHEMA_VERSION = 1
+COLUMNAR_FILES = {"game_log.json", "shot_chart.json"}
+DATE_FORMATS = ("%Y-%m-%d", "%Y%m%d")
+MAX_DICT_SHARE = 0.5  # dictionary-encode when distinct values <= this share of rows
+
+
+def _is_int(v):
+    return isinstance(v, int) and not isinstance(v, bool)
+
+
+def _deltas(nums):
+    return [nums[0]] + [b - a for a, b in zip(nums, nums[1:])]
+
+
+def _undelta(deltas):
+    out, total = [], 0
+    for d in deltas:
+        total += d
+        out.append(total)
+    return out
+
+
+def _date_format(values):
+    """The single DATE_FORMATS entry that parses and re-formats every value exactly, if any."""
+    if not all(isinstance(v, str) for v in values):
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            if all(datetime.strptime(v, fmt).strftime(fmt) == v for v in values):
+                return fmt
+        except ValueError:
+            continue
+    return None
+
+
+def _candidates(values):
+    n = len(values)
+    distinct = {json.dumps(v) for v in values}
+    if len(distinct) == 1:
+        yield {"enc": "const", "value": values[0]}
+        return
+    yield {"enc": "plain", "values": values}
+    if len(distinct) <= max(1, n * MAX_DICT_SHARE):
+        lookup, codes = {}, []
+        for v in values:
+            codes.append(lookup.setdefault(json.dumps(v), len(lookup)))
+        yield {"enc": "dict", "values": [json.loads(k) for k in lookup], "codes": codes}
+    fmt = _date_format(values)
+    if fmt:
+        days = [datetime.strptime(v, fmt).toordinal() for v in values]
+        yield {"enc": "date", "format": fmt, "values": _deltas(days)}
+    if all(_is_int(v) for v in values):
+        yield {"enc": "delta", "values": _deltas(values)}
+    elif all(isinstance(v, str) and v.isdigit() for v in values) and len({len(v) for v in values}) == 1:
+        yield {"enc": "delta", "width": len(values[0]), "values": _deltas([int(v) for v in values])}
+
+
+def encode_column(values):
+    """Smallest encoding of one column's values."""
+    return min(_candidates(values), key=lambda c: len(json.dumps(c, separators=(",", ":"))))
+
+
+def decode_column(col, length):
+    enc = col["enc"]
+    if enc == "const":
+        return [col["value"]] * length
+    if enc == "plain":
+        return list(col["values"])
+    if enc == "dict":
+        return [col["values"][c] for c in col["codes"]]
+    if enc == "date":
+        fmt = col["format"]
+        return [date.fromordinal(d).strftime(fmt) for d in _undelta(col["values"])]
+    if enc == "delta":
+        nums = _undelta(col["values"])
+        width = col.get("width")
+        return [str(v).zfill(width) for v in nums] if width else nums
+    raise ValueError(f"unknown column encoding {enc!r}")
+
+
+def encode_rows(rows):
+    """{"length", "columns", ["absent"]} for a list of row dicts.
+    Column order follows first appearance; a key a row lacks is listed under
+    "absent" as {column: [row indexes]} so decoding restores the row exactly."""
+    names = list(dict.fromkeys(k for r in rows for k in r))
+    absent = {}
+    columns = {}
+    for name in names:
+        missing = [i for i, r in enumerate(rows) if name not in r]
+        if missing:
+            absent[name] = missing
+        columns[name] = encode_column([r.get(name) for r in rows])
+    block = {"length": len(rows), "columns": columns}
+    if absent:
+        block["absent"] = absent
+    return block
+
+
+def decode_rows(block):
+    length = block["length"]
+    names = list(block["columns"])
+    cols = [decode_column(block["columns"][n], length) for n in names]
+    absent = {n: set(idx) for n, idx in block.get("absent", {}).items()}
+    rows = []
+    for i in range(length):
+        rows.append({n: col[i] for n, col in zip(names, cols) if i not in absent.get(n, ())})
+    return rows
+
+
+def _is_rows(value):
+    return isinstance(value, list) and bool(value) and all(isinstance(r, dict) for r in value)
+
+
+def encode_data(data):
+    """Encode every list of rows in an output's `data`; other values are kept as they are."""
+    return {k: encode_rows(v) if _is_rows(v) else v for k, v in data.items()}
+
+
+def decode_data(data):
+    return {
+        k: decode_rows(v) if isinstance(v, dict) and "columns" in v and "length" in v else v
+        for k, v in data.items()
+    }
+
+
+def encode_doc(doc):
+    """An output document ({"meta", "data"}) in columnar format."""
+    meta = {**doc["meta"], "format": FORMAT, "schema_version": SCHEMA_VERSION}
+    return {"meta": meta, "data": encode_data(doc["data"])}
+
+
+def is_columnar(doc):
+    return doc.get("meta", {}).get("format") == FORMAT
+
+
+def decode_doc(doc):
+    """An output document in row format, whichever format it was written in."""
+    if not is_columnar(doc):
+        return doc
+    version = doc["meta"].get("schema_version")
+    if version != SCHEMA_VERSION:
+        raise ValueError(f"unsupported columnar schema version {version!r}")
+    meta = {k: v for k, v in doc["meta"].items() if k not in ("format", "schema_version")}
+    return {"meta": meta, "data": decode_data(doc["data"])}
+
+
+def read_json(path):
+    with open(path) as f:
+        return decode_doc(json.load(f))
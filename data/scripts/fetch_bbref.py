@@ -1,20 +1,32 @@
 """
 BraunStats — Basketball Reference Scraper (alternate data source)
 Scrapes Christian Braun stats from basketball-reference.com when nba_api is blocked.
-Rate limit: max 20 requests/minute (3-second delay between requests).
+Rate limit: one request every 3.5 seconds (REQUEST_INTERVAL), stretched while BBRef is slow or failing.
 """
 
-import json
+import argparse
+import math
+import queue
+import threading
 import time
 import os
 import re
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache, partial
 
 from io import StringIO
 
-import requests
-from bs4 import BeautifulSoup, Comment
-import pandas as pd
+from fixtures import STANDIN_ENV, FixtureRecorder
+from http_cache import CacheMiss, ResponseCache, season_ttl
+from http_session import PooledSession, response_validators
+from output import Handoff, OutputWriter, StoreWriter
+from resilience import Resilience, RetryPolicy
+from runreport import RunReport, default_path
+from steps import (
+    Step, print_plan, report_failures, run_steps, select_seasons, select_steps, state_path,
+)
+from store import STORE_FILE, Store
 
 PLAYER_SLUG = "braunch01"
 PLAYER_NAME = "Christian Braun"
@@ -23,6 +35,7 @@ TEAM_ID = 1610612743
 BASE_URL = "https://www.basketball-reference.com"
 SEASONS = [2023, 2024, 2025, 2026]  # BBRef uses end year (2023 = 2022-23 season)
 SEASON_LABELS = {2023: "2022-23", 2024: "2023-24", 2025: "2024-25", 2026: "2025-26"}
+PLAYER_URL = f"{BASE_URL}/players/b/{PLAYER_SLUG}.html"
 
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)))
 
@@ -31,71 +44,194 @@ HEADERS = {
 }
 
 
-def delay():
-    time.sleep(3.5)
+REQUEST_INTERVAL = 3.5  # seconds between network requests (stretched by resilience.py under load)
+MAX_RETRIES = 3
+RETRY_WAIT = 5  # backoff base in seconds, see resilience.RetryPolicy
+RETRY_CAP = 60
+PARSE_WORKERS = 4
 
+cache = ResponseCache()
+session = PooledSession(headers=HEADERS)
+writer = handoff = OutputWriter(OUTPUT_DIR)
+report = RunReport("fetch_bbref")
+recorder = None
+http = None
+store = None
 
-def write_json(filename, data, season=None):
-    output = {
-        "meta": {
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "season": season,
-            "source": "basketball-reference.com",
-        },
-        "data": data,
-    }
-    path = os.path.join(OUTPUT_DIR, filename)
-    with open(path, "w") as f:
-        json.dump(output, f, indent=2)
-    print(f"  -> Wrote {filename}")
 
+def resilience():
+    """Politeness pacing, retries and the circuit breaker for BBRef requests."""
+    rate = 1 / REQUEST_INTERVAL if REQUEST_INTERVAL > 0 else None
+    return Resilience(rate, RetryPolicy(MAX_RETRIES, RETRY_WAIT, RETRY_CAP), report=report, pace_kind="politeness")
 
-def get_soup(url):
-    print(f"  GET {url}")
-    resp = requests.get(url, headers=HEADERS, timeout=30)
-    resp.raise_for_status()
-    return BeautifulSoup(resp.text, "lxml")
 
+def write_json(filename, data, season=None, **meta):
+    report.output(writer.write(filename, data, {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "season": season,
+        "source": "basketball-reference.com",
+        **meta,
+    }))
 
-def uncomment_tables(soup):
-    """BBRef hides some tables in HTML comments. Uncomment them."""
-    for comment in soup.find_all(string=lambda t: isinstance(t, Comment)):
-        if "<table" in str(comment):
-            new_soup = BeautifulSoup(str(comment), "lxml")
-            comment.replace_with(new_soup)
-    return soup
 
+def url_season(url):
+    """BBRef end year in a season-scoped URL (/gamelog/2025/), or None for undated pages."""
+    m = re.search(r"/(\d{4})/?$", url)
+    return int(m.group(1)) if m else None
 
-def parse_table(soup, table_id):
-    """Extract a table by ID into a list of dicts."""
-    table = soup.find("table", {"id": table_id})
-    if not table:
-        print(f"    Table '{table_id}' not found")
-        return []
-    df = pd.read_html(StringIO(str(table)))[0]
-    # Flatten multi-level columns if present
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = ["_".join(str(c) for c in col).strip("_") for col in df.columns]
-    # Drop rows that are repeated headers (BBRef inserts header rows mid-table)
-    if "Rk" in df.columns:
-        df = df[df["Rk"] != "Rk"]
-    return df.to_dict("records")
+
+def get_html(url):
+    key = cache.key("bbref", url)
+    html = cache.get(key)
+    if html is not None:
+        report.request(url, 0.0, cached=True)
+    else:
+        if cache.offline:
+            raise CacheMiss(f"{url} not in cache")
+        ttl = season_ttl(url_season(url))
+        print(f"  GET {url}")
+        validators = cache.validators(key)
+        resp = http.request(url, lambda: session.get(url, **validators), label=url)
+        if resp.status_code == 304:
+            print("    304 Not Modified, using cached copy")
+            html = cache.revalidate(key, ttl)
+        else:
+            html = resp.text
+            cache.put(key, html, ttl=ttl, label=url, validators=response_validators(resp))
+    if recorder is not None:
+        recorder.record(url, html, content_type="text/html; charset=utf-8")
+    return html
+
+
+def use_standin(base_url):
+    """Fetch every page from a standin.py server instead of basketball-reference.com."""
+    global BASE_URL, PLAYER_URL
+    BASE_URL = base_url.rstrip("/")
+    PLAYER_URL = f"{BASE_URL}/players/b/{PLAYER_SLUG}.html"
+
+
+def gamelog_url(year):
+    return f"{BASE_URL}/players/b/{PLAYER_SLUG}/gamelog/{year}/"
+
+
+def shooting_url(year):
+    return f"{BASE_URL}/players/b/{PLAYER_SLUG}/shooting/{year}/"
+
+
+def on_off_url(year):
+    return f"{BASE_URL}/players/j/jokicni01/on-off/{year}/"
 
 
-def parse_mp(val):
-    """Parse minutes played from '29:06' format to float minutes."""
-    if val is None or (isinstance(val, float) and pd.isna(val)):
-        return 0.0
-    s = str(val).strip()
-    if ":" in s:
-        parts = s.split(":")
-        return round(float(parts[0]) + float(parts[1]) / 60, 1)
-    return safe_float(s)
+def timed_parse(parser, html, year):
+    """parser(html, year) and the seconds it took, measured in the worker process."""
+    started = time.perf_counter()
+    parsed = parser(html, year)
+    return parsed, time.perf_counter() - started
+
+
+def parse_pool(workers):
+    """Process pool for the page parsers. Their imports are lazy so --plan starts without
+    pandas; a full run loads them here, before the fetcher thread forks the workers, so the
+    workers inherit them rather than forking while another thread holds an import lock."""
+    import bbref_schema, bbref_tables, bs4  # noqa: F401
+
+    return ProcessPoolExecutor(workers)
+
+
+class InlineExecutor:
+    """Executor that runs each job on submit (--workers 0), for debugging parsers."""
+
+    def submit(self, fn, *args):
+        job = Future()
+        try:
+            job.set_result(fn(*args))
+        except Exception as e:
+            job.set_exception(e)
+        return job
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class PagePipeline:
+    """Fetch → parse → collect.
+
+    A fetcher thread walks the page plan in order, downloading each page
+    through get_html() (which enforces the politeness interval) and handing
+    the HTML to a process pool of parse_* functions. The steps collect the
+    parsed results by URL, so parsing and writing overlap the waits between
+    requests instead of adding to them. add() queues more pages behind the
+    plan, e.g. when refresh.py hedges another step.
+    """
+
+    def __init__(self, plan, executor):
+        self.executor = executor
+        self._planned = set()
+        self._queue = queue.Queue()
+        self._jobs = {}
+        self._stopped = False
+        self._ready = threading.Condition()
+        self.add(plan)
+        self._fetcher = threading.Thread(target=self._fetch, name="fetcher", daemon=True)
+        self._fetcher.start()
+
+    def add(self, plan):
+        """Queue the pages of `plan` that are not planned yet."""
+        with self._ready:
+            for page in plan:
+                if page[0] not in self._planned:
+                    self._planned.add(page[0])
+                    self._queue.put(page)
+
+    def _fetch(self):
+        try:
+            while (page := self._queue.get()) is not None:
+                url, parser, year = page
+                try:
+                    job = self.executor.submit(timed_parse, parser, get_html(url), year)
+                    job.add_done_callback(partial(self._parsed, url))
+                except Exception as e:
+                    job = Future()
+                    job.set_exception(e)
+                with self._ready:
+                    self._jobs[url] = job
+                    self._ready.notify_all()
+        finally:
+            with self._ready:
+                self._stopped = True
+                self._ready.notify_all()
+
+    def result(self, url):
+        """Parsed result of a planned page, waiting for it to be fetched and parsed.
+        Safe to call from several step threads at once. Raises KeyError for a page
+        that is not in the plan, and RuntimeError if the fetcher stopped before it."""
+        if url not in self._planned:
+            raise KeyError(f"{url} is not in the page plan")
+        with self._ready:
+            self._ready.wait_for(lambda: url in self._jobs or self._stopped)
+            job = self._jobs.get(url)
+        if job is None:
+            raise RuntimeError(f"The fetcher stopped before {url}")
+        return job.result()[0]
+
+    @staticmethod
+    def _parsed(url, job):
+        if job.exception() is None:
+            report.parse(url, job.result()[1])
+
+    def close(self):
+        """Fetch what is queued, then stop."""
+        self._queue.put(None)
+        self._fetcher.join()
+        self.executor.shutdown()
+
+
+pages = None
 
 
 def safe_float(val, default=0.0):
     try:
-        if val is None or val == "" or (isinstance(val, float) and pd.isna(val)):
+        if val is None or val == "" or (isinstance(val, float) and math.isnan(val)):
             return default
         s = str(val).strip()
         if s in ("", "nan"):
@@ -105,68 +241,90 @@ def safe_float(val, default=0.0):
         return default
 
 
-def safe_int(val, default=0):
-    try:
-        if val is None or val == "" or (isinstance(val, float) and pd.isna(val)):
-            return default
-        return int(float(val))
-    except (ValueError, TypeError):
-        return default
+# ─── Page parsers ───
+# Pure functions of a page's HTML (and season), run in worker processes.
+# Parsing needs pandas (via bbref_schema) and lxml (via bbref_tables); they are
+# imported where a page is parsed, so --plan and cache-only runs start without them.
 
+def page_table(html, *table_ids):
+    """Rows of the first of `table_ids` present on the page (BBRef renames tables now and then)."""
+    from bbref_tables import locate_tables, read_table
 
-# ─── Player Overview ───
+    located = locate_tables(html, table_ids)
+    for table_id in table_ids:
+        rows = read_table(located[table_id]) if located.get(table_id) else []
+        if rows:
+            return rows
+    return []
 
-def fetch_player_overview():
-    print("Fetching player overview from BBRef...")
-    soup = get_soup(f"{BASE_URL}/players/b/{PLAYER_SLUG}.html")
 
+def parse_player_page(html, year=None):
+    """Bio fields from the #meta block plus the per-game and advanced career tables."""
+    # only the player page needs BeautifulSoup; runs without it never import bs4
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "lxml")
     info_div = soup.find("div", {"id": "meta"})
-    info_text = info_div.get_text(" ", strip=True) if info_div else ""
 
     # Parse bio fields from individual <p> tags for better matching
-    height = ""
-    weight = ""
-    birthdate = ""
-    draft_round = "1"
-    draft_number = "21"
-    draft_year = "2022"
+    bio = {
+        "height": "",
+        "weight": "",
+        "birthdate": "",
+        "draft_round": "1",
+        "draft_number": "21",
+        "draft_year": "2022",
+    }
 
     for p in info_div.find_all("p") if info_div else []:
         pt = p.get_text(" ", strip=True)
         # Height/weight: "6-6 , 220lb (198cm, 99kg)"
         m = re.search(r"(\d+-\d+)\s*,\s*(\d+)lb", pt)
         if m:
-            height = m.group(1)
-            weight = m.group(2)
+            bio["height"] = m.group(1)
+            bio["weight"] = m.group(2)
         # Born: "April 17 , 2001 in Burlington..."
         m = re.search(r"Born:\s*(\w+\s+\d+)\s*,\s*(\d{4})", pt)
         if m:
-            birthdate = f"{m.group(1)}, {m.group(2)}"
+            bio["birthdate"] = f"{m.group(1)}, {m.group(2)}"
         # Draft
         m = re.search(r"(\d+)\w+\s+round\s+\((\d+)\w+\s+pick.*?(\d{4})", pt)
         if m:
-            draft_round = m.group(1)
-            draft_number = m.group(2)
-            draft_year = m.group(3)
+            bio["draft_round"] = m.group(1)
+            bio["draft_number"] = m.group(2)
+            bio["draft_year"] = m.group(3)
+
+    return {
+        "bio": bio,
+        "per_game": page_table(html, "per_game_stats", "per_game"),
+        "advanced": page_table(html, "advanced"),
+    }
+
+
+# ─── Player Overview ───
+
+def fetch_player_overview():
+    from bbref_tables import first
+
+    print("Fetching player overview from BBRef...")
+    page = pages.result(PLAYER_URL)
+    bio = page["bio"]
 
     # Get career stats from per_game table on player page
-    soup = uncomment_tables(soup)
-    rows = parse_table(soup, "per_game_stats")
-    if not rows:
-        rows = parse_table(soup, "per_game")
+    rows = page["per_game"]
     latest = None
     for r in rows:
-        season = str(r.get("Season", ""))
+        season = str(first(r, "year_id", "season", default=""))
         if "Career" not in season and "20" in season:
             latest = r
-    print(f"  Found {len(rows)} career rows, latest: {latest.get('Season', 'N/A') if latest else 'None'}")
+    print(f"  Found {len(rows)} career rows, latest: {first(latest, 'year_id', 'season', default='N/A') if latest else 'None'}")
 
     headline = {}
     if latest:
         headline = {
-            "PTS": safe_float(latest.get("PTS/G", latest.get("PTS", 0))),
-            "AST": safe_float(latest.get("AST/G", latest.get("AST", 0))),
-            "REB": safe_float(latest.get("TRB/G", latest.get("TRB", 0))),
+            "PTS": safe_float(latest.get("pts_per_g")),
+            "AST": safe_float(latest.get("ast_per_g")),
+            "REB": safe_float(latest.get("trb_per_g")),
             "PIE": 0,
             "ALL_STAR_APPEARANCES": 0,
         }
@@ -176,11 +334,11 @@ def fetch_player_overview():
         "FIRST_NAME": "Christian",
         "LAST_NAME": "Braun",
         "DISPLAY_FIRST_LAST": PLAYER_NAME,
-        "BIRTHDATE": birthdate,
+        "BIRTHDATE": bio["birthdate"],
         "SCHOOL": "Kansas",
         "COUNTRY": "USA",
-        "HEIGHT": height,
-        "WEIGHT": weight,
+        "HEIGHT": bio["height"],
+        "WEIGHT": bio["weight"],
         "JERSEY": "0",
         "POSITION": "Guard-Forward",
         "TEAM_ID": TEAM_ID,
@@ -189,83 +347,72 @@ def fetch_player_overview():
         "TEAM_CITY": "Denver",
         "FROM_YEAR": 2022,
         "TO_YEAR": 2025,
-        "DRAFT_YEAR": draft_year,
-        "DRAFT_ROUND": draft_round,
-        "DRAFT_NUMBER": draft_number,
+        "DRAFT_YEAR": bio["draft_year"],
+        "DRAFT_ROUND": bio["draft_round"],
+        "DRAFT_NUMBER": bio["draft_number"],
         "ROSTERSTATUS": "Active",
         "SEASON_EXP": 3,
     }
 
     write_json("player_overview.json", {"info": info, "headline": headline})
-    delay()
 
 
 # ─── Game Logs ───
 
+@lru_cache(maxsize=None)
+def game_log_schema():
+    """Column schema of a game log table."""
+    from bbref_schema import Column, pick, text
+
+    def matchup(table):
+        home = text(pick(table, "game_location")) != "@"
+        return "DEN " + home.map({True: "vs.", False: "@"}) + " " + text(pick(table, "opp_name_abbr", "opp_id"))
+
+    # Result column: "W (+12)" or "L (-5)" or "W, 110-95"
+    return [
+        Column("SEASON", (), "const", ""),
+        Column("SEASON_TYPE", (), "const", "Regular Season"),
+        Column("SEASON_ID", (), "const", ""),
+        Column("Player_ID", (), "const", PLAYER_ID),
+        Column("Game_ID", ("ranker",), "str", ""),
+        Column("GAME_DATE", ("date", "date_game"), "str", "", pattern=r"\d{4}-\d{2}-\d{2}"),
+        Column("MATCHUP", (), matchup),
+        Column("WL", (), lambda t: text(pick(t, "game_result")).str.startswith("W").map({True: "W", False: "L"})),
+        Column("GS", (), lambda t: pick(t, "is_starter", "gs").isin(["*", 1]).astype(int)),
+        Column("MIN", ("mp",), "minutes"),
+        *(Column(key, (stat,), "float") for key, stat in [
+            ("FGM", "fg"), ("FGA", "fga"), ("FG_PCT", "fg_pct"), ("FG3M", "fg3"), ("FG3A", "fg3a"),
+            ("FG3_PCT", "fg3_pct"), ("FTM", "ft"), ("FTA", "fta"), ("FT_PCT", "ft_pct"), ("OREB", "orb"),
+            ("DREB", "drb"), ("REB", "trb"), ("AST", "ast"), ("STL", "stl"), ("BLK", "blk"), ("TOV", "tov"),
+            ("PF", "pf"), ("PTS", "pts"), ("PLUS_MINUS", "plus_minus"),
+        ]),
+        Column("VIDEO_AVAILABLE", (), "const", 0),
+    ]
+
+
+def parse_game_log_page(html, year):
+    """Regular-season game rows of one season's game log page."""
+    from bbref_schema import apply
+
+    rows = page_table(html, "player_game_log_reg", "pgl_basic")
+    consts = {"SEASON": SEASON_LABELS[year], "SEASON_ID": f"2{year - 1}"}
+    return apply(rows, game_log_schema(), consts, label=f"{SEASON_LABELS[year]} game log")
+
+
 def fetch_game_logs():
     print("Fetching game logs...")
     all_games = []
 
     for year in SEASONS:
         season_label = SEASON_LABELS[year]
-        url = f"{BASE_URL}/players/b/{PLAYER_SLUG}/gamelog/{year}/"
         print(f"  Season {season_label}...")
         try:
-            soup = get_soup(url)
-            soup = uncomment_tables(soup)
-            rows = parse_table(soup, "player_game_log_reg")
-            if not rows:
-                rows = parse_table(soup, "pgl_basic")
-
-            for r in rows:
-                date_str = str(r.get("Date", ""))
-                if not re.match(r"\d{4}-\d{2}-\d{2}", date_str):
-                    continue
-
-                matchup_raw = str(r.get("Opp", ""))
-                home_away = str(r.get("Unnamed: 5", ""))
-                is_home = home_away != "@"
-                matchup = f"DEN {'vs.' if is_home else '@'} {matchup_raw}"
-
-                # Parse W/L from Result column: "W (+12)" or "L (-5)" or "W, 110-95"
-                result_str = str(r.get("Result", ""))
-                wl = "W" if result_str.startswith("W") else "L"
-
-                game = {
-                    "SEASON": season_label,
-                    "SEASON_TYPE": "Regular Season",
-                    "SEASON_ID": f"2{year - 1}",
-                    "Player_ID": PLAYER_ID,
-                    "Game_ID": str(r.get("Rk", "")),
-                    "GAME_DATE": date_str,
-                    "MATCHUP": matchup,
-                    "WL": wl,
-                    "MIN": parse_mp(r.get("MP", 0)),
-                    "FGM": safe_float(r.get("FG", 0)),
-                    "FGA": safe_float(r.get("FGA", 0)),
-                    "FG_PCT": safe_float(r.get("FG%", 0)),
-                    "FG3M": safe_float(r.get("3P", 0)),
-                    "FG3A": safe_float(r.get("3PA", 0)),
-                    "FG3_PCT": safe_float(r.get("3P%", 0)),
-                    "FTM": safe_float(r.get("FT", 0)),
-                    "FTA": safe_float(r.get("FTA", 0)),
-                    "FT_PCT": safe_float(r.get("FT%", 0)),
-                    "OREB": safe_float(r.get("ORB", 0)),
-                    "DREB": safe_float(r.get("DRB", 0)),
-                    "REB": safe_float(r.get("TRB", 0)),
-                    "AST": safe_float(r.get("AST", 0)),
-                    "STL": safe_float(r.get("STL", 0)),
-                    "BLK": safe_float(r.get("BLK", 0)),
-                    "TOV": safe_float(r.get("TOV", 0)),
-                    "PF": safe_float(r.get("PF", 0)),
-                    "PTS": safe_float(r.get("PTS", 0)),
-                    "PLUS_MINUS": safe_float(r.get("+/-", 0)),
-                    "VIDEO_AVAILABLE": 0,
-                }
-                all_games.append(game)
+            games = pages.result(gamelog_url(year))
+            if not games:
+                print("    No game log table found")
+            all_games += games
         except Exception as e:
             print(f"    Warning: {e}")
-        delay()
 
     print(f"  Total: {len(all_games)} games")
     write_json("game_log.json", {"games": all_games})
@@ -273,266 +420,196 @@ def fetch_game_logs():
 
 # ─── Career Year-over-Year ───
 
+@lru_cache(maxsize=None)
+def career_schemas():
+    """(per-game schema, advanced schema) of the player page's career tables."""
+    from bbref_schema import Column, numbers, pick
+
+    # Season rows only: not the "Career" total or per-team lines without a year.
+    season = Column("GROUP_VALUE", ("year_id", "season"), "str", "", pattern=r"^(?!.*Career).*20")
+    base = [
+        season,
+        Column("GP", ("games", "g"), "int", 0),
+        Column("GS", ("games_started", "gs"), "int", 0),
+        *(Column(key, (stat,), "float") for key, stat in [
+            ("MIN", "mp_per_g"), ("FGM", "fg_per_g"), ("FGA", "fga_per_g"), ("FG_PCT", "fg_pct"),
+            ("FG3M", "fg3_per_g"), ("FG3A", "fg3a_per_g"), ("FG3_PCT", "fg3_pct"), ("FTM", "ft_per_g"),
+            ("FTA", "fta_per_g"), ("FT_PCT", "ft_pct"), ("OREB", "orb_per_g"), ("DREB", "drb_per_g"),
+            ("REB", "trb_per_g"), ("AST", "ast_per_g"), ("STL", "stl_per_g"), ("BLK", "blk_per_g"),
+            ("TOV", "tov_per_g"), ("PF", "pf_per_g"), ("PTS", "pts_per_g"),
+        ]),
+        Column("PLUS_MINUS", (), "const", 0),
+    ]
+    advanced = [
+        season,
+        Column("GP", ("games", "g"), "int", 0),
+        Column("MIN", ("mp",), "float"),
+        Column("OFF_RATING", ("off_rtg",), "float"),
+        Column("DEF_RATING", ("def_rtg",), "float"),
+        Column("NET_RATING", (), lambda t: numbers(pick(t, "off_rtg")) - numbers(pick(t, "def_rtg"))),
+        Column("TS_PCT", ("ts_pct",), "float"),
+        Column("EFG_PCT", ("efg_pct",), "float"),
+        Column("USG_PCT", ("usg_pct",), "float"),
+        Column("PACE", (), "const", 0),
+        Column("PIE", ("ws_per_48",), "float"),
+        Column("AST_PCT", ("ast_pct",), "float"),
+        Column("REB_PCT", ("trb_pct",), "float"),
+        Column("OREB_PCT", ("orb_pct",), "float"),
+        Column("DREB_PCT", ("drb_pct",), "float"),
+    ]
+    return base, advanced
+
+
 def fetch_career():
-    print("Fetching career stats...")
-    soup = get_soup(f"{BASE_URL}/players/b/{PLAYER_SLUG}.html")
-    soup = uncomment_tables(soup)
-
-    per_game = parse_table(soup, "per_game_stats")
-    if not per_game:
-        per_game = parse_table(soup, "per_game")
-    advanced = parse_table(soup, "advanced")
-
-    base_seasons = []
-    for r in per_game:
-        season = str(r.get("Season", ""))
-        if "Career" in season or "20" not in season:
-            continue
-        base_seasons.append({
-            "GROUP_VALUE": season,
-            "GP": safe_int(r.get("G", 0)),
-            "GS": safe_int(r.get("GS", 0)),
-            "MIN": safe_float(r.get("MP", 0)),
-            "FGM": safe_float(r.get("FG", 0)),
-            "FGA": safe_float(r.get("FGA", 0)),
-            "FG_PCT": safe_float(r.get("FG%", 0)),
-            "FG3M": safe_float(r.get("3P", 0)),
-            "FG3A": safe_float(r.get("3PA", 0)),
-            "FG3_PCT": safe_float(r.get("3P%", 0)),
-            "FTM": safe_float(r.get("FT", 0)),
-            "FTA": safe_float(r.get("FTA", 0)),
-            "FT_PCT": safe_float(r.get("FT%", 0)),
-            "OREB": safe_float(r.get("ORB", 0)),
-            "DREB": safe_float(r.get("DRB", 0)),
-            "REB": safe_float(r.get("TRB", 0)),
-            "AST": safe_float(r.get("AST", 0)),
-            "STL": safe_float(r.get("STL", 0)),
-            "BLK": safe_float(r.get("BLK", 0)),
-            "TOV": safe_float(r.get("TOV", 0)),
-            "PF": safe_float(r.get("PF", 0)),
-            "PTS": safe_float(r.get("PTS/G", r.get("PTS", 0))),
-            "PLUS_MINUS": 0,
-        })
-
-    adv_seasons = []
-    for r in advanced:
-        season = str(r.get("Season", ""))
-        if "Career" in season or "20" not in season:
-            continue
-        adv_seasons.append({
-            "GROUP_VALUE": season,
-            "GP": safe_int(r.get("G", 0)),
-            "MIN": safe_float(r.get("MP", 0)),
-            "OFF_RATING": safe_float(r.get("ORtg", 0)),
-            "DEF_RATING": safe_float(r.get("DRtg", 0)),
-            "NET_RATING": safe_float(r.get("ORtg", 0)) - safe_float(r.get("DRtg", 0)),
-            "TS_PCT": safe_float(r.get("TS%", 0)),
-            "EFG_PCT": safe_float(r.get("eFG%", 0)),
-            "USG_PCT": safe_float(r.get("USG%", 0)),
-            "PACE": 0,
-            "PIE": safe_float(r.get("WS/48", 0)),
-            "AST_PCT": safe_float(r.get("AST%", 0)),
-            "REB_PCT": safe_float(r.get("TRB%", 0)),
-            "OREB_PCT": safe_float(r.get("ORB%", 0)),
-            "DREB_PCT": safe_float(r.get("DRB%", 0)),
-        })
+    from bbref_schema import apply
 
+    print("Fetching career stats...")
+    page = pages.result(PLAYER_URL)
+    base_schema, advanced_schema = career_schemas()
+    base_seasons = apply(page["per_game"], base_schema, label="per-game table")
+    adv_seasons = apply(page["advanced"], advanced_schema, label="advanced table")
     write_json("career.json", {"base": base_seasons, "advanced": adv_seasons})
-    delay()
 
 
 # ─── General Splits (Home/Away from game logs) ───
 
-def fetch_general_splits():
-    """Compute splits from game log data."""
-    print("Computing general splits from game logs...")
-    game_log_path = os.path.join(OUTPUT_DIR, "game_log.json")
-    with open(game_log_path) as f:
-        games = json.load(f)["data"]["games"]
+def fetch_general_splits(ctx=None):
+    """Compute splits from game log data.
 
-    splits_data = {}
-    for season_label in SEASON_LABELS.values():
-        sg = [g for g in games if g["SEASON"] == season_label]
-        if not sg:
-            continue
-
-        def avg(key):
-            vals = [g[key] for g in sg if g[key] is not None]
-            return round(sum(vals) / len(vals), 1) if vals else 0
-
-        def make_row(group_set, group_value, subset):
-            if not subset:
-                return None
-            n = len(subset)
-            def a(k):
-                vals = [g[k] for g in subset if g[k] is not None]
-                return round(sum(vals) / len(vals), 1) if vals else 0
-            def pct(made_key, att_key):
-                """Compute shooting % as total_made / total_attempts."""
-                made = sum(g[made_key] for g in subset if g[made_key] is not None)
-                att = sum(g[att_key] for g in subset if g[att_key] is not None)
-                return round(made / att, 3) if att > 0 else 0
-            wins = sum(1 for g in subset if g["WL"] == "W")
-            return {
-                "GROUP_SET": group_set,
-                "GROUP_VALUE": group_value,
-                "GP": n,
-                "W": wins,
-                "L": n - wins,
-                "W_PCT": round(wins / n, 3) if n else 0,
-                "MIN": a("MIN"),
-                "FGM": a("FGM"), "FGA": a("FGA"),
-                "FG_PCT": pct("FGM", "FGA"),
-                "FG3M": a("FG3M"), "FG3A": a("FG3A"),
-                "FG3_PCT": pct("FG3M", "FG3A"),
-                "FTM": a("FTM"), "FTA": a("FTA"),
-                "FT_PCT": pct("FTM", "FTA"),
-                "OREB": a("OREB"), "DREB": a("DREB"),
-                "REB": a("REB"),
-                "AST": a("AST"), "TOV": a("TOV"),
-                "STL": a("STL"), "BLK": a("BLK"),
-                "PF": a("PF"),
-                "PTS": a("PTS"),
-                "PLUS_MINUS": a("PLUS_MINUS"),
-            }
-
-        overall = make_row("Overall", "Overall", sg)
-        home = [g for g in sg if "vs." in g["MATCHUP"]]
-        away = [g for g in sg if "@" in g["MATCHUP"]]
-        wins = [g for g in sg if g["WL"] == "W"]
-        losses = [g for g in sg if g["WL"] == "L"]
-
-        # Monthly splits
-        monthly = {}
-        for g in sg:
-            try:
-                dt = datetime.strptime(g["GAME_DATE"], "%Y-%m-%d")
-                month_name = dt.strftime("%B")
-                monthly.setdefault(month_name, []).append(g)
-            except ValueError:
-                pass
-
-        month_rows = [make_row("Month", m, gs) for m, gs in sorted(monthly.items(), key=lambda x: datetime.strptime(x[0], "%B").month) if make_row("Month", m, gs)]
-
-        splits_data[season_label] = {
-            "overall": [overall] if overall else [],
-            "location": [r for r in [make_row("Location", "Home", home), make_row("Location", "Road", away)] if r],
-            "win_loss": [r for r in [make_row("W/L", "Wins", wins), make_row("W/L", "Losses", losses)] if r],
-            "month": month_rows,
-            "pre_post_allstar": [],
-            "starter_bench": [],
-            "days_rest": [],
-        }
+    Under run_steps() the game log arrives in memory and only seasons whose
+    games changed since the last run are recomputed; the rest are carried
+    over from the previous general_splits.json. Otherwise it is read from
+    the store.
+    """
+    from splits import compute_splits
 
+    print("Computing general splits from game logs...")
+    seasons = list(SEASON_LABELS.values())
+    game_log = ctx.inputs.get("game_log.json") if ctx is not None else None
+    if game_log is None:
+        game_log = store.data("game_log.json")
+        if game_log is None:
+            raise FileNotFoundError("no game log in the store; run the game_logs step first")
+    games = game_log["games"]
+    previous = (ctx.previous("general_splits.json") if ctx is not None else None) or {}
+    changed = ctx.changed("game_log.json", games, "SEASON") if ctx is not None else set(seasons)
+    stale = [s for s in seasons if s in changed or s not in previous]
+
+    fresh = compute_splits([g for g in games if g.get("SEASON") in stale], seasons=stale) if stale else {}
+    splits_data = {}
+    for season in seasons:
+        if season in fresh:
+            splits_data[season] = fresh[season]
+        elif season not in stale and season in previous:
+            splits_data[season] = previous[season]
+    print(f"  Recomputed {len(stale)}/{len(seasons)} seasons")
     write_json("general_splits.json", splits_data)
 
 
 # ─── Shooting Splits ───
 
-def fetch_shooting_splits():
-    """Fetch shooting splits from BBRef.
+def parse_shooting_page(html, year):
+    """(splits, groups, rows) from one season's shooting page, or None without a shooting table.
+
     The shooting table has columns with spaced-out names like S_p_l_i_t, V_a_l_u_e, F_G, etc.
     Rows are grouped by split type (Shot Distance, Shot Type, Game Location, etc.)
     with header-repeat rows (where Split="Split") between groups.
     """
+    import pandas as pd
+    from bbref_schema import numbers
+    from bbref_tables import locate_tables
+
+    table = locate_tables(html, ["shooting"]).get("shooting")
+    if not table:
+        return None
+
+    df = pd.read_html(StringIO(table))[0]
+    # Flatten multi-index if needed
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = ["_".join(str(c) for c in col).strip("_") for col in df.columns]
+
+    # Resolve columns once: BBRef uses spaced-out names like S_p_l_i_t, so match
+    # on the name with underscores removed; the first column containing each key wins.
+    cols = list(df.columns)
+    clean = [(c, str(c).replace("_", "").lower()) for c in cols]
+    found = {key: next((c for c, name in clean if key in name), None) for key in ("split", "value", "fg", "fga", "fg%")}
+    col_split = found["split"] or cols[0]
+    col_value = found["value"] or cols[1]
+    col_fg = found["fg"] or cols[2] if len(cols) > 2 else None
+    col_fga = found["fga"] or cols[3] if len(cols) > 3 else None
+    col_fgpct = found["fg%"] or cols[4] if len(cols) > 4 else None
+
+    split = df[col_split].map(str)
+    value = df[col_value].map(str)
+    # Header-repeat rows (Split="Split") and rows without a value are skipped outright.
+    kept = ~value.str.lower().isin(["value", "nan", ""]) & split.str.lower().ne("split")
+    # A row with a Split cell starts a group; the rows after it belong to it until the next one.
+    group = split.where(kept & ~split.str.lower().isin(["", "nan"])).ffill()
+    kept &= group.notna()
+
+    def stat(col):
+        return numbers(df.loc[kept, col]).tolist() if col else [0] * int(kept.sum())
+
+    names, values = group[kept].tolist(), value[kept].tolist()
+    groups = {name: [] for name in names}  # group_name -> list of {value, fg, fga, fg_pct}
+    for name, val, fg, fga, fgpct in zip(names, values, stat(col_fg), stat(col_fga), stat(col_fgpct)):
+        if fga > 0:
+            groups[name].append({
+                "GROUP_VALUE": val,
+                "FGM": fg,
+                "FGA": fga,
+                "FG_PCT": fgpct,
+            })
+
+    # Map BBRef groups to our format
+    shot_type = groups.get("Shot Type", groups.get("Shot Points", []))
+    shot_area = groups.get("Shot Distance", [])
+    # If we have Game Location data, use it as an approximation for "shot_area"
+    if not shot_area:
+        shot_area = groups.get("Game Location", [])
+
+    n_rows = sum(len(v) for v in groups.values())
+    splits = {
+        "shot_type": shot_type,
+        "shot_area": shot_area,
+        "distance": groups.get("Shot Distance", []),
+        "assisted": [],
+    }
+    return splits, len(groups), n_rows
+
+
+def fetch_shooting_splits():
+    """Fetch shooting splits from BBRef."""
     print("Fetching shooting splits...")
     shooting_data = {}
 
     for year in SEASONS:
         season_label = SEASON_LABELS[year]
-        url = f"{BASE_URL}/players/b/{PLAYER_SLUG}/shooting/{year}/"
         print(f"  Season {season_label}...")
         try:
-            soup = get_soup(url)
-            table = soup.find("table", {"id": "shooting"})
-            if not table:
+            parsed = pages.result(shooting_url(year))
+            if parsed is None:
                 print("    No shooting table found")
                 shooting_data[season_label] = {"shot_type": [], "shot_area": [], "distance": [], "assisted": []}
-                delay()
                 continue
-
-            df = pd.read_html(StringIO(str(table)))[0]
-            # Flatten multi-index if needed
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = ["_".join(str(c) for c in col).strip("_") for col in df.columns]
-
-            # Identify column names (BBRef uses spaced-out names like S_p_l_i_t)
-            cols = list(df.columns)
-            # Map to clean names by finding cols containing key substrings
-            def find_col(pattern):
-                for c in cols:
-                    c_clean = str(c).replace("_", "").lower()
-                    if pattern in c_clean:
-                        return c
-                return None
-
-            col_split = find_col("split") or cols[0]
-            col_value = find_col("value") or cols[1]
-            col_fg = find_col("fg") or cols[2] if len(cols) > 2 else None
-            col_fga = find_col("fga") or cols[3] if len(cols) > 3 else None
-            col_fgpct = find_col("fg%") or cols[4] if len(cols) > 4 else None
-
-            # Parse rows into groups
-            current_group = None
-            groups = {}  # group_name -> list of {value, fg, fga, fg_pct}
-
-            for _, row in df.iterrows():
-                split_val = str(row.get(col_split, ""))
-                value_val = str(row.get(col_value, ""))
-
-                # Skip header-repeat rows
-                if value_val.lower() in ("value", "nan", ""):
-                    continue
-                if split_val.lower() in ("split",):
-                    continue
-
-                # If split column has a value, it's a new group
-                if split_val and split_val.lower() != "nan":
-                    current_group = split_val
-
-                if current_group and value_val and value_val.lower() != "nan":
-                    groups.setdefault(current_group, [])
-                    fg = safe_float(row.get(col_fg, 0)) if col_fg else 0
-                    fga = safe_float(row.get(col_fga, 0)) if col_fga else 0
-                    fgpct = safe_float(row.get(col_fgpct, 0)) if col_fgpct else 0
-                    if fga > 0:
-                        groups[current_group].append({
-                            "GROUP_VALUE": value_val,
-                            "FGM": fg,
-                            "FGA": fga,
-                            "FG_PCT": fgpct,
-                        })
-
-            # Map BBRef groups to our format
-            shot_type = groups.get("Shot Type", groups.get("Shot Points", []))
-            shot_area = groups.get("Shot Distance", [])
-            # If we have Game Location data, use it as an approximation for "shot_area"
-            if not shot_area:
-                shot_area = groups.get("Game Location", [])
-
-            n_rows = sum(len(v) for v in groups.values())
-            print(f"    Found {len(groups)} groups, {n_rows} total rows")
-
-            shooting_data[season_label] = {
-                "shot_type": shot_type,
-                "shot_area": shot_area,
-                "distance": groups.get("Shot Distance", []),
-                "assisted": [],
-            }
+            splits, n_groups, n_rows = parsed
+            print(f"    Found {n_groups} groups, {n_rows} total rows")
+            shooting_data[season_label] = splits
         except Exception as e:
             print(f"    Warning: {e}")
             import traceback
             traceback.print_exc()
             shooting_data[season_label] = {"shot_type": [], "shot_area": [], "distance": [], "assisted": []}
-        delay()
 
     write_json("shooting_splits.json", shooting_data)
 
 
 # ─── On/Off (team-level when Jokic on/off) ───
 
-def fetch_on_off_jokic():
-    """Fetch Jokic on/off court data from BBRef.
+def parse_on_off_page(html, year):
+    """(season entry, on ORtg, off ORtg) from one season of Jokic's on-off page,
+    or None without an on-off table.
+
     BBRef on-off page has a single table with id='on-off' containing:
     - Row 0: "On Court" (team stats when Jokic plays)
     - Row 1: "Off Court" (team stats when Jokic sits)
@@ -540,132 +617,278 @@ def fetch_on_off_jokic():
     Columns are multi-index: (Team/Opponent/Difference) x (eFG%, ORB%, DRB%, TRB%, AST%, STL%, BLK%, TOV%, ORtg)
     Plus: Split, Tm, MP
     """
+    import pandas as pd
+    from bbref_tables import locate_tables
+
+    table = locate_tables(html, ["on-off"]).get("on-off")
+    if not table:
+        return None
+
+    df = pd.read_html(StringIO(table))[0]
+    # Flatten multi-index columns
+    df.columns = ["_".join(str(c) for c in col).strip("_") for col in df.columns]
+
+    # Find the On Court and Off Court rows (the last of each, if repeated)
+    split = df.get("Unnamed: 0_level_0_Split", pd.Series("", index=df.index)).map(str)
+    on = df[split.str.contains("On Court", regex=False)]
+    off = df[split.str.contains("Off Court", regex=False) & ~split.str.contains("On Court", regex=False)]
+    on_row = on.iloc[-1] if len(on) else None
+    off_row = off.iloc[-1] if len(off) else None
+
+    def make_on_off_entry(row, court_status):
+        if row is None:
+            return None
+        mp = safe_float(row.get("Unnamed: 2_level_0_MP", 0))
+        team_ortg = safe_float(row.get("Team_ORtg", 0))
+        opp_ortg = safe_float(row.get("Opponent_ORtg", 0))
+        return {
+            "VS_PLAYER_ID": 203999,
+            "VS_PLAYER_NAME": "Nikola Jokic",
+            "COURT_STATUS": court_status,
+            "GP": 0, "W": 0, "L": 0, "W_PCT": 0,
+            "MIN": mp,
+            # BBRef on-off is team-level, no individual box-score stats
+            "FGM": 0, "FGA": 0,
+            "FG_PCT": safe_float(row.get("Team_eFG%", 0)),
+            "FG3M": 0, "FG3A": 0, "FG3_PCT": 0,
+            "FTM": 0, "FTA": 0, "FT_PCT": 0,
+            "OREB": 0, "DREB": 0, "REB": 0,
+            "AST": 0, "TOV": 0, "STL": 0, "BLK": 0, "PF": 0,
+            "PTS": 0,
+            "PLUS_MINUS": round(team_ortg - opp_ortg, 1),
+        }
+
+    def make_advanced_entry(row, court_status):
+        if row is None:
+            return None
+        team_ortg = safe_float(row.get("Team_ORtg", 0))
+        opp_ortg = safe_float(row.get("Opponent_ORtg", 0))
+        return {
+            "VS_PLAYER_ID": 203999,
+            "VS_PLAYER_NAME": "Nikola Jokic",
+            "COURT_STATUS": court_status,
+            "OFF_RATING": team_ortg,
+            "DEF_RATING": opp_ortg,
+            "NET_RATING": round(team_ortg - opp_ortg, 1),
+            "EFG_PCT": safe_float(row.get("Team_eFG%", 0)),
+            "TS_PCT": 0,
+            "PACE": 0,
+            "AST_PCT": safe_float(row.get("Team_AST%", 0)),
+            "OREB_PCT": safe_float(row.get("Team_ORB%", 0)),
+            "DREB_PCT": safe_float(row.get("Team_DRB%", 0)),
+            "REB_PCT": safe_float(row.get("Team_TRB%", 0)),
+        }
+
+    on_base = make_on_off_entry(on_row, "On")
+    off_base = make_on_off_entry(off_row, "Off")
+    on_adv = make_advanced_entry(on_row, "On")
+    off_adv = make_advanced_entry(off_row, "Off")
+
+    if not (on_base or off_base):
+        return None, None, None
+    entry = {
+        "base": {
+            "jokic_on": on_base,
+            "jokic_off": off_base,
+        },
+        "advanced": {
+            "jokic_on": on_adv,
+            "jokic_off": off_adv,
+        },
+    }
+    on_ortg = safe_float(on_row.get("Team_ORtg", 0)) if on_row is not None else 0
+    off_ortg = safe_float(off_row.get("Team_ORtg", 0)) if off_row is not None else 0
+    return entry, on_ortg, off_ortg
+
+
+def fetch_on_off_jokic():
+    """Fetch Jokic on/off court data from BBRef."""
     print("Fetching Jokic on/off from BBRef...")
     on_off_data = {}
 
     for year in SEASONS:
         season_label = SEASON_LABELS[year]
-        url = f"{BASE_URL}/players/j/jokicni01/on-off/{year}/"
         print(f"  Season {season_label}...")
         try:
-            soup = get_soup(url)
-            table = soup.find("table", {"id": "on-off"})
-            if not table:
+            parsed = pages.result(on_off_url(year))
+            if parsed is None:
                 print("    No on-off table found")
-                delay()
                 continue
-
-            df = pd.read_html(StringIO(str(table)))[0]
-            # Flatten multi-index columns
-            df.columns = ["_".join(str(c) for c in col).strip("_") for col in df.columns]
-
-            # Find the On Court and Off Court rows
-            on_row = None
-            off_row = None
-            for _, row in df.iterrows():
-                split_val = str(row.get("Unnamed: 0_level_0_Split", ""))
-                if "On Court" in split_val:
-                    on_row = row
-                elif "Off Court" in split_val:
-                    off_row = row
-
-            def make_on_off_entry(row, court_status):
-                if row is None:
-                    return None
-                mp = safe_float(row.get("Unnamed: 2_level_0_MP", 0))
-                team_ortg = safe_float(row.get("Team_ORtg", 0))
-                opp_ortg = safe_float(row.get("Opponent_ORtg", 0))
-                return {
-                    "VS_PLAYER_ID": 203999,
-                    "VS_PLAYER_NAME": "Nikola Jokic",
-                    "COURT_STATUS": court_status,
-                    "GP": 0, "W": 0, "L": 0, "W_PCT": 0,
-                    "MIN": mp,
-                    # BBRef on-off is team-level, no individual box-score stats
-                    "FGM": 0, "FGA": 0,
-                    "FG_PCT": safe_float(row.get("Team_eFG%", 0)),
-                    "FG3M": 0, "FG3A": 0, "FG3_PCT": 0,
-                    "FTM": 0, "FTA": 0, "FT_PCT": 0,
-                    "OREB": 0, "DREB": 0, "REB": 0,
-                    "AST": 0, "TOV": 0, "STL": 0, "BLK": 0, "PF": 0,
-                    "PTS": 0,
-                    "PLUS_MINUS": round(team_ortg - opp_ortg, 1),
-                }
-
-            def make_advanced_entry(row, court_status):
-                if row is None:
-                    return None
-                team_ortg = safe_float(row.get("Team_ORtg", 0))
-                opp_ortg = safe_float(row.get("Opponent_ORtg", 0))
-                return {
-                    "VS_PLAYER_ID": 203999,
-                    "VS_PLAYER_NAME": "Nikola Jokic",
-                    "COURT_STATUS": court_status,
-                    "OFF_RATING": team_ortg,
-                    "DEF_RATING": opp_ortg,
-                    "NET_RATING": round(team_ortg - opp_ortg, 1),
-                    "EFG_PCT": safe_float(row.get("Team_eFG%", 0)),
-                    "TS_PCT": 0,
-                    "PACE": 0,
-                    "AST_PCT": safe_float(row.get("Team_AST%", 0)),
-                    "OREB_PCT": safe_float(row.get("Team_ORB%", 0)),
-                    "DREB_PCT": safe_float(row.get("Team_DRB%", 0)),
-                    "REB_PCT": safe_float(row.get("Team_TRB%", 0)),
-                }
-
-            on_base = make_on_off_entry(on_row, "On")
-            off_base = make_on_off_entry(off_row, "Off")
-            on_adv = make_advanced_entry(on_row, "On")
-            off_adv = make_advanced_entry(off_row, "Off")
-
-            if on_base or off_base:
-                on_off_data[season_label] = {
-                    "base": {
-                        "jokic_on": on_base,
-                        "jokic_off": off_base,
-                    },
-                    "advanced": {
-                        "jokic_on": on_adv,
-                        "jokic_off": off_adv,
-                    },
-                }
-                on_ortg = safe_float(on_row.get("Team_ORtg", 0)) if on_row is not None else 0
-                off_ortg = safe_float(off_row.get("Team_ORtg", 0)) if off_row is not None else 0
+            entry, on_ortg, off_ortg = parsed
+            if entry:
+                on_off_data[season_label] = entry
                 print(f"    Team ORtg: On={on_ortg}, Off={off_ortg}")
         except Exception as e:
             print(f"    Warning: {e}")
             import traceback
             traceback.print_exc()
-        delay()
 
-    write_json("on_off_jokic.json", {"on_off": on_off_data, "lineup_pairs": {}})
+    write_json("on_off_jokic.json", {"on_off": on_off_data, "lineup_pairs": {}}, player_id=PLAYER_ID)
+
+
+def player_pages():
+    return [(PLAYER_URL, parse_player_page, None)]
+
+
+def game_log_pages():
+    return [(gamelog_url(y), parse_game_log_page, y) for y in SEASONS]
+
+
+def shooting_pages():
+    return [(shooting_url(y), parse_shooting_page, y) for y in SEASONS]
+
+
+def on_off_pages():
+    return [(on_off_url(y), parse_on_off_page, y) for y in SEASONS]
+
+
+def page_plan(steps):
+    """Every page `steps` need, as (url, parser, season), in the order the steps use them."""
+    plan = {}
+    for step in steps:
+        for page in step.requests() if step.requests is not None else []:
+            plan.setdefault(page[0], page)
+    return list(plan.values())
+
+
+def describe(page):
+    """(URL, cache key) of a page_plan() entry."""
+    return page[0], cache.key("bbref", page[0])
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--offline", action="store_true",
+                        help="serve every page from the response cache; never touch the network")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="bypass the response cache and refetch everything")
+    parser.add_argument("--columnar", action="store_true",
+                        help="write game_log.json in the compact columnar format")
+    parser.add_argument("--compact", action="store_true",
+                        help="write JSON without indentation")
+    parser.add_argument("--compress", default="",
+                        help="also write precompressed siblings, e.g. gz or gz,br")
+    parser.add_argument("--shard", action="store_true",
+                        help="also write game_log.json and shot_chart.json per season, with an index.json")
+    parser.add_argument("--workers", type=int, default=PARSE_WORKERS,
+                        help="parser processes (0 parses on the main process, for debugging)")
+    parser.add_argument("--record", metavar="DIR",
+                        help="also save every page into a fixture directory for standin.py")
+    parser.add_argument("--standin", metavar="URL", default=os.environ.get(STANDIN_ENV),
+                        help=f"fetch pages from a standin.py server (default: ${STANDIN_ENV})")
+    parser.add_argument("--report", metavar="PATH", default=default_path("fetch_bbref"),
+                        help="where to write the JSON run report")
+    parser.add_argument("--store", metavar="PATH",
+                        help=f"SQLite store the JSON files are exported from (default: <output>/{STORE_FILE})")
+    parser.add_argument("--state", metavar="PATH", default=state_path("fetch_bbref"),
+                        help="where to remember step input hashes between runs")
+    parser.add_argument("--force", action="store_true",
+                        help="rerun derived steps even when their inputs have not changed")
+    parser.add_argument("--steps", metavar="STEP,...",
+                        help="only run these steps, e.g. game_logs,general_splits (default: all)")
+    parser.add_argument("--seasons", metavar="SEASON,...",
+                        help="only fetch these seasons, e.g. 2025-26; the store keeps the others")
+    parser.add_argument("--plan", action="store_true",
+                        help="print the pages a run would fetch and the cache entries it would hit, then exit")
+    return parser
+
+
+def use_seasons(labels):
+    """Limit the run to the seasons listed in `labels` ("2024-25,2025-26")."""
+    global SEASONS
+    SEASONS = select_seasons(SEASONS, labels, label=SEASON_LABELS.get)
+
+
+def start(args, steps=None):
+    """Set up the cache, writer and request layer for a run with `args`, and start
+    prefetching the pages of `steps` (default: every step)."""
+    global cache, pages, writer, handoff, recorder, report, http, store
+    report = RunReport("fetch_bbref")
+    cache = ResponseCache(offline=args.offline, enabled=not args.no_cache)
+    store = Store(args.store or os.path.join(OUTPUT_DIR, STORE_FILE), OUTPUT_DIR)
+    handoff = Handoff(OutputWriter(OUTPUT_DIR, compact=args.compact, columnar=args.columnar,
+                                   compress=[c for c in args.compress.split(",") if c], shard=args.shard))
+    writer = StoreWriter(handoff, store)
+    recorder = FixtureRecorder(args.record) if args.record else None
+    http = resilience()
+    if args.standin:
+        use_standin(args.standin)
+    executor = parse_pool(args.workers) if args.workers > 0 else InlineExecutor()
+    pages = PagePipeline(page_plan(plan_steps(args) if steps is None else steps), executor)
+
+
+def prefetch(steps):
+    """Queue the pages of `steps` behind those already planned (refresh.py starts
+    with the steps it runs first and adds the ones it hedges later)."""
+    pages.add(page_plan(steps))
+
+
+def plan_steps(args):
+    return [
+        Step("Player Overview", fetch_player_overview, ("player_overview.json",), requests=player_pages),
+        Step("Game Logs", fetch_game_logs, ("game_log.json",), requests=game_log_pages),
+        Step("Career", fetch_career, ("career.json",), requests=player_pages),
+        Step("General Splits", fetch_general_splits, ("general_splits.json",), inputs=("game_log.json",)),
+        Step("Shooting Splits", fetch_shooting_splits, ("shooting_splits.json",), requests=shooting_pages),
+        Step("Jokic On/Off", fetch_on_off_jokic, ("on_off_jokic.json",), requests=on_off_pages),
+    ]
 
 
-def main():
+def finish(wait=True):
+    """Stop prefetching and persist the cache, fixtures and store.
+    wait=False refuses the pages not fetched yet (refresh.py, once it has what it needs)."""
+    if not wait:
+        http.close()
+    pages.close()
+    cache.save()
+    session.close()
+    if recorder is not None:
+        recorder.save()
+    store.close()
+
+
+def plan(args, steps):
+    """--plan: print what a run with `args` would fetch, without starting one."""
+    global cache
+    cache = ResponseCache(offline=args.offline, enabled=not args.no_cache)
+    if args.standin:
+        use_standin(args.standin)
+    print(f"BraunStats — Basketball Reference plan for {', '.join(s.name for s in steps)}")
+    print(f"Seasons: {[SEASON_LABELS[y] for y in SEASONS]}")
+    print("=" * 50)
+    print_plan(steps, describe, cache, REQUEST_INTERVAL)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        if args.seasons:
+            use_seasons(args.seasons)
+        steps = select_steps(plan_steps(args), args.steps)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.plan:
+        plan(args, steps)
+        return
+    start(args, steps)
+
     print("BraunStats — Basketball Reference Scraper")
     print(f"Output directory: {OUTPUT_DIR}")
     print("=" * 50)
 
-    steps = [
-        ("Player Overview", fetch_player_overview),
-        ("Game Logs", fetch_game_logs),
-        ("Career", fetch_career),
-        ("General Splits", fetch_general_splits),
-        ("Shooting Splits", fetch_shooting_splits),
-        ("Jokic On/Off", fetch_on_off_jokic),
-    ]
-    succeeded = 0
-    for name, fn in steps:
-        try:
-            fn()
-            succeeded += 1
-        except Exception as e:
-            print(f"  FAILED {name}: {e}")
-            import traceback
-            traceback.print_exc()
-            print("  Skipping...")
+    results = run_steps(steps, handoff, store.data, report=report,
+                        state=args.state, force=args.force)
+    succeeded = report_failures(results, show_traceback=True)
+    finish()
 
     print("=" * 50)
+    writer.report()
+    writer.save()
+    report.summary()
+    report.save(args.report)
+    print(f"HTTP: {session.requests} requests, {session.not_modified} not modified")
+    print(f"Cache: {cache.hits} hits, {cache.misses} misses{' (offline)' if cache.offline else ''}")
     print(f"Done! {succeeded}/{len(steps)} steps completed.")
 
 
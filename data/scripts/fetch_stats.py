@@ -3,10 +3,11 @@ BraunStats Data Pipeline
 Fetches Christian Braun stats from NBA API and outputs static JSON files.
 """
 
-import json
+import argparse
 import time
 import os
 from datetime import datetime, timezone
+from urllib.parse import urlencode
 
 from nba_api.stats.endpoints import (
     CommonPlayerInfo,
@@ -19,10 +20,31 @@ from nba_api.stats.endpoints import (
     ShotChartDetail,
 )
 
+from nba_api.stats.library.http import NBAStatsHTTP, NBAStatsResponse
+
+from fixtures import STANDIN_ENV, FixtureRecorder
+from http_cache import CacheMiss, ResponseCache, season_is_complete, season_ttl
+from incremental import group_rows, high_water_marks, merge_window
+from lineups import LINEUP_SIZES, LineupIndex
+from output import Handoff, OutputWriter, StoreWriter
+from ratelimit import Scheduler
+from resilience import Resilience, RetryPolicy
+from runreport import RunReport, default_path
+from steps import (
+    Step, print_plan, report_failures, run_steps, select_seasons, select_steps, state_path,
+)
+from store import STORE_FILE, Store
+
 BRAUN_ID = 1631128
 JOKIC_ID = 203999
 NUGGETS_ID = 1610612743
 SEASONS = ["2022-23", "2023-24", "2024-25", "2025-26"]
+SEASON_TYPES = ["Regular Season", "Playoffs"]
+SOURCE = "stats.nba.com"
+
+# (player, anchor teammate, team) on/off views; see fetch_on_off()
+ON_OFF_PAIRS = [(BRAUN_ID, JOKIC_ID, NUGGETS_ID)]
+ON_OFF_MEASURES = ["Base", "Advanced"]
 
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)))
 
@@ -37,41 +59,96 @@ HEADERS = {
 }
 
 MAX_RETRIES = 3
+RETRY_WAIT = 5  # backoff base in seconds: attempt n waits ~RETRY_WAIT * 2**n, with jitter
+RETRY_CAP = 60
 TIMEOUT = 60
+REQUEST_RATE = 0.25  # requests/second shared by all jobs (one every 4s)
+MAX_WORKERS = 4
+
+scheduler = Scheduler(max_workers=MAX_WORKERS)
+cache = ResponseCache()
+writer = handoff = OutputWriter(OUTPUT_DIR)
+report = RunReport("fetch_stats")
+http = Resilience(REQUEST_RATE, RetryPolicy(MAX_RETRIES, RETRY_WAIT, RETRY_CAP), report=report)
+recorder = None
+store = None
 
 
-def api_delay():
-    time.sleep(4.0)
+def record(fn, endpoint, body):
+    """Save a response into the --record fixture directory, if one was given."""
+    if recorder is not None:
+        recorder.record(NBAStatsHTTP.base_url.format(endpoint=fn.endpoint), body, endpoint.parameters)
+
+
+def use_standin(base_url):
+    """Send every stats.nba.com request to a standin.py server instead."""
+    NBAStatsHTTP.base_url = base_url.rstrip("/") + "/stats/{endpoint}"
 
 
 def retry_call(fn, **kwargs):
     kwargs.setdefault("headers", HEADERS)
     kwargs.setdefault("timeout", TIMEOUT)
-    for attempt in range(MAX_RETRIES):
-        try:
-            return fn(**kwargs)
-        except Exception as e:
-            print(f"    Attempt {attempt + 1}/{MAX_RETRIES} failed: {type(e).__name__}: {e}")
-            if attempt < MAX_RETRIES - 1:
-                wait = 5 * (attempt + 1)
-                print(f"    Retrying in {wait}s...")
-                time.sleep(wait)
-            else:
-                raise
-
-
-def write_json(filename, data, season=None):
-    output = {
-        "meta": {
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "season": season,
-        },
-        "data": data,
-    }
-    path = os.path.join(OUTPUT_DIR, filename)
-    with open(path, "w") as f:
-        json.dump(output, f, indent=2)
-    print(f"  -> Wrote {filename}")
+    endpoint = fn(get_request=False, **kwargs)
+    key = cache.key(fn.endpoint, endpoint.parameters)
+    body = cache.get(key)
+    if body is not None:
+        endpoint.nba_response = NBAStatsResponse(response=body, status_code=200, url=None)
+        load_response(fn, endpoint)
+        report.request(fn.__name__, 0.0, cached=True)
+        record(fn, endpoint, body)
+        return endpoint
+    if cache.offline:
+        raise CacheMiss(f"{fn.__name__} {endpoint.parameters} not in cache")
+
+    # Sent on nba_api's own session, but through the resilience layer so that
+    # status codes and Retry-After are seen before the body is decoded.
+    url = NBAStatsHTTP.base_url.format(endpoint=fn.endpoint)
+    params = sorted(endpoint.parameters.items())
+    resp = http.request(url, lambda: NBAStatsHTTP.get_session().get(
+        url, params=params, headers=endpoint.headers, timeout=endpoint.timeout,
+    ), label=fn.__name__)
+    body = resp.text
+    endpoint.nba_response = NBAStatsResponse(response=body, status_code=resp.status_code, url=resp.url)
+    load_response(fn, endpoint)
+    season = kwargs.get("season", kwargs.get("season_nullable"))
+    cache.put(key, body, ttl=season_ttl(season), label=fn.__name__)
+    record(fn, endpoint, body)
+    return endpoint
+
+
+def describe(request):
+    """(URL with query string, cache key) of one (endpoint, params) request, as retry_call() sends it."""
+    fn, params = request
+    endpoint = fn(get_request=False, headers=HEADERS, timeout=TIMEOUT, **params)
+    url = NBAStatsHTTP.base_url.format(endpoint=fn.endpoint)
+    query = urlencode(sorted((k, v) for k, v in endpoint.parameters.items() if v is not None))
+    return f"{url}?{query}", cache.key(fn.endpoint, endpoint.parameters)
+
+
+def load_response(fn, endpoint):
+    """Decode the response into the endpoint's data sets, timed as parsing."""
+    started = time.perf_counter()
+    endpoint.load_response()
+    report.parse(fn.__name__, time.perf_counter() - started)
+
+
+def submit(fn, **kwargs):
+    """Queue an API call on the shared pool. Returns a Future for the response."""
+    return scheduler.submit(report.bind, report.current_step(), retry_call, fn, **kwargs)
+
+
+def submit_all(requests):
+    """submit() every {key: (endpoint, params)} request; returns {key: Future}."""
+    return {key: submit(fn, **params) for key, (fn, params) in requests.items()}
+
+
+def write_json(filename, data, season=None, **meta):
+    report.output(writer.write(filename, data, {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "season": season,
+        "source": SOURCE,
+        **meta,
+    }))
 
 
 def rows_to_dicts(result_set):
@@ -80,133 +157,264 @@ def rows_to_dicts(result_set):
     return [dict(zip(headers, row)) for row in rows]
 
 
+def player_overview_requests():
+    return {"info": (CommonPlayerInfo, {"player_id": BRAUN_ID})}
+
+
 def fetch_player_overview():
     print("Fetching player overview...")
-    resp = retry_call(CommonPlayerInfo, player_id=BRAUN_ID)
+    resp = submit_all(player_overview_requests())["info"].result()
     raw = resp.get_normalized_dict()
     info = raw["CommonPlayerInfo"][0] if raw["CommonPlayerInfo"] else {}
     headline = raw["PlayerHeadlineStats"][0] if raw["PlayerHeadlineStats"] else {}
     write_json("player_overview.json", {"info": info, "headline": headline})
-    api_delay()
 
 
-def fetch_game_logs():
-    print("Fetching game logs...")
-    all_games = []
-    for season in SEASONS:
-        for season_type in ["Regular Season", "Playoffs"]:
-            label = f"{season} ({season_type})"
-            print(f"  {label}...")
-            try:
-                resp = retry_call(
-                    PlayerGameLog,
-                    player_id=BRAUN_ID,
-                    season=season,
-                    season_type_all_star=season_type,
-                )
-                raw = resp.get_dict()
-                result_set = raw["resultSets"][0]
-                games = rows_to_dicts(result_set)
-                for g in games:
-                    g["SEASON"] = season
-                    g["SEASON_TYPE"] = season_type
-                all_games.extend(games)
-                print(f"    Found {len(games)} games")
-            except Exception as e:
-                print(f"    Warning: {e}")
-            api_delay()
+def final_groups(filename):
+    """Groups of `filename` fetched after their season was complete, from its meta
+    ("final_groups"). They cannot change, whether or not they have rows: a season
+    without playoff games never gets a Playoffs row."""
+    meta = store.meta(filename, source=SOURCE) or {}
+    return {tuple(group) for group in meta.get("final_groups", [])}
 
-    write_json("game_log.json", {"games": all_games})
 
+def incremental_plan(filename, key, group_fields, id_field):
+    """Load an existing output from the store for an incremental refresh.
 
-def fetch_on_off_jokic():
-    print("Fetching Jokic on/off data...")
-    on_off_data = {}
+    Returns (groups, marks): the rows already stored split by group, and the
+    high-water mark of each group. Groups of completed seasons that are already
+    stored, or listed by final_groups(), need no request.
+    """
+    data = store.data(filename, source=SOURCE)
+    existing = data.get(key, []) if data else []
+    groups = group_rows(existing, group_fields)
+    return groups, high_water_marks(groups, id_field)
 
+
+def is_final(group, groups, final):
+    return (group in groups or group in final) and season_is_complete(group[0])
+
+
+def game_log_plan(incremental=False):
+    """(groups, marks, final, requests): the game logs already stored by (season, season type),
+    their high-water marks, the final groups, and {group: (endpoint, params)} of the
+    requests still needed."""
+    groups, marks = {}, {}
+    if incremental:
+        groups, marks = incremental_plan("game_log.json", "games", ("SEASON", "SEASON_TYPE"), "Game_ID")
+    final = final_groups("game_log.json")
+
+    requests = {}
     for season in SEASONS:
-        if season not in on_off_data:
-            on_off_data[season] = {}
-
-        for measure in ["Base", "Advanced"]:
-            print(f"  Season {season} ({measure})...")
-            try:
-                resp = retry_call(
-                    TeamPlayerOnOffDetails,
-                    team_id=NUGGETS_ID,
-                    season=season,
-                    measure_type_detailed=measure,
-                )
-                raw = resp.get_dict()
-                on_set = raw["resultSets"][0]
-                off_set = raw["resultSets"][1]
-                on_rows = rows_to_dicts(on_set)
-                off_rows = rows_to_dicts(off_set)
-
-                jokic_on = next(
-                    (r for r in on_rows if r.get("VS_PLAYER_ID") == JOKIC_ID), None
-                )
-                jokic_off = next(
-                    (r for r in off_rows if r.get("VS_PLAYER_ID") == JOKIC_ID), None
+        for season_type in SEASON_TYPES:
+            group = (season, season_type)
+            if incremental and is_final(group, groups, final):
+                continue
+            since = marks[group][0] if group in marks else None
+            requests[group] = (PlayerGameLog, {
+                "player_id": BRAUN_ID,
+                "season": season,
+                "season_type_all_star": season_type,
+                "date_from_nullable": since.strftime("%m/%d/%Y") if since else "",
+            })
+    return groups, marks, final, requests
+
+
+def fetch_game_logs(incremental=False):
+    print(f"Fetching game logs{' (incremental)' if incremental else ''}...")
+    groups, marks, final, requests = game_log_plan(incremental)
+    jobs = submit_all(requests)
+
+    for (season, season_type), job in jobs.items():
+        label = f"{season} ({season_type})"
+        try:
+            raw = job.result().get_dict()
+            result_set = raw["resultSets"][0]
+            games = rows_to_dicts(result_set)
+            for g in games:
+                g["SEASON"] = season
+                g["SEASON_TYPE"] = season_type
+            if (season, season_type) in marks:
+                since = marks[(season, season_type)][0]
+                groups[(season, season_type)], changes = merge_window(
+                    groups[(season, season_type)], games, since, "Game_ID"
                 )
-                on_off_data[season][measure.lower()] = {
-                    "jokic_on": jokic_on,
-                    "jokic_off": jokic_off,
-                }
-            except Exception as e:
-                print(f"    Warning: {e}")
-            api_delay()
+                print(f"  {label}: since {since}: {changes['added']} added, "
+                      f"{changes['updated']} updated, {changes['dropped']} dropped")
+            else:
+                groups[(season, season_type)] = games
+                print(f"  {label}: found {len(games)} games")
+            if season_is_complete(season):
+                final.add((season, season_type))
+        except Exception as e:
+            print(f"  {label}: Warning: {e}")
 
-    # Fetch lineup pair stats (Braun + Jokic together)
-    print("Fetching lineup pair data...")
-    lineup_pairs = {}
-    for season in SEASONS:
-        print(f"  Season {season} lineups...")
+    all_games = [
+        g for season in SEASONS for season_type in SEASON_TYPES
+        for g in groups.get((season, season_type), [])
+    ]
+    write_json("game_log.json", {"games": all_games}, final_groups=sorted(map(list, final)))
+
+
+def result_set(raw, name):
+    """A result set by name; positions differ between endpoints and API versions."""
+    return next(rs for rs in raw["resultSets"] if rs["name"] == name)
+
+
+def index_on_off(raw):
+    """({VS_PLAYER_ID: on-court row}, {VS_PLAYER_ID: off-court row}) for one TeamPlayerOnOffDetails response."""
+    on_rows = rows_to_dicts(result_set(raw, "PlayersOnCourtTeamPlayerOnOffDetails"))
+    off_rows = rows_to_dicts(result_set(raw, "PlayersOffCourtTeamPlayerOnOffDetails"))
+    return (
+        {r["VS_PLAYER_ID"]: r for r in on_rows},
+        {r["VS_PLAYER_ID"]: r for r in off_rows},
+    )
+
+
+def parse_on_off_pairs(spec):
+    """Parse "PLAYER:ANCHOR[@TEAM],..." into [(player, anchor, team)]. PLAYER may be *
+    for every player the team's on/off data lists; TEAM defaults to the Nuggets."""
+    pairs = []
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        pair, _, team = item.strip().partition("@")
+        player, anchor = pair.split(":")
+        pairs.append((player if player == "*" else int(player), int(anchor), int(team) if team else NUGGETS_ID))
+    return pairs
+
+
+def on_off_teams(pairs):
+    """Teams whose on/off data `pairs` need, plus the Nuggets for on_off_jokic.json."""
+    return list(dict.fromkeys([*(team for _, _, team in pairs), NUGGETS_ID]))
+
+
+def on_off_plan(teams):
+    """({(team, season, measure): request}, {(team, season, size): request}): one
+    TeamPlayerOnOffDetails per measure and one TeamDashLineups per lineup size,
+    per team and season."""
+    on_off, lineups = {}, {}
+    for team in teams:
+        for season in SEASONS:
+            for measure in ON_OFF_MEASURES:
+                on_off[(team, season, measure)] = (TeamPlayerOnOffDetails, {
+                    "team_id": team,
+                    "season": season,
+                    "measure_type_detailed_defense": measure,
+                })
+            for size in LINEUP_SIZES:
+                lineups[(team, season, size)] = (TeamDashLineups, {
+                    "team_id": team,
+                    "season": season,
+                    "group_quantity": size,
+                })
+    return on_off, lineups
+
+
+def fetch_on_off(pairs=ON_OFF_PAIRS):
+    """On/off views for (player, anchor teammate, team) pairs.
+
+    TeamPlayerOnOffDetails and TeamDashLineups cover a whole roster, so
+    each is fetched once per (team, season, measure / lineup size) and every
+    pair is read out of id-keyed indexes of the responses. Adding players
+    costs no extra requests. Also writes lineups.json: every 2- to 5-man
+    lineup each pair's player appeared in, and on_off_jokic.json from the
+    Braun–Jokic view, whether or not `pairs` lists it.
+    """
+    print("Fetching on/off data...")
+    teams = on_off_teams(pairs)
+    on_off_requests, lineup_requests = on_off_plan(teams)
+    on_off_jobs = submit_all(on_off_requests)
+    lineup_jobs = submit_all(lineup_requests)
+
+    on_off_index = {}
+    for (team, season, measure), job in on_off_jobs.items():
         try:
-            resp = retry_call(
-                TeamDashLineups,
-                team_id=NUGGETS_ID,
-                season=season,
-                group_quantity=2,
-            )
-            raw = resp.get_dict()
-            lineups_set = raw["resultSets"][0]
-            lineups = rows_to_dicts(lineups_set)
-
-            braun_jokic_pair = None
-            for lineup in lineups:
-                group_set = lineup.get("GROUP_SET", "")
-                group_id = lineup.get("GROUP_ID", "")
-                ids = str(group_id).split("-") if group_id else []
-                names = group_set if group_set else ""
-                if (str(BRAUN_ID) in ids and str(JOKIC_ID) in ids) or (
-                    "Braun" in names and "Jokic" in names
-                ):
-                    braun_jokic_pair = lineup
-                    break
-            lineup_pairs[season] = braun_jokic_pair
+            on_off_index[(team, season, measure)] = index_on_off(job.result().get_dict())
+            print(f"  {team} {season} ({measure}): ok")
         except Exception as e:
-            print(f"    Warning: {e}")
-        api_delay()
+            print(f"  {team} {season} ({measure}): Warning: {e}")
 
+    lineup_index = {team: LineupIndex() for team in teams}
+    for (team, season, size), job in lineup_jobs.items():
+        try:
+            lineups = rows_to_dicts(result_set(job.result().get_dict(), "Lineups"))
+            lineup_index[team].add(season, lineups)
+            print(f"  {team} {season} {size}-man lineups: ok")
+        except Exception as e:
+            print(f"  {team} {season} {size}-man lineups: Warning: {e}")
+
+    expanded = []
+    for player, anchor, team in pairs:
+        if player != "*":
+            expanded.append((player, anchor, team))
+            continue
+        listed = {pid for (t, _, _), (on, _) in on_off_index.items() if t == team for pid in on}
+        expanded += [(pid, anchor, team) for pid in sorted(listed) if pid != anchor]
+
+    def view(player, anchor, team):
+        on_off = {}
+        for season in SEASONS:
+            on_off[season] = {}
+            for measure in ON_OFF_MEASURES:
+                if (team, season, measure) not in on_off_index:
+                    continue
+                on, off = on_off_index[(team, season, measure)]
+                on_off[season][measure.lower()] = {
+                    "anchor_on": on.get(anchor),
+                    "anchor_off": off.get(anchor),
+                    "player_on": on.get(player),
+                    "player_off": off.get(player),
+                }
+        lineup_pairs = {
+            season: lineup_index[team].get(season, (player, anchor))
+            for season in lineup_index[team].seasons()
+        }
+        return {
+            "player_id": player,
+            "anchor_id": anchor,
+            "team_id": team,
+            "on_off": on_off,
+            "lineup_pairs": lineup_pairs,
+        }
+
+    views = {f"{player}-{anchor}": view(player, anchor, team) for player, anchor, team in dict.fromkeys(expanded)}
+    write_json("on_off_pairs.json", {"pairs": views})
+    players = dict.fromkeys((player, team) for player, _, team in expanded)
+    write_json("lineups.json", {
+        "players": {str(player): lineup_index[team].player_table(player) for player, team in players},
+    })
+
+    # on_off_jokic.json keeps the shape the frontend reads.
+    braun_jokic = views.get(f"{BRAUN_ID}-{JOKIC_ID}")
+    if not braun_jokic or braun_jokic["team_id"] != NUGGETS_ID:
+        braun_jokic = view(BRAUN_ID, JOKIC_ID, NUGGETS_ID)
+    on_off_data = {
+        season: {
+            measure: {"jokic_on": v["anchor_on"], "jokic_off": v["anchor_off"]}
+            for measure, v in measures.items()
+        }
+        for season, measures in braun_jokic["on_off"].items()
+    }
     write_json(
         "on_off_jokic.json",
-        {"on_off": on_off_data, "lineup_pairs": lineup_pairs},
+        {"on_off": on_off_data, "lineup_pairs": braun_jokic["lineup_pairs"]},
+        player_id=BRAUN_ID,
     )
 
 
+def general_splits_requests():
+    return {season: (PlayerDashboardByGeneralSplits, {"player_id": BRAUN_ID, "season": season}) for season in SEASONS}
+
+
 def fetch_general_splits():
     print("Fetching general splits...")
-    splits_data = {}
+    jobs = submit_all(general_splits_requests())
 
-    for season in SEASONS:
-        print(f"  Season {season}...")
+    splits_data = {}
+    for season, job in jobs.items():
         try:
-            resp = retry_call(
-                PlayerDashboardByGeneralSplits,
-                player_id=BRAUN_ID,
-                season=season,
-            )
-            raw = resp.get_dict()
+            raw = job.result().get_dict()
             result_sets = {}
             for rs in raw["resultSets"]:
                 result_sets[rs["name"]] = rows_to_dicts(rs)
@@ -223,26 +431,25 @@ def fetch_general_splits():
                 ),
                 "days_rest": result_sets.get("DaysRestPlayerDashboard", []),
             }
+            print(f"  Season {season}: ok")
         except Exception as e:
-            print(f"    Warning: {e}")
-        api_delay()
+            print(f"  Season {season}: Warning: {e}")
 
     write_json("general_splits.json", splits_data)
 
 
+def shooting_splits_requests():
+    return {season: (PlayerDashboardByShootingSplits, {"player_id": BRAUN_ID, "season": season}) for season in SEASONS}
+
+
 def fetch_shooting_splits():
     print("Fetching shooting splits...")
-    shooting_data = {}
+    jobs = submit_all(shooting_splits_requests())
 
-    for season in SEASONS:
-        print(f"  Season {season}...")
+    shooting_data = {}
+    for season, job in jobs.items():
         try:
-            resp = retry_call(
-                PlayerDashboardByShootingSplits,
-                player_id=BRAUN_ID,
-                season=season,
-            )
-            raw = resp.get_dict()
+            raw = job.result().get_dict()
             result_sets = {}
             for rs in raw["resultSets"]:
                 result_sets[rs["name"]] = rows_to_dicts(rs)
@@ -256,90 +463,238 @@ def fetch_shooting_splits():
                     result_sets.get("AssistedShotPlayerDashboard", []),
                 ),
             }
+            print(f"  Season {season}: ok")
         except Exception as e:
-            print(f"    Warning: {e}")
-        api_delay()
+            print(f"  Season {season}: Warning: {e}")
 
     write_json("shooting_splits.json", shooting_data)
 
 
+def career_requests():
+    return {
+        measure: (PlayerDashboardByYearOverYear, {"player_id": BRAUN_ID, "measure_type_detailed": measure})
+        for measure in ["Base", "Advanced"]
+    }
+
+
 def fetch_career():
     print("Fetching career year-over-year...")
-    career_data = {}
+    jobs = submit_all(career_requests())
 
-    for measure in ["Base", "Advanced"]:
-        print(f"  {measure}...")
+    career_data = {}
+    for measure, job in jobs.items():
         try:
-            resp = retry_call(
-                PlayerDashboardByYearOverYear,
-                player_id=BRAUN_ID,
-                measure_type_detailed=measure,
-            )
-            raw = resp.get_dict()
+            raw = job.result().get_dict()
             for rs in raw["resultSets"]:
                 if rs["name"] == "ByYearPlayerDashboard":
                     career_data[measure.lower()] = rows_to_dicts(rs)
+            print(f"  {measure}: ok")
         except Exception as e:
-            print(f"    Warning ({measure}): {e}")
-        api_delay()
+            print(f"  Warning ({measure}): {e}")
 
     write_json("career.json", career_data)
 
 
-def fetch_shot_chart():
-    print("Fetching shot chart detail...")
-    all_shots = []
+def shot_chart_plan(incremental=False):
+    """(groups, marks, final, requests) as for game_log_plan(), per season."""
+    groups, marks = {}, {}
+    if incremental:
+        groups, marks = incremental_plan("shot_chart.json", "shots", ("SEASON",), "GAME_ID")
+    final = final_groups("shot_chart.json")
 
+    requests = {}
     for season in SEASONS:
-        print(f"  Season {season}...")
+        if incremental and is_final((season,), groups, final):
+            continue
+        since = marks[(season,)][0] if (season,) in marks else None
+        requests[season] = (ShotChartDetail, {
+            "player_id": BRAUN_ID,
+            "team_id": NUGGETS_ID,
+            "season_nullable": season,
+            "context_measure_simple": "FGA",
+            "date_from_nullable": since.strftime("%m/%d/%Y") if since else "",
+        })
+    return groups, marks, final, requests
+
+
+def fetch_shot_chart(incremental=False):
+    print(f"Fetching shot chart detail{' (incremental)' if incremental else ''}...")
+    groups, marks, final, requests = shot_chart_plan(incremental)
+    jobs = submit_all(requests)
+
+    for season, job in jobs.items():
         try:
-            resp = retry_call(
-                ShotChartDetail,
-                player_id=BRAUN_ID,
-                team_id=NUGGETS_ID,
-                season_nullable=season,
-                context_measure_simple="FGA",
-            )
-            raw = resp.get_dict()
+            raw = job.result().get_dict()
             result_set = raw["resultSets"][0]
             shots = rows_to_dicts(result_set)
             for s in shots:
                 s["SEASON"] = season
-            all_shots.extend(shots)
-            print(f"    Found {len(shots)} shots")
+            if (season,) in marks:
+                since = marks[(season,)][0]
+                groups[(season,)], changes = merge_window(
+                    groups[(season,)], shots, since, "GAME_ID", newest_first=False
+                )
+                print(f"  Season {season}: since {since}: {changes['added']} games added, "
+                      f"{changes['updated']} updated, {changes['dropped']} dropped")
+            else:
+                groups[(season,)] = shots
+                print(f"  Season {season}: found {len(shots)} shots")
+            if season_is_complete(season):
+                final.add((season,))
         except Exception as e:
-            print(f"    Warning: {e}")
-        api_delay()
+            print(f"  Season {season}: Warning: {e}")
+
+    all_shots = [s for season in SEASONS for s in groups.get((season,), [])]
+    write_json("shot_chart.json", {"shots": all_shots}, final_groups=sorted(map(list, final)))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--offline", action="store_true",
+                        help="serve every request from the response cache; never touch the network")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="bypass the response cache and refetch everything")
+    parser.add_argument("--columnar", action="store_true",
+                        help="write game_log.json and shot_chart.json in the compact columnar format")
+    parser.add_argument("--compact", action="store_true",
+                        help="write JSON without indentation")
+    parser.add_argument("--compress", default="",
+                        help="also write precompressed siblings, e.g. gz or gz,br")
+    parser.add_argument("--shard", action="store_true",
+                        help="also write game_log.json and shot_chart.json per season, with an index.json")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only refetch game logs and shots for seasons that can still change")
+    parser.add_argument("--on-off-pairs", metavar="PLAYER:ANCHOR[@TEAM],...",
+                        help="on/off views to build, e.g. '*:203999' for every Nuggets player "
+                             "with Jokic as anchor (default: Braun with Jokic)")
+    parser.add_argument("--record", metavar="DIR",
+                        help="also save every response into a fixture directory for standin.py")
+    parser.add_argument("--standin", metavar="URL", default=os.environ.get(STANDIN_ENV),
+                        help=f"send requests to a standin.py server (default: ${STANDIN_ENV})")
+    parser.add_argument("--report", metavar="PATH", default=default_path("fetch_stats"),
+                        help="where to write the JSON run report")
+    parser.add_argument("--store", metavar="PATH",
+                        help=f"SQLite store the JSON files are exported from (default: <output>/{STORE_FILE})")
+    parser.add_argument("--state", metavar="PATH", default=state_path("fetch_stats"),
+                        help="where to remember step input hashes between runs")
+    parser.add_argument("--force", action="store_true",
+                        help="rerun derived steps even when their inputs have not changed")
+    parser.add_argument("--steps", metavar="STEP,...",
+                        help="only run these steps, e.g. game_logs,shot_chart (default: all)")
+    parser.add_argument("--seasons", metavar="SEASON,...",
+                        help="only fetch these seasons, e.g. 2025-26; the store keeps the others")
+    parser.add_argument("--plan", action="store_true",
+                        help="print the requests a run would make and the cache entries it would hit, then exit")
+    return parser
+
+
+def use_seasons(labels):
+    """Limit the run to the seasons listed in `labels` ("2024-25,2025-26")."""
+    global SEASONS
+    SEASONS = select_seasons(SEASONS, labels)
+
+
+def start(args, steps=None):
+    """Set up the cache, scheduler, writer and request layer for a run with `args`.
+    `steps` matches fetch_bbref.start(); nothing is prefetched here, every request
+    is made by the step that needs it."""
+    global cache, writer, handoff, scheduler, recorder, report, http, store
+    report = RunReport("fetch_stats")
+    cache = ResponseCache(offline=args.offline, enabled=not args.no_cache)
+    scheduler = Scheduler(max_workers=MAX_WORKERS)
+    http = Resilience(REQUEST_RATE, RetryPolicy(MAX_RETRIES, RETRY_WAIT, RETRY_CAP), report=report)
+    recorder = FixtureRecorder(args.record) if args.record else None
+    if args.standin:
+        use_standin(args.standin)
+    store = Store(args.store or os.path.join(OUTPUT_DIR, STORE_FILE), OUTPUT_DIR)
+    handoff = Handoff(OutputWriter(OUTPUT_DIR, compact=args.compact, columnar=args.columnar,
+                                   compress=[c for c in args.compress.split(",") if c], shard=args.shard))
+    writer = StoreWriter(handoff, store)
+
+
+def plan_steps(args):
+    on_off_pairs = parse_on_off_pairs(args.on_off_pairs) if args.on_off_pairs else ON_OFF_PAIRS
+    teams = on_off_teams(on_off_pairs)
+    return [
+        Step("Player Overview", fetch_player_overview, ("player_overview.json",),
+             requests=lambda: list(player_overview_requests().values())),
+        Step("Game Logs", lambda: fetch_game_logs(incremental=args.incremental), ("game_log.json",),
+             requests=lambda: list(game_log_plan(args.incremental)[3].values())),
+        Step("On/Off", lambda: fetch_on_off(on_off_pairs), ("on_off_jokic.json", "on_off_pairs.json", "lineups.json"),
+             requests=lambda: [r for plan in on_off_plan(teams) for r in plan.values()]),
+        Step("General Splits", fetch_general_splits, ("general_splits.json",),
+             requests=lambda: list(general_splits_requests().values())),
+        Step("Shooting Splits", fetch_shooting_splits, ("shooting_splits.json",),
+             requests=lambda: list(shooting_splits_requests().values())),
+        Step("Career", fetch_career, ("career.json",),
+             requests=lambda: list(career_requests().values())),
+        Step("Shot Chart", lambda: fetch_shot_chart(incremental=args.incremental), ("shot_chart.json",),
+             requests=lambda: list(shot_chart_plan(args.incremental)[3].values())),
+    ]
 
-    write_json("shot_chart.json", {"shots": all_shots})
 
+def finish(wait=True):
+    """Stop the request pool and persist the cache, fixtures and store.
+    wait=False abandons requests still queued (refresh.py, once it has what it needs)."""
+    if not wait:
+        http.close()
+    scheduler.shutdown(wait=wait)
+    cache.save()
+    if recorder is not None:
+        recorder.save()
+    store.close()
+
+
+def plan(args, steps):
+    """--plan: print what a run with `args` would request, without starting one."""
+    global cache, store
+    cache = ResponseCache(offline=args.offline, enabled=not args.no_cache)
+    # --incremental plans from what is already stored
+    store = Store(args.store or os.path.join(OUTPUT_DIR, STORE_FILE), OUTPUT_DIR)
+    if args.standin:
+        use_standin(args.standin)
+    print(f"BraunStats Data Pipeline — plan for {', '.join(s.name for s in steps)}")
+    print(f"Seasons: {SEASONS}")
+    print("=" * 50)
+    print_plan(steps, describe, cache, 1 / REQUEST_RATE)
+    store.close()
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        if args.seasons:
+            use_seasons(args.seasons)
+        steps = select_steps(plan_steps(args), args.steps)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.plan:
+        plan(args, steps)
+        return
+    start(args)
 
-def main():
     print("BraunStats Data Pipeline")
     print(f"Output directory: {OUTPUT_DIR}")
     print(f"Seasons: {SEASONS}")
+    print(f"Rate limit: {REQUEST_RATE} req/s, {MAX_WORKERS} workers")
     print("=" * 50)
 
-    steps = [
-        ("Player Overview", fetch_player_overview),
-        ("Game Logs", fetch_game_logs),
-        ("Jokic On/Off", fetch_on_off_jokic),
-        ("General Splits", fetch_general_splits),
-        ("Shooting Splits", fetch_shooting_splits),
-        ("Career", fetch_career),
-        ("Shot Chart", fetch_shot_chart),
-    ]
-    succeeded = 0
-    for name, fn in steps:
-        try:
-            fn()
-            succeeded += 1
-        except Exception as e:
-            print(f"  FAILED {name}: {e}")
-            print(f"  Skipping and continuing...")
+    # Steps run side by side so every request lands in the shared scheduler
+    # queue up front; the token bucket keeps the combined rate in check.
+    started = time.monotonic()
+    results = run_steps(steps, handoff, store.data, report=report,
+                        state=args.state, force=args.force)
+    succeeded = report_failures(results)
+    finish()
 
     print("=" * 50)
-    print(f"Done! {succeeded}/{len(steps)} data files written.")
+    writer.report()
+    writer.save()
+    report.summary()
+    report.save(args.report)
+    print(f"Cache: {cache.hits} hits, {cache.misses} misses{' (offline)' if cache.offline else ''}")
+    print(f"Done! {succeeded}/{len(steps)} data files written in {time.monotonic() - started:.0f}s.")
 
 
 if __name__ == "__main__":
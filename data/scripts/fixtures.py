@@ -0,0 +1,89 @@
+"""
+Recorded upstream responses for offline end-to-end runs.
+A fixture directory holds the raw bodies of every stats.nba.com and BBRef
+request a run made, plus a manifest.json mapping each request — URL path and
+sorted query parameters, host ignored — to its body file. FixtureRecorder
+writes one (fetch_stats.py / fetch_bbref.py --record DIR); FixtureStore reads
+it back for standin.py.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlencode, urlsplit
+
+FIXTURE_VERSION = 1
+STANDIN_ENV = "BRAUNSTATS_STANDIN"  # base URL of a running standin.py, e.g. http://127.0.0.1:8765
+
+
+def fixture_key(url, params=None):
+    """Request identity shared by the recorder and the server: path plus sorted params.
+    None-valued params are left out, as requests leaves them out of the query string."""
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None)
+    path = urlsplit(url).path or "/"
+    return f"{path}?{urlencode(items)}" if items else path
+
+
+def _load_manifest(root):
+    try:
+        with open(os.path.join(root, "manifest.json")) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != FIXTURE_VERSION:
+        raise ValueError(f"{root}: fixture version {manifest.get('version')!r}, expected {FIXTURE_VERSION}")
+    return manifest
+
+
+class FixtureRecorder:
+    def __init__(self, root):
+        self.root = root
+        manifest = _load_manifest(root) or {}
+        self.entries = manifest.get("entries", {})
+        self._lock = threading.Lock()
+
+    def record(self, url, body, params=None, content_type="application/json"):
+        """Store one response body; a later recording of the same request replaces it."""
+        key = fixture_key(url, params)
+        ext = "json" if "json" in content_type else "html"
+        name = f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}.{ext}"
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, f"{name}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(body)
+        os.replace(tmp, os.path.join(self.root, name))
+        with self._lock:
+            self.entries[key] = {
+                "file": name,
+                "url": url,
+                "content_type": content_type,
+                "recorded_at": datetime.now(timezone.utc).isoformat(),
+            }
+
+    def save(self):
+        with self._lock:
+            manifest = {"version": FIXTURE_VERSION, "entries": dict(sorted(self.entries.items()))}
+        path = os.path.join(self.root, "manifest.json")
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(f"{path}.tmp", path)
+        print(f"Fixtures: {len(self.entries)} responses in {self.root}")
+
+
+class FixtureStore:
+    def __init__(self, root):
+        manifest = _load_manifest(root)
+        if manifest is None:
+            raise FileNotFoundError(f"no fixture manifest in {root}")
+        self.root = root
+        self.entries = manifest["entries"]
+
+    def lookup(self, path, params=None):
+        """(body bytes, content type) for a request, or None if it was never recorded."""
+        entry = self.entries.get(fixture_key(path, params))
+        if entry is None:
+            return None
+        with open(os.path.join(self.root, entry["file"]), "rb") as f:
+            return f.read(), entry["content_type"]
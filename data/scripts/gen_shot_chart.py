@@ -2,8 +2,6 @@ import json
 import random
 import math
 
-random.seed(42)
-
 opponents = [
     "LAL", "GSW", "PHX", "LAC", "MIN", "OKC", "BOS", "MIL", "NYK", "PHI",
     "MIA", "SAC", "DAL", "HOU", "SAS", "POR", "UTA", "CLE", "ATL", "CHI",
@@ -113,62 +111,73 @@ def gen_game_dates_ids(season_str, num_games, start_game_id_offset):
     return games
 
 
+# Box zones: (x range, y range, x/y gauss sigma, x clamp, y clamp, shot type).
+# A shot draws a uniform point in the ranges, jitters it, truncates and clamps.
+BOX_ZONES = {
+    "Restricted Area": ((-30, 30), (-10, 40), (8, 6), (-40, 40), (-10, 50), "2PT Field Goal"),
+    "In The Paint (Non-RA)": ((-80, 80), (40, 140), (12, 15), (-90, 90), (35, 150), "2PT Field Goal"),
+    "Mid-Range": ((-160, 160), (50, 200), (20, 15), (-175, 175), (40, 210), "2PT Field Goal"),
+    "Left Corner 3": ((-230, -210), (-10, 40), (5, 8), (-245, -200), (-15, 50), "3PT Field Goal"),
+    "Right Corner 3": ((210, 230), (-10, 40), (5, 8), (200, 245), (-15, 50), "3PT Field Goal"),
+}
+# Above the break: a point on the 3pt arc at a uniform angle and jittered radius.
+ARC_ZONE = "Above the Break 3"
+ARC_ANGLE = (0.15, math.pi - 0.15)
+ARC_RADIUS = (237.5, 15, 220, 280)  # mean, sigma, clamp
+ARC_CLAMP = ((-240, 240), (90, 310))  # x, y
+
+# Per season: (season, games, first game id offset, [(zone, shots, make pct), ...])
+SEASON_PLAN = [
+    # ~665 shots across ~55 games
+    ("2024-25", 55, 100, [
+        ("Restricted Area", 175, 0.72), ("In The Paint (Non-RA)", 100, 0.44),
+        ("Mid-Range", 120, 0.41), ("Left Corner 3", 55, 0.40),
+        ("Right Corner 3", 60, 0.45), ("Above the Break 3", 155, 0.32),
+    ]),
+    # ~100 shots, more restricted area, less 3s
+    ("2023-24", 65, 200, [
+        ("Restricted Area", 40, 0.68), ("In The Paint (Non-RA)", 20, 0.40),
+        ("Mid-Range", 15, 0.38), ("Left Corner 3", 8, 0.35),
+        ("Right Corner 3", 7, 0.36), ("Above the Break 3", 10, 0.28),
+    ]),
+    # ~50 shots, mostly paint
+    ("2022-23", 50, 300, [
+        ("Restricted Area", 25, 0.70), ("In The Paint (Non-RA)", 10, 0.42),
+        ("Mid-Range", 7, 0.36), ("Left Corner 3", 3, 0.33),
+        ("Right Corner 3", 2, 0.33), ("Above the Break 3", 3, 0.25),
+    ]),
+]
+
+
+def shot_location(zone):
+    if zone == ARC_ZONE:
+        angle = random.uniform(*ARC_ANGLE)
+        mean, sigma, lo, hi = ARC_RADIUS
+        radius = mean + random.gauss(0, sigma)
+        radius = max(lo, min(hi, radius))
+        base_x = radius * math.cos(angle)
+        loc_x = int(base_x if random.random() < 0.5 else -base_x)
+        loc_y = int(abs(radius * math.sin(angle)))
+        (x_lo, x_hi), (y_lo, y_hi) = ARC_CLAMP
+        loc_y = max(y_lo, min(y_hi, loc_y))
+        loc_x = max(x_lo, min(x_hi, loc_x))
+        return loc_x, loc_y, "3PT Field Goal"
+    x_range, y_range, (x_sigma, y_sigma), (x_lo, x_hi), (y_lo, y_hi), shot_type = BOX_ZONES[zone]
+    loc_x = random.randint(*x_range)
+    loc_y = random.randint(*y_range)
+    loc_x = int(loc_x + random.gauss(0, x_sigma))
+    loc_y = int(loc_y + random.gauss(0, y_sigma))
+    loc_x = max(x_lo, min(x_hi, loc_x))
+    loc_y = max(y_lo, min(y_hi, loc_y))
+    return loc_x, loc_y, shot_type
+
+
 def generate_shots_for_zone(zone, count, make_pct, season, games):
     shots = []
     for _ in range(count):
         game = random.choice(games)
         game_id, game_date, matchup = game
-
-        if zone == "Restricted Area":
-            loc_x = random.randint(-30, 30)
-            loc_y = random.randint(-10, 40)
-            loc_x = int(loc_x + random.gauss(0, 8))
-            loc_y = int(loc_y + random.gauss(0, 6))
-            loc_x = max(-40, min(40, loc_x))
-            loc_y = max(-10, min(50, loc_y))
-            shot_type = "2PT Field Goal"
-        elif zone == "In The Paint (Non-RA)":
-            loc_x = random.randint(-80, 80)
-            loc_y = random.randint(40, 140)
-            loc_x = int(loc_x + random.gauss(0, 12))
-            loc_y = int(loc_y + random.gauss(0, 15))
-            loc_x = max(-90, min(90, loc_x))
-            loc_y = max(35, min(150, loc_y))
-            shot_type = "2PT Field Goal"
-        elif zone == "Mid-Range":
-            loc_x = random.randint(-160, 160)
-            loc_y = random.randint(50, 200)
-            loc_x = int(loc_x + random.gauss(0, 20))
-            loc_y = int(loc_y + random.gauss(0, 15))
-            loc_x = max(-175, min(175, loc_x))
-            loc_y = max(40, min(210, loc_y))
-            shot_type = "2PT Field Goal"
-        elif zone == "Left Corner 3":
-            loc_x = random.randint(-230, -210)
-            loc_y = random.randint(-10, 40)
-            loc_x = int(loc_x + random.gauss(0, 5))
-            loc_y = int(loc_y + random.gauss(0, 8))
-            loc_x = max(-245, min(-200, loc_x))
-            loc_y = max(-15, min(50, loc_y))
-            shot_type = "3PT Field Goal"
-        elif zone == "Right Corner 3":
-            loc_x = random.randint(210, 230)
-            loc_y = random.randint(-10, 40)
-            loc_x = int(loc_x + random.gauss(0, 5))
-            loc_y = int(loc_y + random.gauss(0, 8))
-            loc_x = max(200, min(245, loc_x))
-            loc_y = max(-15, min(50, loc_y))
-            shot_type = "3PT Field Goal"
-        elif zone == "Above the Break 3":
-            angle = random.uniform(0.15, math.pi - 0.15)
-            radius = 237.5 + random.gauss(0, 15)
-            radius = max(220, min(280, radius))
-            base_x = radius * math.cos(angle)
-            loc_x = int(base_x if random.random() < 0.5 else -base_x)
-            loc_y = int(abs(radius * math.sin(angle)))
-            loc_y = max(90, min(310, loc_y))
-            loc_x = max(-240, min(240, loc_x))
-            shot_type = "3PT Field Goal"
+        loc_x, loc_y, shot_type = shot_location(zone)
 
         made = 1 if random.random() < make_pct else 0
         dist = shot_distance(loc_x, loc_y)
@@ -192,50 +201,31 @@ def generate_shots_for_zone(zone, count, make_pct, season, games):
     return shots
 
 
-# ---- 2024-25 Season: ~665 shots across ~55 games ----
-games_2425 = gen_game_dates_ids("2024-25", 55, 100)
-all_shots = []
-
-all_shots += generate_shots_for_zone("Restricted Area", 175, 0.72, "2024-25", games_2425)
-all_shots += generate_shots_for_zone("In The Paint (Non-RA)", 100, 0.44, "2024-25", games_2425)
-all_shots += generate_shots_for_zone("Mid-Range", 120, 0.41, "2024-25", games_2425)
-all_shots += generate_shots_for_zone("Left Corner 3", 55, 0.40, "2024-25", games_2425)
-all_shots += generate_shots_for_zone("Right Corner 3", 60, 0.45, "2024-25", games_2425)
-all_shots += generate_shots_for_zone("Above the Break 3", 155, 0.32, "2024-25", games_2425)
-
-# ---- 2023-24 Season: ~100 shots, more restricted area, less 3s ----
-games_2324 = gen_game_dates_ids("2023-24", 65, 200)
-
-all_shots += generate_shots_for_zone("Restricted Area", 40, 0.68, "2023-24", games_2324)
-all_shots += generate_shots_for_zone("In The Paint (Non-RA)", 20, 0.40, "2023-24", games_2324)
-all_shots += generate_shots_for_zone("Mid-Range", 15, 0.38, "2023-24", games_2324)
-all_shots += generate_shots_for_zone("Left Corner 3", 8, 0.35, "2023-24", games_2324)
-all_shots += generate_shots_for_zone("Right Corner 3", 7, 0.36, "2023-24", games_2324)
-all_shots += generate_shots_for_zone("Above the Break 3", 10, 0.28, "2023-24", games_2324)
-
-# ---- 2022-23 Season: ~50 shots, mostly paint ----
-games_2223 = gen_game_dates_ids("2022-23", 50, 300)
-
-all_shots += generate_shots_for_zone("Restricted Area", 25, 0.70, "2022-23", games_2223)
-all_shots += generate_shots_for_zone("In The Paint (Non-RA)", 10, 0.42, "2022-23", games_2223)
-all_shots += generate_shots_for_zone("Mid-Range", 7, 0.36, "2022-23", games_2223)
-all_shots += generate_shots_for_zone("Left Corner 3", 3, 0.33, "2022-23", games_2223)
-all_shots += generate_shots_for_zone("Right Corner 3", 2, 0.33, "2022-23", games_2223)
-all_shots += generate_shots_for_zone("Above the Break 3", 3, 0.25, "2022-23", games_2223)
-
-# Shuffle then sort by date for chronological order
-random.shuffle(all_shots)
-all_shots.sort(key=lambda s: s["GAME_DATE"])
-
-result = {
-    "meta": {
-        "generated_at": "2026-02-22T12:00:00Z",
-        "season": None
-    },
-    "data": {
-        "shots": all_shots
+def main():
+    random.seed(42)
+    all_shots = []
+    for season, num_games, id_offset, zones in SEASON_PLAN:
+        games = gen_game_dates_ids(season, num_games, id_offset)
+        for zone, count, make_pct in zones:
+            all_shots += generate_shots_for_zone(zone, count, make_pct, season, games)
+
+    # Shuffle then sort by date for chronological order
+    random.shuffle(all_shots)
+    all_shots.sort(key=lambda s: s["GAME_DATE"])
+
+    result = {
+        "meta": {
+            "generated_at": "2026-02-22T12:00:00Z",
+            "season": None
+        },
+        "data": {
+            "shots": all_shots
+        }
     }
-}
 
-output = json.dumps(result, indent=2)
-print(output)
+    output = json.dumps(result, indent=2)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Synthetic league-wide shot data for load testing the pipeline and frontend.
+Uses the zone model of gen_shot_chart.py (zone shapes, action mixes, zone
+areas, distances, and the 2024-25 zone mix and make rates) but generates with
+NumPy a block of shots at a time, for any number of seasons and players.
+
+Each season draws from its own random stream, derived from (seed, season), so a
+season's shots do not change when other seasons are added or removed. Shots are
+written to the output file block by block, in the shot_chart.json shape plus a
+PLAYER_ID column, so memory stays flat however many are requested.
+
+Usage:
+    python data/scripts/gen_shots.py --out /tmp/shots.json
+    python data/scripts/gen_shots.py --out /tmp/shots.json --players 500 --shots-per-player 2000 \\
+        --seasons 2015-16:2024-25 --seed 7
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from gen_shot_chart import (
+    ARC_ANGLE, ARC_CLAMP, ARC_RADIUS, ARC_ZONE, BOX_ZONES, SEASON_PLAN,
+    action_types_by_zone, opponents,
+)
+
+TEAMS = ["DEN"] + opponents
+GAMES_PER_TEAM = 82
+FIRST_PLAYER_ID = 1630000
+BLOCK_SHOTS = 200_000  # shots per random stream and per write
+DEFAULT_SEASONS = ["2022-23", "2023-24", "2024-25", "2025-26"]
+
+ZONES = list(action_types_by_zone)
+MODEL = dict((season, zones) for season, _, _, zones in SEASON_PLAN)["2024-25"]
+ZONE_P = np.array([count for _, count, _ in MODEL], dtype=float)
+ZONE_P /= ZONE_P.sum()
+MAKE_PCT = np.array([pct for _, _, pct in MODEL])
+assert [zone for zone, _, _ in MODEL] == ZONES
+
+ROW = (
+    '{"SEASON":%s,"PLAYER_ID":%d,"GAME_ID":%s,"GAME_DATE":%s,"LOC_X":%d,"LOC_Y":%d,'
+    '"SHOT_MADE_FLAG":%d,"SHOT_TYPE":%s,"SHOT_ZONE_BASIC":%s,"SHOT_ZONE_AREA":%s,'
+    '"SHOT_DISTANCE":%d,"ACTION_TYPE":%s,"MATCHUP":%s}'
+)
+
+
+def _encoded(values):
+    """Object array of JSON-encoded strings, so rows can be formatted without json.dumps."""
+    return np.array([json.dumps(v) for v in values], dtype=object)
+
+
+# ─── Zone model as lookup arrays, indexed by zone code ───
+
+def _zone_tables():
+    box = [BOX_ZONES.get(z, ((0, 0), (0, 0), (0, 0), (0, 0), (0, 0), "3PT Field Goal")) for z in ZONES]
+    tables = {
+        "x_range": np.array([b[0] for b in box]),
+        "y_range": np.array([b[1] for b in box]),
+        "sigma": np.array([b[2] for b in box], dtype=float),
+        "x_clamp": np.array([b[3] for b in box]),
+        "y_clamp": np.array([b[4] for b in box]),
+        "three": np.array([b[5].startswith("3PT") for b in box]),
+    }
+    actions = sorted({a for options in action_types_by_zone.values() for a, _ in options})
+    width = max(len(options) for options in action_types_by_zone.values())
+    cum = np.full((len(ZONES), width), np.inf)
+    codes = np.zeros((len(ZONES), width), dtype=np.int64)
+    for z, zone in enumerate(ZONES):
+        names, weights = zip(*action_types_by_zone[zone])
+        bounds = np.cumsum(weights) / sum(weights)
+        bounds[-1] = np.inf  # u < 1 always lands on a real action
+        cum[z, :len(bounds)] = bounds
+        codes[z, :len(names)] = [actions.index(a) for a in names]
+    tables.update(action_cum=cum, action_codes=codes, actions=_encoded(actions))
+    return tables
+
+
+TABLES = _zone_tables()
+AREAS = ["Center(C)", "Left Side(L)", "Left Side Center(LC)", "Right Side(R)", "Right Side Center(RC)"]
+ENCODED_ZONES = _encoded(ZONES)
+ENCODED_AREAS = _encoded(AREAS)
+ENCODED_SHOT_TYPES = _encoded(["2PT Field Goal", "3PT Field Goal"])
+ARC = ZONES.index(ARC_ZONE)
+
+
+def zone_areas(zone, loc_x):
+    """Vectorized gen_shot_chart.gen_zone_area, as codes into AREAS."""
+    left, right = ZONES.index("Left Corner 3"), ZONES.index("Right Corner 3")
+    ax = np.abs(loc_x)
+    return np.select(
+        [zone == left, zone == right, ax <= 60, loc_x < -60],
+        [1, 3, 0, np.where(ax > 150, 1, 2)],
+        np.where(ax > 150, 3, 4),
+    )
+
+
+def shot_locations(rng, zone):
+    """Vectorized gen_shot_chart.shot_location: (loc_x, loc_y) for an array of zone codes."""
+    n = len(zone)
+    t = TABLES
+    x = rng.integers(t["x_range"][zone, 0], t["x_range"][zone, 1], endpoint=True)
+    y = rng.integers(t["y_range"][zone, 0], t["y_range"][zone, 1], endpoint=True)
+    x = np.trunc(x + rng.normal(0, 1, n) * t["sigma"][zone, 0])
+    y = np.trunc(y + rng.normal(0, 1, n) * t["sigma"][zone, 1])
+    x = np.clip(x, t["x_clamp"][zone, 0], t["x_clamp"][zone, 1])
+    y = np.clip(y, t["y_clamp"][zone, 0], t["y_clamp"][zone, 1])
+
+    mean, sigma, r_lo, r_hi = ARC_RADIUS
+    angle = rng.uniform(*ARC_ANGLE, n)
+    radius = np.clip(mean + rng.normal(0, sigma, n), r_lo, r_hi)
+    base_x = radius * np.cos(angle)
+    arc_x = np.clip(np.trunc(np.where(rng.random(n) < 0.5, base_x, -base_x)), *ARC_CLAMP[0])
+    arc_y = np.clip(np.trunc(np.abs(radius * np.sin(angle))), *ARC_CLAMP[1])
+
+    arc = zone == ARC
+    return np.where(arc, arc_x, x).astype(np.int64), np.where(arc, arc_y, y).astype(np.int64)
+
+
+# ─── Seasons ───
+
+def season_rng(seed, start_year, *key):
+    """Random stream for one season (and optionally one block of it)."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(start_year, *key)))
+
+
+def season_schedule(seed, season):
+    """Each team's games for a season: (day index, game id, matchup) arrays of shape (teams, games),
+    plus the JSON-encoded date strings the day indexes point into.
+
+    The season is GAMES_PER_TEAM rounds on distinct days. Each round pairs every team with
+    another (TEAMS has an even count), and both sides of a game share its 10-character id,
+    e.g. 0022400001 for the first game of 2024-25."""
+    start_year = int(season[:4])
+    first = date(start_year, 10, 22)
+    days = (date(start_year + 1, 4, 13) - first).days + 1
+    rng = season_rng(seed, start_year)
+    n_teams = len(TEAMS)
+    per_round = n_teams // 2
+
+    round_day = np.sort(rng.choice(days, GAMES_PER_TEAM, replace=False))
+    pairs = rng.random((GAMES_PER_TEAM, n_teams)).argsort(axis=1)
+    home_team, away_team = pairs[:, :per_round], pairs[:, per_round:]
+    rounds = np.arange(GAMES_PER_TEAM)[:, None]
+    number = np.arange(GAMES_PER_TEAM * per_round).reshape(GAMES_PER_TEAM, per_round)
+
+    opp = np.empty((n_teams, GAMES_PER_TEAM), dtype=np.int64)
+    opp[home_team, rounds], opp[away_team, rounds] = away_team, home_team
+    home = np.zeros((n_teams, GAMES_PER_TEAM), dtype=bool)
+    home[home_team, rounds] = True
+    game = np.empty((n_teams, GAMES_PER_TEAM), dtype=np.int64)
+    game[home_team, rounds] = game[away_team, rounds] = number
+    day = np.broadcast_to(round_day, (n_teams, GAMES_PER_TEAM))
+
+    team = np.arange(n_teams)[:, None]
+    matchups = _encoded(
+        f"{TEAMS[t]} vs. {TEAMS[o]}" if h else f"{TEAMS[t]} @ {TEAMS[o]}"
+        for t, o, h in zip(np.broadcast_to(team, opp.shape).ravel(), opp.ravel(), home.ravel())
+    ).reshape(opp.shape)
+    game_ids = _encoded(f"002{season[2:4]}{n + 1:05d}" for n in game.ravel()).reshape(opp.shape)
+    dates = _encoded((first + timedelta(days=d)).strftime("%Y%m%d") for d in range(days))
+    return day, game_ids, matchups, dates
+
+
+def season_block(seed, season, schedule, players, shots_per_player, block):
+    """Rows (as JSON strings) for one block of a season's shots, by player then date."""
+    start_year = int(season[:4])
+    total = players * shots_per_player
+    lo, hi = block * BLOCK_SHOTS, min((block + 1) * BLOCK_SHOTS, total)
+    n = hi - lo
+    rng = season_rng(seed, start_year, block)
+    day, game_ids, matchups, dates = schedule
+
+    player = np.arange(lo, hi) // shots_per_player
+    team = player % len(TEAMS)
+    game = rng.integers(0, GAMES_PER_TEAM, n)
+    zone = rng.choice(len(ZONES), size=n, p=ZONE_P)
+    loc_x, loc_y = shot_locations(rng, zone)
+    made = rng.random(n) < MAKE_PCT[zone]
+    distance = np.round(np.hypot(loc_x, loc_y) / 10.0).astype(np.int64)
+    u = rng.random(n)
+    action = TABLES["action_codes"][zone, (u[:, None] >= TABLES["action_cum"][zone]).sum(axis=1)]
+
+    order = np.lexsort((day[team, game], player))
+    player, team, game, zone = player[order], team[order], game[order], zone[order]
+    loc_x, loc_y, made, distance, action = loc_x[order], loc_y[order], made[order], distance[order], action[order]
+
+    columns = (
+        [json.dumps(season)] * n,
+        (FIRST_PLAYER_ID + player).tolist(),
+        game_ids[team, game].tolist(),
+        dates[day[team, game]].tolist(),
+        loc_x.tolist(),
+        loc_y.tolist(),
+        made.astype(np.int64).tolist(),
+        ENCODED_SHOT_TYPES[TABLES["three"][zone].astype(np.int64)].tolist(),
+        ENCODED_ZONES[zone].tolist(),
+        ENCODED_AREAS[zone_areas(zone, loc_x)].tolist(),
+        distance.tolist(),
+        TABLES["actions"][action].tolist(),
+        matchups[team, game].tolist(),
+    )
+    return [ROW % row for row in zip(*columns)]
+
+
+# ─── Output ───
+
+def write_shots(path, seasons, players, shots_per_player, seed):
+    """Stream every season's shots into `path`; returns the number written."""
+    meta = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "season": None,
+        "source": "synthetic",
+        "seed": seed,
+        "players": players,
+        "shots_per_player": shots_per_player,
+    }
+    blocks = -(-players * shots_per_player // BLOCK_SHOTS)
+    written = 0
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write('{"meta": %s, "data": {"shots": [\n' % json.dumps(meta))
+        for season in seasons:
+            started = time.perf_counter()
+            schedule = season_schedule(seed, season)
+            for block in range(blocks):
+                rows = season_block(seed, season, schedule, players, shots_per_player, block)
+                f.write((",\n" if written else "") + ",\n".join(rows))
+                written += len(rows)
+            print(f"  {season}: {players * shots_per_player:,} shots in {time.perf_counter() - started:.1f}s",
+                  file=sys.stderr)
+        f.write("\n]}}\n")
+    os.replace(tmp, path)
+    return written
+
+
+def parse_seasons(spec):
+    """"2022-23,2024-25" or a range "2015-16:2024-25"."""
+    if ":" in spec:
+        first, last = (int(s[:4]) for s in spec.split(":"))
+        return [f"{y}-{(y + 1) % 100:02d}" for y in range(first, last + 1)]
+    return [s for s in spec.split(",") if s]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="output JSON file")
+    parser.add_argument("--seasons", default=",".join(DEFAULT_SEASONS),
+                        help='comma-separated seasons or a range, e.g. "2015-16:2024-25"')
+    parser.add_argument("--players", type=int, default=450, help="players per season (default: a league's worth)")
+    parser.add_argument("--shots-per-player", type=int, default=800, help="shots per player per season")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    seasons = parse_seasons(args.seasons)
+    started = time.perf_counter()
+    written = write_shots(args.out, seasons, args.players, args.shots_per_player, args.seed)
+    elapsed = time.perf_counter() - started
+    size = os.path.getsize(args.out)
+    print(f"Wrote {written:,} shots ({size / 2**20:.1f} MB) to {args.out} in {elapsed:.1f}s "
+          f"({written / elapsed:,.0f} shots/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
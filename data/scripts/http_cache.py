@@ -0,0 +1,180 @@
+"""
+On-disk HTTP response cache shared by fetch_stats.py and fetch_bbref.py.
+Entries are keyed by a hash of (namespace, normalized request) — the nba_api
+endpoint plus its sorted parameters, or the page URL for BBRef. Bodies live
+under data/.cache/http/<key[:2]>/<key>, with an index.json that tracks TTLs
+and last use for LRU eviction.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import date
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "http")
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+CURRENT_SEASON_TTL = 6 * 3600  # seconds; completed seasons never expire
+
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a request has no cached response."""
+
+
+def season_is_complete(season, today=None):
+    """A season — a "2024-25" label or a BBRef end year — is final once the
+    July after its end year arrives (playoffs are over)."""
+    if isinstance(season, str):
+        season = int(season[:4]) + 1
+    today = today or date.today()
+    return today >= date(season, 7, 1)
+
+
+def season_ttl(season):
+    """TTL for a response about `season` (label, BBRef end year, or None for undated)."""
+    if season is None:
+        return CURRENT_SEASON_TTL
+    return None if season_is_complete(season) else CURRENT_SEASON_TTL
+
+
+class ResponseCache:
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, offline=False, enabled=True):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.enabled = enabled or offline
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    @staticmethod
+    def key(namespace, request):
+        """Stable key for a request. `request` is a URL string or a params dict."""
+        if isinstance(request, dict):
+            request = json.dumps(
+                {str(k): "" if v is None else str(v) for k, v in request.items()},
+                sort_keys=True,
+            )
+        return hashlib.sha256(f"{namespace}\n{request}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached body, or None if missing or expired.
+        Offline mode serves expired entries too, since nothing else is available."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at = entry.get("expires_at")
+            if not self.offline and expires_at is not None and expires_at < time.time():
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    body = f.read()
+            except OSError:
+                del self._index[key]
+                self.misses += 1
+                return None
+            entry["last_used"] = time.time()
+            self.hits += 1
+            return body
+
+    def status(self, key):
+        """What get() would find for `key`: "hit", "expired" or "miss". Counts nothing."""
+        if not self.enabled:
+            return "miss"
+        with self._lock:
+            entry = self._index.get(key)
+        if entry is None or not os.path.exists(self._path(key)):
+            return "miss"
+        expires_at = entry.get("expires_at")
+        if not self.offline and expires_at is not None and expires_at < time.time():
+            return "expired"
+        return "hit"
+
+    def validators(self, key):
+        """ETag/Last-Modified of a stored entry (fresh or not) for a conditional request."""
+        if not self.enabled:
+            return {}
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None or not os.path.exists(self._path(key)):
+                return {}
+            return {k: entry[k] for k in ("etag", "last_modified") if entry.get(k)}
+
+    def revalidate(self, key, ttl=None):
+        """Server answered 304: extend the entry's TTL and return its body."""
+        with self._lock:
+            entry = self._index[key]
+            now = time.time()
+            entry["last_used"] = now
+            entry["expires_at"] = None if ttl is None else now + ttl
+            self._save_index()
+        with open(self._path(key), encoding="utf-8") as f:
+            return f.read()
+
+    def put(self, key, body, ttl=None, label=None, validators=None):
+        """Store `body`. ttl=None keeps the entry until it is evicted.
+        `validators` may carry the response's etag/last_modified for later revalidation."""
+        if not self.enabled:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(body)
+        os.replace(tmp, path)
+        now = time.time()
+        with self._lock:
+            self._index[key] = {
+                "label": label,
+                "size": len(body.encode("utf-8")),
+                "stored_at": now,
+                "last_used": now,
+                "expires_at": None if ttl is None else now + ttl,
+                **(validators or {}),
+            }
+            self._evict()
+            self._save_index()
+
+    def save(self):
+        if self.enabled:
+            with self._lock:
+                self._save_index()
+
+    def _evict(self):
+        total = sum(e["size"] for e in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda kv: kv[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            del self._index[key]
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.root, "index.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, "index.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, path)
@@ -0,0 +1,70 @@
+"""
+Pooled HTTP session for the BBRef scraper.
+One requests.Session keeps connections alive across page fetches, negotiates
+compressed responses, sends conditional headers for pages we already have, and
+caps how many requests may be in flight to each host at once.
+"""
+
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import brotli  # noqa: F401 — urllib3 decodes "br" only when this is installed
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+class PooledSession:
+    def __init__(self, headers=None, per_host=1, pool_size=4, timeout=30):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(headers or {})
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        self.session.headers["Connection"] = "keep-alive"
+        self.per_host = per_host
+        self.timeout = timeout
+        self.requests = 0
+        self.not_modified = 0
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def get(self, url, etag=None, last_modified=None, timeout=None):
+        """GET `url`, conditionally if validators are given. A 304 is returned as-is."""
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        with self._slot(url):
+            resp = self.session.get(url, headers=headers, timeout=timeout or self.timeout)
+        with self._lock:
+            self.requests += 1
+            if resp.status_code == 304:
+                self.not_modified += 1
+        return resp
+
+    def close(self):
+        self.session.close()
+
+
+def response_validators(resp):
+    """The validators of a 200 response, in the shape ResponseCache.put() stores."""
+    validators = {}
+    if resp.headers.get("ETag"):
+        validators["etag"] = resp.headers["ETag"]
+    if resp.headers.get("Last-Modified"):
+        validators["last_modified"] = resp.headers["Last-Modified"]
+    return validators
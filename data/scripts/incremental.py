@@ -0,0 +1,84 @@
+"""
+Helpers for incremental refreshes of the per-game outputs (game_log.json, shot_chart.json).
+A high-water mark is the latest GAME_DATE already stored for a (season, season type) group;
+a refresh refetches only the window from that date on and splices it back in.
+"""
+
+from datetime import datetime
+from functools import lru_cache
+
+DATE_FORMATS = ("%Y-%m-%d", "%Y%m%d", "%b %d, %Y")
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(s):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(s.title() if "," in s else s, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_game_date(value):
+    """Parse the GAME_DATE formats used across sources: 2024-10-22, 20241022, OCT 22, 2024."""
+    return _parse_date(str(value).strip())
+
+
+def group_rows(rows, group_fields):
+    """Split rows into {group: [rows]} keeping first-seen group order."""
+    groups = {}
+    for r in rows:
+        groups.setdefault(tuple(r.get(f) for f in group_fields), []).append(r)
+    return groups
+
+
+def high_water_marks(groups, id_field):
+    """{group: (latest date, id of a game on that date)} for each non-empty group."""
+    marks = {}
+    for group, rows in groups.items():
+        best = None
+        for r in rows:
+            d = parse_game_date(r.get("GAME_DATE"))
+            if d is not None and (best is None or d > best[0]):
+                best = (d, r.get(id_field))
+        if best:
+            marks[group] = best
+    return marks
+
+
+def _in_window(row, since):
+    d = parse_game_date(row.get("GAME_DATE"))
+    return d is None or d >= since
+
+
+def merge_window(existing, fresh, since, id_field, newest_first=True):
+    """Replace the rows of one group dated on/after `since` with `fresh`, in place.
+
+    `existing` must be date-ordered (as upstream returns it), so only the rows
+    inside the window are inspected or copied; the window is spliced out of the
+    list rather than the list being rebuilt. Returns (existing, change counts),
+    where the counts compare the window's ids with the fresh ones: added,
+    updated (rows whose content changed) and dropped.
+    """
+    if newest_first:
+        cut = 0
+        while cut < len(existing) and _in_window(existing[cut], since):
+            cut += 1
+        window = existing[:cut]
+        existing[:cut] = fresh
+    else:
+        cut = len(existing)
+        while cut > 0 and _in_window(existing[cut - 1], since):
+            cut -= 1
+        window = existing[cut:]
+        existing[cut:] = fresh
+
+    old = group_rows(window, (id_field,))
+    new = group_rows(fresh, (id_field,))
+    changes = {
+        "added": sum(1 for k in new if k not in old),
+        "updated": sum(1 for k in new if k in old and new[k] != old[k]),
+        "dropped": sum(1 for k in old if k not in new),
+    }
+    return existing, changes
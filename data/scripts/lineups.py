@@ -0,0 +1,57 @@
+"""
+Lineup index over TeamDashLineups result sets.
+Every 2- to 5-man lineup row of a season is keyed by the frozenset of its
+player ids, and each player maps to the lineups they appear in, so an exact
+group is one dict lookup and "lineups containing these players" intersects
+the (short) per-player lists instead of scanning every row.
+"""
+
+LINEUP_SIZES = (2, 3, 4, 5)
+
+
+def lineup_ids(group_id):
+    """Player ids of a lineup GROUP_ID such as "-1631128-203999-"."""
+    return frozenset(int(p) for p in str(group_id or "").split("-") if p.strip())
+
+
+class LineupIndex:
+    def __init__(self):
+        self._groups = {}  # (season, frozenset of ids) -> row
+        self._by_player = {}  # (season, player id) -> set of frozensets
+
+    def add(self, season, rows):
+        """Index lineup rows (dicts with GROUP_ID) for a season; returns how many were added."""
+        added = 0
+        for row in rows:
+            ids = lineup_ids(row.get("GROUP_ID"))
+            if not ids:
+                continue
+            self._groups[(season, ids)] = row
+            for pid in ids:
+                self._by_player.setdefault((season, pid), set()).add(ids)
+            added += 1
+        return added
+
+    def seasons(self):
+        return list(dict.fromkeys(season for season, _ in self._groups))
+
+    def get(self, season, players):
+        """The row for exactly this group of players, or None."""
+        return self._groups.get((season, frozenset(players)))
+
+    def containing(self, season, players, size=None):
+        """Rows of every lineup that includes all of `players` (optionally only `size`-man ones),
+        most minutes first."""
+        postings = sorted((self._by_player.get((season, pid), set()) for pid in set(players)), key=len)
+        if not postings:
+            return []
+        groups = postings[0].intersection(*postings[1:])
+        rows = [self._groups[(season, g)] for g in groups if size is None or len(g) == size]
+        return sorted(rows, key=lambda r: r.get("MIN") or 0, reverse=True)
+
+    def player_table(self, player, sizes=LINEUP_SIZES):
+        """{season: {"2": rows, ..., "5": rows}} of every lineup `player` appears in."""
+        return {
+            season: {str(size): self.containing(season, [player], size) for size in sizes}
+            for season in self.seasons()
+        }
@@ -0,0 +1,476 @@
+"""
+Output writer shared by fetch_stats.py and fetch_bbref.py.
+Documents are streamed to a temp file next to the target and moved into place
+with os.replace, so an interrupted run never leaves a truncated JSON file for
+the Vite build. Lists of rows (games, shots) are encoded one row at a time and
+may be generators, so the full document is never built as one string.
+Optionally writes compact JSON, the columnar format (see columnar.py), and
+precompressed .gz/.br siblings, and keeps a size report of every file written
+(with its row count and encode time, for the run report).
+
+The "data" section is hashed as it is encoded. A file whose hash matches
+manifest.json is left untouched, so a refresh that changed nothing leaves
+nothing to commit or deploy; save() records the new hashes in the manifest
+and appends what changed (game ids, seasons) to changelog.jsonl.
+
+With shard=True, game_log.json and shot_chart.json are also split into one
+file per season (and season type), e.g. game_log/2024-25.regular.json, with
+an index.json per directory listing each shard's rows, hash and date range,
+so the site can load the default season first and the rest on demand.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+
+from columnar import COLUMNAR_FILES, encode_doc, read_json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+INDENT = 2
+COMPRESSIONS = ("gz", "br")
+MANIFEST = "manifest.json"
+CHANGELOG = "changelog.jsonl"
+# Files whose changes are reported per game: filename -> (rows key, game id field).
+CHANGE_KEYS = {"game_log.json": ("games", "Game_ID"), "shot_chart.json": ("shots", "GAME_ID")}
+# Files split per season with shard=True: filename -> (rows key, fields one shard holds one value of).
+SHARD_FILES = {"game_log.json": ("games", ("SEASON", "SEASON_TYPE")), "shot_chart.json": ("shots", ("SEASON",))}
+SHARD_INDEX = "index.json"
+SEASON_TYPE_SLUGS = {"Regular Season": "regular", "Playoffs": "playoffs", "PlayIn": "playin"}
+
+
+class _Sink:
+    """Writes encoded chunks to the temp JSON file and to each compressor at once."""
+
+    def __init__(self, path, compress, track=None):
+        self.path = path
+        self.files = {None: open(f"{path}.tmp", "wb")}
+        self.compressors = {}
+        self.sizes = {None: 0}
+        self.rows = 0
+        self.hash = hashlib.sha256()
+        self.section = None  # top-level member being encoded; only "data" is hashed
+        self.member = None  # member of "data" being encoded
+        self.track = track  # (rows key, id field) to collect game digests for, or None
+        self.games = {}
+        for ext in compress:
+            self.files[ext] = open(f"{path}.{ext}.tmp", "wb")
+            self.sizes[ext] = 0
+            # wbits=31: gzip container, no filename/mtime, so output is reproducible
+            self.compressors[ext] = zlib.compressobj(9, zlib.DEFLATED, 31) if ext == "gz" else brotli.Compressor()
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        if self.section == "data":
+            self.hash.update(data)
+        self._emit(None, data)
+        for ext, c in self.compressors.items():
+            self._emit(ext, c.compress(data) if ext == "gz" else c.process(data))
+
+    def _emit(self, ext, data):
+        if data:
+            self.files[ext].write(data)
+            self.sizes[ext] += len(data)
+
+    def commit(self):
+        for ext, c in self.compressors.items():
+            self._emit(ext, c.flush() if ext == "gz" else c.finish())
+        for f in self.files.values():
+            f.close()
+        for ext in self.files:
+            target = self.path if ext is None else f"{self.path}.{ext}"
+            os.replace(f"{target}.tmp", target)
+        return self.sizes
+
+    def abort(self):
+        for ext, f in self.files.items():
+            f.close()
+            try:
+                os.remove(f"{self.path}.tmp" if ext is None else f"{self.path}.{ext}.tmp")
+            except OSError:
+                pass
+
+
+def _is_rows(value):
+    return not isinstance(value, (dict, str, bytes)) and hasattr(value, "__iter__")
+
+
+def _base(filename):
+    """The full file a shard belongs to ("game_log/2024-25.regular.json" -> "game_log.json")."""
+    head, sep, tail = filename.partition("/")
+    return f"{head}.json" if sep and tail != SHARD_INDEX else filename
+
+
+def _shard_name(values):
+    """"2024-25.regular" for ("2024-25", "Regular Season")."""
+    parts = [str(values[0])]
+    for v in values[1:]:
+        parts.append(SEASON_TYPE_SLUGS.get(v) or re.sub(r"[^a-z0-9]+", "-", str(v).lower()).strip("-"))
+    return ".".join(parts)
+
+
+def _iso_date(value):
+    value = str(value)
+    return f"{value[:4]}-{value[4:6]}-{value[6:]}" if len(value) == 8 and value.isdigit() else value
+
+
+def _add_game(games, row, id_field):
+    key = (str(row.get("SEASON")), str(row.get(id_field)))
+    games.setdefault(key, hashlib.sha256()).update(json.dumps(row, separators=(",", ":")).encode("utf-8"))
+
+
+def game_digests(rows, id_field):
+    """{(season, game id): digest of that game's rows}."""
+    games = {}
+    for row in rows:
+        _add_game(games, row, id_field)
+    return {key: h.hexdigest() for key, h in games.items()}
+
+
+def _digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def diff_data(filename, old, new, games=None):
+    """Changelog entry for one file: game ids added/updated/removed per season
+    (CHANGE_KEYS files, given the new `games` digests), otherwise the top-level
+    keys (e.g. seasons) whose content changed. old is None for a new file."""
+    keys = CHANGE_KEYS.get(_base(filename))
+    if keys is not None and games is not None:
+        before = game_digests(old.get(keys[0], []), keys[1]) if old else {}
+        change = {"added": {}, "updated": {}, "removed": {}}
+        for key in sorted(set(before) | set(games)):
+            kind = "added" if key not in before else "removed" if key not in games else \
+                "updated" if before[key] != games[key] else None
+            if kind:
+                change[kind].setdefault(key[0], []).append(key[1])
+        change = {kind: ids for kind, ids in change.items() if ids}
+        change["seasons"] = sorted({season for ids in change.values() for season in ids})
+        return change
+    old = old or {}
+    keys = [k for k in dict.fromkeys([*new, *old])
+            if k not in new or k not in old or _digest(new[k]) != _digest(old[k])]
+    return {"keys": keys}
+
+
+def _encode(sink, value, depth, compact):
+    """Stream `value` at nesting `depth`, byte-identical to json.dump(indent=2) (or compact)."""
+    if compact:
+        sep, item_sep, pad, inner = ":", ",", "", ""
+    else:
+        pad, inner = "\n" + " " * (INDENT * depth), "\n" + " " * (INDENT * (depth + 1))
+        sep, item_sep = ": ", ","
+
+    if isinstance(value, dict) and depth < 2:
+        # The document and its "data" object: stream each member.
+        if not value:
+            sink.write("{}")
+            return
+        sink.write("{")
+        for i, (k, v) in enumerate(value.items()):
+            sink.write((item_sep if i else "") + inner + json.dumps(str(k)) + sep)
+            if depth == 0:
+                sink.section = k
+            else:
+                sink.member = k
+            _encode(sink, v, depth + 1, compact)
+        if depth == 0:
+            sink.section = None
+        sink.write(pad + "}")
+    elif _is_rows(value):
+        track = sink.track is not None and depth == 2 and sink.member == sink.track[0]
+        empty = True
+        for row in value:
+            sink.rows += 1
+            if track:
+                _add_game(sink.games, row, sink.track[1])
+            sink.write(("[" if empty else item_sep) + inner + _dumps(row, depth + 1, compact))
+            empty = False
+        sink.write("[]" if empty else pad + "]")
+    else:
+        sink.write(_dumps(value, depth, compact))
+
+
+def _dumps(value, depth, compact):
+    if compact:
+        return json.dumps(value, separators=(",", ":"))
+    return json.dumps(value, indent=INDENT).replace("\n", "\n" + " " * (INDENT * depth))
+
+
+class OutputWriter:
+    """Writes {"meta", "data"} documents into `output_dir`.
+
+    compact drops indentation; columnar writes COLUMNAR_FILES in the columnar
+    format (always compact); compress is a subset of ("gz", "br") siblings to
+    write alongside each file; shard also writes SHARD_FILES per season. `written` collects one size entry per file;
+    `changes` the changelog entry of every file whose data changed.
+    """
+
+    def __init__(self, output_dir, compact=False, columnar=False, compress=(), shard=False):
+        unknown = set(compress) - set(COMPRESSIONS)
+        if unknown:
+            raise ValueError(f"unknown compression {', '.join(sorted(unknown))}")
+        if "br" in compress and brotli is None:
+            print("  Warning: brotli is not installed; skipping .br output")
+            compress = [ext for ext in compress if ext != "br"]
+        self.output_dir = output_dir
+        self.compact = compact
+        self.columnar = columnar
+        self.compress = tuple(compress)
+        self.shard = shard
+        self.written = []
+        self.changes = {}
+        self.manifest = self._load_manifest()
+        self._lock = threading.Lock()
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.output_dir, MANIFEST)) as f:
+                return json.load(f)["files"]
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def write(self, filename, data, meta):
+        if not (self.shard and filename in SHARD_FILES):
+            return self._write(filename, data, meta)
+        # Shards need the rows twice, so they cannot stream from a generator.
+        data = {k: list(v) if _is_rows(v) else v for k, v in data.items()}
+        entry = self._write(filename, data, meta)
+        self.write_shards(filename, data, meta)
+        return entry
+
+    def write_shards(self, filename, data, meta):
+        """Write one document per season (and season type) of `filename`'s rows, and their index.json.
+        Shards listed by the previous index but no longer produced are removed."""
+        rows_key, fields = SHARD_FILES[filename]
+        stem = filename[: -len(".json")]
+        groups = {}
+        for row in data.get(rows_key, []):
+            groups.setdefault(tuple(row.get(f) for f in fields), []).append(row)
+        shards = []
+        for values in sorted(groups, key=lambda v: tuple(map(str, v))):
+            rows = groups[values]
+            name = f"{stem}/{_shard_name(values)}.json"
+            labels = {f.lower(): v for f, v in zip(fields, values)}
+            self._write(name, {rows_key: rows}, {**meta, **labels})
+            dates = sorted(_iso_date(r["GAME_DATE"]) for r in rows if r.get("GAME_DATE"))
+            shards.append({
+                "file": name,
+                **labels,
+                "rows": len(rows),
+                "hash": self.manifest[name]["hash"],
+                "first_date": dates[0] if dates else None,
+                "last_date": dates[-1] if dates else None,
+            })
+
+        index = f"{stem}/{SHARD_INDEX}"
+        try:
+            before = read_json(os.path.join(self.output_dir, index))["data"]["shards"]
+        except (OSError, ValueError, KeyError):
+            before = []
+        current = {s["file"] for s in shards}
+        for stale in (s["file"] for s in before if s["file"] not in current):
+            for target in (stale, *(f"{stale}.{ext}" for ext in COMPRESSIONS)):
+                if os.path.exists(os.path.join(self.output_dir, target)):
+                    os.remove(os.path.join(self.output_dir, target))
+            with self._lock:
+                self.manifest.pop(stale, None)
+                self.changes[stale] = {"removed": True}
+            print(f"  -> Removed {stale}")
+        seasons = sorted({s["season"] for s in shards})
+        self._write(index, {
+            "file": filename,
+            "fields": [f.lower() for f in fields],
+            "latest_season": seasons[-1] if seasons else None,
+            "shards": shards,
+        }, meta)
+
+    def _write(self, filename, data, meta):
+        started = time.perf_counter()
+        path = os.path.join(self.output_dir, filename)
+        if "/" in filename:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        doc = {"meta": meta, "data": data}
+        compact = self.compact
+        rows = None
+        games = None
+        track = CHANGE_KEYS.get(_base(filename))
+        if self.columnar and _base(filename) in COLUMNAR_FILES:
+            data = {k: list(v) if _is_rows(v) else v for k, v in data.items()}
+            rows = sum(len(v) for v in data.values() if isinstance(v, list))
+            if track is not None:
+                games = game_digests(data.get(track[0], []), track[1])
+            doc = encode_doc({"meta": meta, "data": data})
+            compact = True
+            track = None
+        sink = _Sink(path, self.compress, track)
+        try:
+            _encode(sink, doc, 0, compact)
+        except BaseException:
+            sink.abort()
+            raise
+        digest = sink.hash.hexdigest()[:16]
+        if games is None and track is not None:
+            games = {key: h.hexdigest() for key, h in sink.games.items()}
+        previous = self.manifest.get(filename)
+        targets = [path, *(f"{path}.{ext}" for ext in self.compress)]
+        unchanged = (previous and previous["hash"] == digest and all(os.path.exists(t) for t in targets)
+                     and os.path.getsize(path) == previous["bytes"])  # not edited or replaced since
+        if unchanged:
+            sink.abort()
+            sizes = {None: os.path.getsize(path), **{ext: os.path.getsize(f"{path}.{ext}") for ext in self.compress}}
+            changed = False
+        else:
+            try:
+                old = read_json(path)["data"]
+            except (OSError, ValueError, KeyError):
+                old = None
+            change = diff_data(filename, old, data, games)
+            sizes = sink.commit()
+            changed = True
+        entry = {
+            "file": filename,
+            "bytes": sizes[None],
+            **{ext: sizes[ext] for ext in self.compress},
+            "rows": sink.rows if rows is None else rows,
+            "seconds": round(time.perf_counter() - started, 4),
+            "changed": changed,
+        }
+        with self._lock:
+            self.written.append(entry)
+            if changed:
+                self.changes[filename] = change
+                self.manifest[filename] = {
+                    "hash": digest,
+                    "rows": entry["rows"],
+                    "bytes": entry["bytes"],
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                }
+        extra = "".join(f", {ext} {_kb(sizes[ext])}" for ext in self.compress)
+        print(f"  -> {'Wrote' if changed else 'Unchanged'} {filename} ({_kb(sizes[None])}{extra})")
+        return entry
+
+    def save(self):
+        """Write manifest.json and append this run's changes to changelog.jsonl, if anything changed.
+        Returns the changes ({filename: changelog entry})."""
+        if not self.changes:
+            print("No data changed; output files left as they were.")
+            return {}
+        now = datetime.now(timezone.utc).isoformat()
+        path = os.path.join(self.output_dir, MANIFEST)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({"updated_at": now, "files": dict(sorted(self.manifest.items()))}, f, indent=INDENT)
+            f.write("\n")
+        os.replace(f"{path}.tmp", path)
+        with open(os.path.join(self.output_dir, CHANGELOG), "a") as f:
+            f.write(json.dumps({"at": now, "files": self.changes}, separators=(",", ":")) + "\n")
+        print(f"Changed: {', '.join(_describe(f, c) for f, c in self.changes.items())}")
+        return self.changes
+
+    def report(self):
+        """Print a size table of every file written so far."""
+        if not self.written:
+            return
+        cols = ["bytes", *self.compress]
+        width = max(24, *(len(e["file"]) + 2 for e in self.written))
+        print(f"{'file':<{width}}" + "".join(f"{c:>12}" for c in cols))
+        for entry in self.written:
+            print(f"{entry['file']:<{width}}" + "".join(f"{_kb(entry[c]):>12}" for c in cols)
+                  + ("" if entry.get("changed", True) else "  unchanged"))
+        totals = {c: sum(e[c] for e in self.written) for c in cols}
+        print(f"{'total':<{width}}" + "".join(f"{_kb(totals[c]):>12}" for c in cols))
+
+
+def _kb(n):
+    return f"{n / 1024:.1f} KB"
+
+
+def _describe(filename, change):
+    if change.get("removed") is True:
+        return f"{filename} (removed)"
+    if "seasons" in change:
+        counts = ", ".join(f"{sum(len(ids) for ids in change[kind].values())} {kind}"
+                           for kind in ("added", "updated", "removed") if kind in change)
+        return f"{filename} ({counts or 'same rows'})"
+    return f"{filename} ({', '.join(map(str, change['keys']))})" if change.get("keys") else filename
+
+
+class StagedWriter:
+    """Drop-in for OutputWriter that keeps documents in memory instead of writing them.
+
+    refresh.py gives each source one of these, validates what a step produced
+    and writes the winning documents through a real OutputWriter.
+    """
+
+    def __init__(self):
+        self.docs = {}  # filename -> (data, meta)
+        self.written = []
+
+    def write(self, filename, data, meta):
+        data = {k: list(v) if _is_rows(v) else v for k, v in data.items()}
+        self.docs[filename] = (data, meta)
+        rows = sum(len(v) for v in data.values() if isinstance(v, list))
+        entry = {"file": filename, "bytes": 0, "rows": rows, "seconds": 0.0}
+        self.written.append(entry)
+        return entry
+
+    def take(self, filename):
+        """The staged (data, meta) of `filename`, or None; removes it."""
+        return self.docs.pop(filename, None)
+
+    def report(self):
+        pass
+
+    def save(self):
+        return {}
+
+
+class Handoff:
+    """Writer wrapper that also keeps the documents in `keep` in memory.
+
+    steps.run_steps() hands them to the steps that read them instead of
+    having those read the file back; everything else streams straight
+    through to the wrapped writer.
+    """
+
+    def __init__(self, writer, keep=()):
+        self.writer = writer
+        self.keep = set(keep)
+        self.data = {}  # filename -> data
+
+    def write(self, filename, data, meta):
+        if filename in self.keep:
+            data = {k: list(v) if _is_rows(v) else v for k, v in data.items()}
+            self.data[filename] = data
+        return self.writer.write(filename, data, meta)
+
+    def __getattr__(self, name):
+        return getattr(self.writer, name)
+
+
+class StoreWriter:
+    """Writer wrapper that makes a store.Store the system of record.
+
+    Each document is upserted into the store, and what the wrapped writer
+    gets is the store's export of the file: with every season the store
+    holds, not only the ones this run wrote. Row generators stream into the
+    store, and the export's rows stream out of it.
+    """
+
+    def __init__(self, writer, store):
+        self.writer = writer
+        self.store = store
+
+    def write(self, filename, data, meta):
+        return self.writer.write(filename, self.store.write(filename, data, meta), meta)
+
+    def __getattr__(self, name):
+        return getattr(self.writer, name)
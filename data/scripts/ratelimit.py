@@ -0,0 +1,60 @@
+"""
+Request scheduling shared by the data pipeline scripts.
+TokenBucket caps a request rate across threads (resilience.py keeps one per
+host and adapts its rate), and Scheduler runs calls on a bounded thread
+pool, so requests go out at that steady rate while slow responses are still
+in flight.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    acquire() reserves the next token and sleeps until it is due, so waiting
+    callers are served in arrival order at exactly `rate` tokens per second
+    once the initial `burst` is spent.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate):
+        """Change the rate from now on; tokens already earned are kept."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self.rate = float(rate)
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class Scheduler:
+    """Bounded thread pool for request jobs; pacing is up to the jobs (see resilience.Resilience)."""
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+
+    def submit(self, fn, *args, **kwargs):
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,296 @@
+"""
+BraunStats refresh — one run over both data sources.
+fetch_stats.py (stats.nba.com) and fetch_bbref.py (basketball-reference.com)
+write the same files; this runner knows, per output file, which steps of
+which source can produce it. The preferred source's step starts first. If it
+has not delivered within --budget seconds, fails or produces something that
+does not validate, or its host's circuit breaker trips, the alternate
+source's step is started alongside it, and the first valid result is
+written. meta.source in every file says which source it came from.
+Only the fetch modules of the sources in --sources are imported.
+
+Usage:
+    python data/scripts/refresh.py
+    python data/scripts/refresh.py --prefer bbref --budget 60
+"""
+
+import argparse
+import importlib
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from fixtures import STANDIN_ENV
+from output import OutputWriter, StagedWriter, StoreWriter
+from steps import StepContext, by_output, call
+from store import STORE_FILE, Store
+
+SOURCES = {"nba": "fetch_stats", "bbref": "fetch_bbref"}
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)))
+BUDGET = 180  # seconds the preferred source gets before the alternate is started
+POLL = 0.5
+
+
+class Invalid(Exception):
+    """A step finished but its output is not fit to write."""
+
+
+def has_content(value):
+    """False for None and for containers that hold nothing but empty containers, such as
+    the {"2024-25": {}} a step writes when every request of a season failed."""
+    if isinstance(value, dict):
+        return any(has_content(v) for v in value.values())
+    if isinstance(value, list):
+        return bool(value)
+    return value is not None
+
+
+def non_empty(key=None):
+    def check(data):
+        return has_content(data.get(key) if key else data)
+    return check
+
+
+# How to tell a usable document from a failed run that still wrote a file
+# (the steps log per-season errors and carry on).
+VALIDATORS = {
+    "player_overview.json": non_empty("info"),
+    "game_log.json": non_empty("games"),
+    "on_off_jokic.json": non_empty("on_off"),
+    "on_off_pairs.json": non_empty("pairs"),
+    "lineups.json": non_empty("players"),
+    "general_splits.json": non_empty(),
+    "shooting_splits.json": non_empty(),
+    "career.json": non_empty("base"),
+    "shot_chart.json": non_empty("shots"),
+}
+
+
+class Source:
+    """One fetch module, set up the first time one of its steps is needed."""
+
+    def __init__(self, name, module, argv):
+        self.name = name
+        self.module = module
+        self.args = module.build_parser().parse_args(argv)
+        self.steps = by_output(module.plan_steps(self.args))
+        self.staged = StagedWriter()
+        self.started = False
+        self._lock = threading.Lock()
+
+    def ensure_started(self, step):
+        """Start the module for `step`, or queue `step`'s pages if it is already running,
+        so a source only ever fetches what the steps hedged on it need."""
+        with self._lock:
+            if not self.started:
+                self.module.start(self.args, [step])
+                self.module.writer = self.staged
+                self.started = True
+            elif hasattr(self.module, "prefetch"):
+                self.module.prefetch([step])
+
+    def tripped(self):
+        return self.started and any(h.breaker.opened_at is not None for h in self.module.http.hosts.values())
+
+    def run(self, step, inputs):
+        """Run `step` on `inputs` ({filename: data} of the files it reads) and return
+        {filename: (data, meta)} of what it wrote; raises Invalid if unusable."""
+        self.ensure_started(step)
+        self.module.report.run(step.name, lambda: call(step, StepContext(inputs)))
+        docs = {f: self.staged.take(f) for f in step.outputs}
+        # Failed requests only matter if they leave the primary output unusable: one missing
+        # season of a game log still leaves a valid file.
+        failed = [r for r in self.module.report.requests if r["step"] == step.name and r["status"] != "ok"]
+        key = step.outputs[0]
+        if docs[key] is None or not VALIDATORS.get(key, non_empty())(docs[key][0]):
+            raise Invalid(f"{key} is empty" + (f" ({len(failed)} requests failed)" if failed else ""))
+        if failed:
+            print(f"  {key}: {self.name} had {len(failed)} failed requests, keeping the valid result")
+        return {f: doc for f, doc in docs.items() if doc is not None and VALIDATORS.get(f, non_empty())(doc[0])}
+
+    def finish(self):
+        if self.started:
+            self.module.finish(wait=False)
+            self.module.report.save(self.args.report)
+
+
+class Refresh:
+    def __init__(self, sources, writer, budget):
+        self.sources = sources
+        self.writer = writer
+        self.budget = budget
+        self.chosen = {}  # filename -> (source name, seconds, hedged)
+        self.data = {}  # filename -> data as committed, handed to steps that read it
+        self.ready = {f: threading.Event() for s in sources for step in s.steps.values() for f in step.outputs}
+        # room for every step of every source at once, so a hedge never queues behind a stuck step
+        self._steps_pool = ThreadPoolExecutor(max_workers=sum(len(s.steps) for s in sources),
+                                              thread_name_prefix="source")
+        self._lock = threading.Lock()
+
+    def candidates(self, key):
+        return [(s, s.steps[key]) for s in self.sources if key in s.steps]
+
+    def launch(self, source, step):
+        for f in step.inputs:
+            self.ready[f].wait()
+        inputs = {f: self.data.get(f) for f in step.inputs}
+        print(f"  {step.outputs[0]}: starting {source.name} ({step.name})")
+        return self._steps_pool.submit(source.run, step, inputs)
+
+    def hedge(self, key):
+        """Produce `key` (and its step's other outputs) from the first source that delivers a valid result."""
+        started = time.monotonic()
+        pending = self.candidates(key)
+        running = {}
+        errors = []
+        launched = 1
+        try:
+            source, step = pending.pop(0)
+            running[self.launch(source, step)] = source
+            deadline = time.monotonic() + self.budget
+            while running:
+                done, _ = wait(running, timeout=POLL, return_when=FIRST_COMPLETED)
+                for job in done:
+                    source = running.pop(job)
+                    try:
+                        docs = job.result()
+                    except Exception as e:
+                        errors.append(f"{source.name}: {e}")
+                        print(f"  {key}: {source.name} failed: {e}")
+                        continue
+                    self.commit(source, docs, time.monotonic() - started, hedged=launched > 1)
+                    return
+                if not pending:
+                    continue
+                if not running:
+                    reason = "primary failed"
+                elif any(s.tripped() for s in running.values()):
+                    reason = "circuit open"
+                elif time.monotonic() >= deadline:
+                    reason = f"no result after {self.budget:.0f}s"
+                else:
+                    continue
+                source, step = pending.pop(0)
+                print(f"  {key}: {reason}, hedging with {source.name}")
+                running[self.launch(source, step)] = source
+                launched += 1
+                deadline = time.monotonic() + self.budget
+            raise RuntimeError("; ".join(errors) or "no source can produce it")
+        finally:
+            for source, step in self.candidates(key):
+                for f in step.outputs:
+                    self.ready[f].set()
+
+    def commit(self, source, docs, seconds, hedged):
+        for filename, (data, meta) in docs.items():
+            self.writer.write(filename, data, meta)
+            with self._lock:
+                self.chosen[filename] = (source.name, seconds, hedged)
+                self.data[filename] = data
+            self.ready[filename].set()
+
+    def run(self):
+        keys = list(dict.fromkeys(key for s in self.sources for key in s.steps))
+        failed = {}
+        with ThreadPoolExecutor(max_workers=len(keys), thread_name_prefix="hedge") as tasks:
+            jobs = {key: tasks.submit(self.hedge, key) for key in keys}
+            for key, job in jobs.items():
+                try:
+                    job.result()
+                except Exception as e:
+                    failed[key] = e
+                    print(f"  FAILED {key}: {e}")
+        for source in self.sources:
+            source.finish()
+        self._steps_pool.shutdown(wait=False)
+        return failed
+
+    def summary(self):
+        print(f"{'file':<24}{'source':>8}{'seconds':>10}  hedged")
+        for filename, (source, seconds, hedged) in sorted(self.chosen.items()):
+            print(f"{filename:<24}{source:>8}{seconds:>10.1f}  {'yes' if hedged else ''}")
+
+
+def source_argv(args, name):
+    """Command-line flags for one source's own parser."""
+    argv = []
+    if args.offline:
+        argv.append("--offline")
+    if args.no_cache:
+        argv.append("--no-cache")
+    if args.standin:
+        argv += ["--standin", args.standin]
+    if args.store:
+        argv += ["--store", args.store]
+    if name == "nba":
+        if args.incremental:
+            argv.append("--incremental")
+        if args.on_off_pairs:
+            argv += ["--on-off-pairs", args.on_off_pairs]
+    return argv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prefer", choices=list(SOURCES), default="nba",
+                        help="source to try first for every file")
+    parser.add_argument("--sources", default=",".join(SOURCES),
+                        help="sources that may be used, e.g. nba to never fall back")
+    parser.add_argument("--budget", type=float, default=BUDGET,
+                        help="seconds to wait for the preferred source before also starting the alternate")
+    parser.add_argument("--offline", action="store_true",
+                        help="serve every request from the response caches; never touch the network")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="bypass the response caches and refetch everything")
+    parser.add_argument("--incremental", action="store_true",
+                        help="nba: only refetch game logs and shots for seasons that can still change")
+    parser.add_argument("--on-off-pairs", metavar="PLAYER:ANCHOR[@TEAM],...",
+                        help="nba: on/off views to build (see fetch_stats.py)")
+    parser.add_argument("--columnar", action="store_true",
+                        help="write game_log.json and shot_chart.json in the compact columnar format")
+    parser.add_argument("--compact", action="store_true",
+                        help="write JSON without indentation")
+    parser.add_argument("--compress", default="",
+                        help="also write precompressed siblings, e.g. gz or gz,br")
+    parser.add_argument("--shard", action="store_true",
+                        help="also write game_log.json and shot_chart.json per season, with an index.json")
+    parser.add_argument("--store", metavar="PATH",
+                        help=f"SQLite store the JSON files are exported from (default: <output>/{STORE_FILE})")
+    parser.add_argument("--standin", metavar="URL", default=os.environ.get(STANDIN_ENV),
+                        help="send every request to a standin.py server")
+    args = parser.parse_args()
+
+    names = [n for n in args.sources.split(",") if n]
+    unknown = set(names) - set(SOURCES)
+    if unknown:
+        parser.error(f"unknown source: {', '.join(sorted(unknown))}")
+    names.sort(key=lambda n: n != args.prefer)
+    modules = {name: importlib.import_module(SOURCES[name]) for name in names}
+    for module in modules.values():
+        module.OUTPUT_DIR = OUTPUT_DIR
+    sources = [Source(name, modules[name], source_argv(args, name)) for name in names]
+    store = Store(args.store or os.path.join(OUTPUT_DIR, STORE_FILE), OUTPUT_DIR)
+    writer = StoreWriter(OutputWriter(OUTPUT_DIR, compact=args.compact, columnar=args.columnar,
+                                      compress=[c for c in args.compress.split(",") if c], shard=args.shard), store)
+
+    print("BraunStats Refresh")
+    print(f"Output directory: {OUTPUT_DIR}")
+    print(f"Sources: {', '.join(names)} (budget {args.budget:.0f}s)")
+    print("=" * 50)
+    started = time.monotonic()
+    refresh = Refresh(sources, writer, args.budget)
+    failed = refresh.run()
+
+    print("=" * 50)
+    writer.report()
+    writer.save()
+    store.close()
+    refresh.summary()
+    total = len(refresh.ready)
+    print(f"Done! {len(refresh.chosen)}/{total} data files written in {time.monotonic() - started:.0f}s"
+          f"{f', {len(failed)} failed' if failed else ''}.")
+
+
+if __name__ == "__main__":
+    main()
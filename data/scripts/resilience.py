@@ -0,0 +1,230 @@
+"""
+Resilient requests shared by fetch_stats.py and fetch_bbref.py.
+Every upstream request goes through Resilience.request(), which keeps per-host
+state: a token bucket whose rate adapts to how the host is coping (halved
+when responses turn slow or show overload: 429, 5xx, timeouts, connection
+errors; crept back up while they are healthy), and a circuit breaker that
+trips after repeated blocks (403/429 or timeouts) and then fails every
+queued call to that host immediately instead of letting it keep piling up
+doomed retries. Retries use exponential backoff with jitter and honor
+Retry-After; 4xx responses other than 429 fail on the first attempt.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+from ratelimit import TokenBucket
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BLOCK_STATUSES = {403, 429}  # the host is refusing us, not failing
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+
+class CircuitOpen(Exception):
+    """Raised instead of sending a request to a host whose breaker has tripped."""
+
+
+def retry_after(resp):
+    """Seconds a response asks us to wait (Retry-After as seconds or an HTTP date), or None."""
+    value = resp.headers.get("Retry-After") if resp is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Exponential backoff with equal jitter: attempt n waits between half and all of base * 2**n, capped."""
+
+    def __init__(self, attempts=3, base=5.0, cap=60.0):
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+
+    def wait(self, attempt, after=None):
+        ceiling = min(self.cap, self.base * 2 ** attempt)
+        wait = ceiling / 2 + random.uniform(0, ceiling / 2)
+        return max(wait, after) if after is not None else wait
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive blocks; after `cooldown` seconds one probe is let through."""
+
+    def __init__(self, threshold=4, cooldown=300.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.blocks = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def check(self, host):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at >= self.cooldown and not self._probing:
+                self._probing = True
+                return
+        raise CircuitOpen(f"{host}: circuit open after {self.blocks} blocked requests")
+
+    def success(self):
+        with self._lock:
+            self.blocks = 0
+            self.opened_at = None
+            self._probing = False
+
+    def failure(self):
+        """Count a block; returns True if this one tripped (or re-tripped) the breaker."""
+        with self._lock:
+            self.blocks += 1
+            self._probing = False
+            if self.blocks >= self.threshold:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+class AdaptiveRate:
+    """AIMD request rate: halve on an overload or a slow response, add back a tenth of the base on a good one."""
+
+    def __init__(self, rate, slow_after=8.0, floor=1 / 8):
+        self.base = rate
+        self.rate = rate
+        self.min_rate = rate * floor
+        self.slow_after = slow_after
+        self._lock = threading.Lock()
+
+    def observe(self, ok, seconds):
+        """Record one response (ok=False for an overload); returns (new rate, whether it went down)."""
+        with self._lock:
+            if ok and seconds <= self.slow_after:
+                self.rate = min(self.base, self.rate + self.base / 10)
+                return self.rate, False
+            slower = max(self.min_rate, self.rate / 2)
+            dropped = slower < self.rate
+            self.rate = slower
+            return self.rate, dropped
+
+
+class _Host:
+    def __init__(self, rate, threshold, cooldown):
+        self.breaker = CircuitBreaker(threshold, cooldown)
+        self.rate = AdaptiveRate(rate) if rate else None
+        self.limiter = TokenBucket(rate) if rate else None
+
+
+class Resilience:
+    """Per-host retries, pacing and circuit breaking for one fetcher.
+
+    rate is requests/second per host (None for no pacing); pace_kind is how
+    pacing waits are labelled in the run report ("rate_limit" or "politeness").
+    """
+
+    def __init__(self, rate, policy=None, threshold=4, cooldown=300.0, report=None, pace_kind="rate_limit"):
+        self.rate = rate
+        self.policy = policy or RetryPolicy()
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.report = report
+        self.pace_kind = pace_kind
+        self.hosts = {}
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Refuse every further request, e.g. queued work whose result is no longer wanted."""
+        self.closed = True
+
+    def host(self, url):
+        name = urlsplit(url).netloc
+        with self._lock:
+            if name not in self.hosts:
+                self.hosts[name] = _Host(self.rate, self.threshold, self.cooldown)
+            return name, self.hosts[name]
+
+    def request(self, url, send, label):
+        """Call send() (one GET, returning a requests.Response) until it succeeds.
+
+        Returns the first response below 400. Raises requests.HTTPError for a
+        4xx other than 429 or when attempts run out, CircuitOpen once the host
+        has tripped its breaker, or the last connection error/timeout.
+        """
+        name, host = self.host(url)
+        network = 0.0
+        for attempt in range(self.policy.attempts):
+            try:
+                if self.closed:
+                    raise CircuitOpen(f"{name}: no longer accepting requests")
+                host.breaker.check(name)
+            except CircuitOpen:
+                self._record(label, network, 0, attempt, "blocked")
+                raise
+            if host.limiter is not None:
+                self._sleep(self.pace_kind, host.limiter.acquire())
+            started = time.perf_counter()
+            resp, error = None, None
+            try:
+                resp = send()
+            except TRANSIENT_ERRORS as e:
+                error = e
+            elapsed = time.perf_counter() - started
+            network += elapsed
+
+            status = resp.status_code if resp is not None else None
+            ok = error is None and status < 400
+            if host.rate is not None:
+                # A 404 or other 4xx says nothing about load; only these mean the host is struggling.
+                overloaded = error is not None or status == 429 or status >= 500
+                rate, dropped = host.rate.observe(not overloaded, elapsed)
+                host.limiter.set_rate(rate)
+                if dropped:
+                    print(f"    Slowing {name} to {rate:.3g} req/s")
+            if ok:
+                host.breaker.success()
+                self._record(label, network, len(resp.content), attempt + 1, "ok")
+                return resp
+
+            if error is not None:
+                reason = f"{type(error).__name__}: {error}"
+            else:
+                reason = f"HTTP {status}"
+            print(f"    {label} attempt {attempt + 1}/{self.policy.attempts} failed: {reason}")
+            if error is not None or status in BLOCK_STATUSES:
+                if host.breaker.failure():
+                    print(f"    Circuit open for {name}: {host.breaker.blocks} blocks in a row, "
+                          f"holding off for {self.cooldown:.0f}s")
+
+            after = retry_after(resp)
+            final = (
+                attempt == self.policy.attempts - 1
+                or (status is not None and status not in RETRY_STATUSES)
+                or (after is not None and after > self.policy.cap)
+            )
+            if final:
+                self._record(label, network, 0, attempt + 1, "failed")
+                if error is not None:
+                    raise error
+                resp.raise_for_status()
+            wait = self.policy.wait(attempt, after)
+            print(f"    Retrying in {wait:.1f}s...")
+            time.sleep(wait)
+            self._sleep("retry", wait)
+
+    def _sleep(self, kind, seconds):
+        if self.report is not None:
+            self.report.sleep(kind, seconds)
+
+    def _record(self, label, seconds, nbytes, attempts, status):
+        if self.report is not None:
+            self.report.request(label, seconds, nbytes, attempts, status)
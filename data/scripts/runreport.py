@@ -0,0 +1,200 @@
+"""
+Run instrumentation shared by fetch_stats.py and fetch_bbref.py.
+A RunReport collects what a refresh spent its time on: wall time per step,
+one record per upstream request (time on the wire, bytes, attempts, cache
+hit or not), time asleep in the rate limiter / politeness delay / retry
+backoff, parse time, and the rows, bytes and encode time of every output file.
+Records are tagged with the step running on the calling thread. save() writes
+it all as JSON; summary() prints the per-step table.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+REPORT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "reports")
+REPORT_VERSION = 1
+SLEEP_KINDS = ("rate_limit", "politeness", "retry")
+PIPELINE = "(pipeline)"  # work done off the step threads, e.g. BBRef prefetching
+
+
+def default_path(script):
+    return os.path.join(REPORT_DIR, f"{script}.json")
+
+
+class RunReport:
+    def __init__(self, script):
+        self.script = script
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.steps = []
+        self.requests = []
+        self.sleeps = []
+        self.parses = []
+        self.outputs = []
+        self._started = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    # ─── Recording ───
+
+    def current_step(self):
+        return getattr(self._local, "step", None) or PIPELINE
+
+    @contextmanager
+    def step(self, name):
+        """Time one pipeline step; everything recorded on this thread meanwhile is tagged with it."""
+        entry = {"step": name, "status": "running", "seconds": 0.0, "error": None}
+        with self._lock:
+            self.steps.append(entry)
+        self._local.step = name
+        started = time.perf_counter()
+        try:
+            yield entry
+            entry["status"] = "ok"
+        except Exception as e:
+            entry["status"] = "failed"
+            entry["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            entry["seconds"] = round(time.perf_counter() - started, 4)
+            self._local.step = None
+
+    def run(self, name, fn):
+        """fn() as step `name`."""
+        with self.step(name):
+            return fn()
+
+    def skip(self, name):
+        """Record step `name` as skipped (its inputs had not changed)."""
+        with self._lock:
+            self.steps.append({"step": name, "status": "skipped", "seconds": 0.0, "error": None})
+
+    def bind(self, step, fn, *args, **kwargs):
+        """Run fn tagged with `step`, for jobs a step hands to a worker thread."""
+        self._local.step = step
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._local.step = None
+
+    def _add(self, records, entry):
+        entry["step"] = self.current_step()
+        with self._lock:
+            records.append(entry)
+
+    def request(self, label, seconds, nbytes=0, attempts=1, status="ok", cached=False):
+        """One logical request: `seconds` on the wire over all `attempts`, `nbytes` of body.
+        status is "ok", "failed", or "blocked" (refused by the circuit breaker)."""
+        self._add(self.requests, {
+            "label": label, "seconds": round(seconds, 4), "bytes": nbytes,
+            "attempts": attempts, "status": status, "cached": cached,
+        })
+
+    def sleep(self, kind, seconds):
+        if seconds > 0:
+            self._add(self.sleeps, {"kind": kind, "seconds": round(seconds, 4)})
+
+    def parse(self, label, seconds):
+        self._add(self.parses, {"label": label, "seconds": round(seconds, 4)})
+
+    def output(self, entry):
+        """A size entry returned by OutputWriter.write()."""
+        self._add(self.outputs, dict(entry))
+
+    # ─── Reporting ───
+
+    def _by_step(self):
+        names = dict.fromkeys(s["step"] for s in self.steps)
+        for records in (self.requests, self.sleeps, self.parses, self.outputs):
+            names.update(dict.fromkeys(r["step"] for r in records))
+        status = {s["step"]: s for s in self.steps}
+        rows = []
+        for name in names:
+            reqs = [r for r in self.requests if r["step"] == name]
+            outs = [o for o in self.outputs if o["step"] == name]
+            rows.append({
+                "step": name,
+                "status": status[name]["status"] if name in status else "-",
+                "seconds": status[name]["seconds"] if name in status else None,
+                "requests": _sent(reqs),
+                "cached": sum(r["cached"] for r in reqs),
+                "retries": _retries(reqs),
+                "network_s": _total(reqs),
+                "bytes_in": sum(r["bytes"] for r in reqs),
+                "sleep_s": _total(s for s in self.sleeps if s["step"] == name),
+                "parse_s": _total(p for p in self.parses if p["step"] == name),
+                "write_s": _total(outs),
+                "rows": sum(o.get("rows", 0) for o in outs),
+                "bytes_out": sum(o["bytes"] for o in outs),
+            })
+        return rows
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "version": REPORT_VERSION,
+                "script": self.script,
+                "started_at": self.started_at,
+                "wall_s": round(time.perf_counter() - self._started, 4),
+                "totals": {
+                    "network_s": _total(self.requests),
+                    "sleep_s": {kind: _total(s for s in self.sleeps if s["kind"] == kind) for kind in SLEEP_KINDS},
+                    "parse_s": _total(self.parses),
+                    "write_s": _total(self.outputs),
+                    "requests": _sent(self.requests),
+                    "cache_hits": sum(r["cached"] for r in self.requests),
+                    "retries": _retries(self.requests),
+                    "failed_requests": sum(r["status"] == "failed" for r in self.requests),
+                    "blocked_requests": sum(r["status"] == "blocked" for r in self.requests),
+                    "bytes_in": sum(r["bytes"] for r in self.requests),
+                    "bytes_out": sum(o["bytes"] for o in self.outputs),
+                    "rows": sum(o.get("rows", 0) for o in self.outputs),
+                },
+                "steps": self._by_step(),
+                "requests": self.requests,
+                "sleeps": self.sleeps,
+                "parses": self.parses,
+                "outputs": self.outputs,
+            }
+
+    def save(self, path):
+        report = self.to_dict()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(report, f, indent=2)
+        os.replace(f"{path}.tmp", path)
+        print(f"Run report: {path}")
+        return report
+
+    def summary(self):
+        """Print where the run's time went, per step and in total."""
+        report = self.to_dict()
+        print(f"{'step':<18}{'status':>8}{'wall s':>9}{'reqs':>6}{'retry':>6}{'net s':>8}"
+              f"{'sleep s':>9}{'parse s':>9}{'write s':>9}{'rows':>8}{'KB in':>9}{'KB out':>9}")
+        for s in report["steps"]:
+            wall = f"{s['seconds']:.2f}" if s["seconds"] is not None else "-"
+            print(f"{s['step'][:17]:<18}{s['status']:>8}{wall:>9}{s['requests']:>6}{s['retries']:>6}"
+                  f"{s['network_s']:>8.2f}{s['sleep_s']:>9.2f}{s['parse_s']:>9.2f}{s['write_s']:>9.2f}"
+                  f"{s['rows']:>8}{s['bytes_in'] / 1024:>9.1f}{s['bytes_out'] / 1024:>9.1f}")
+        t = report["totals"]
+        sleeps = ", ".join(f"{kind} {t['sleep_s'][kind]:.2f}s" for kind in SLEEP_KINDS)
+        print(f"Requests: {t['requests']} sent, {t['cache_hits']} from cache, {t['retries']} retries, "
+              f"{t['failed_requests']} failed, {t['blocked_requests']} blocked by the circuit breaker")
+        print(f"Wall {report['wall_s']:.2f}s — network {t['network_s']:.2f}s, sleeping {sleeps}, "
+              f"parsing {t['parse_s']:.2f}s, writing {t['write_s']:.2f}s "
+              f"(summed across threads, so they can exceed wall time)")
+
+
+def _sent(requests):
+    return sum(not r["cached"] and r["attempts"] > 0 for r in requests)
+
+
+def _retries(requests):
+    return sum(max(r["attempts"] - 1, 0) for r in requests)
+
+
+def _total(records):
+    return round(sum(r["seconds"] for r in records), 4)
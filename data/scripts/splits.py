@@ -0,0 +1,206 @@
+"""
+General splits computed from a game log.
+One pass over the games assigns each game to its group in every split
+dimension (location, W/L, month, pre/post All-Star, starter/bench, days rest,
+opponent). NumPy bincounts then total every stat for every group at once, so
+the cost grows with games × dimensions, not groups × stats × games.
+"""
+
+import calendar
+from datetime import timedelta
+
+import numpy as np
+
+from incremental import parse_game_date
+
+AVG_STATS = [
+    "MIN", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA", "OREB", "DREB", "REB",
+    "AST", "TOV", "STL", "BLK", "PF", "PTS", "PLUS_MINUS",
+]
+PCT_STATS = [("FG_PCT", "FGM", "FGA"), ("FG3_PCT", "FG3M", "FG3A"), ("FT_PCT", "FTM", "FTA")]
+
+ROW_KEYS = [
+    "GROUP_SET", "GROUP_VALUE", "GP", "W", "L", "W_PCT", "MIN",
+    "FGM", "FGA", "FG_PCT", "FG3M", "FG3A", "FG3_PCT", "FTM", "FTA", "FT_PCT",
+    "OREB", "DREB", "REB", "AST", "TOV", "STL", "BLK", "PF", "PTS", "PLUS_MINUS",
+]
+
+# All-Star Sunday of seasons whose date is known; games before it are "Pre", after it "Post".
+# Other seasons get their break from the game log (see all_star_breaks()).
+ALL_STAR_DATES = {
+    "2022-23": "2023-02-19",
+    "2023-24": "2024-02-18",
+    "2024-25": "2025-02-16",
+    "2025-26": "2026-02-15",
+}
+# (month, day) bounds the break falls between (it was March 7 in 2020-21),
+# and the fewest days without a game that count as the break.
+ALL_STAR_WINDOW = ((2, 1), (3, 20))
+MIN_BREAK_DAYS = 4
+MAX_REST_DAYS = 6  # rest of 6+ days shares one bucket, as on NBA.com
+
+# output key -> GROUP_SET, in output order
+DIMENSIONS = {
+    "overall": "Overall",
+    "location": "Location",
+    "win_loss": "W/L",
+    "month": "Month",
+    "pre_post_allstar": "Pre/Post All-Star",
+    "starter_bench": "Starting Position",
+    "days_rest": "Days Rest",
+    "opponent": "Opponent",
+}
+MONTH_NUMBERS = {name: i for i, name in enumerate(calendar.month_name) if name}
+ORDER = {
+    "location": {"Home": 0, "Road": 1}.get,
+    "win_loss": {"Wins": 0, "Losses": 1}.get,
+    "month": MONTH_NUMBERS.get,
+    "pre_post_allstar": {"Pre All-Star": 0, "Post All-Star": 1}.get,
+    "starter_bench": {"Starters": 0, "Bench": 1}.get,
+    "days_rest": lambda v: int(v.split()[0].rstrip("+")),
+    "opponent": lambda v: v,
+}
+
+
+def _rest_days(games, keys, dates):
+    """Days of rest before each game, within its own group (None for a group's first game)."""
+    rest = [None] * len(games)
+    order = sorted(
+        (i for i in range(len(games)) if dates[i] is not None),
+        key=lambda i: (keys[i], dates[i]),
+    )
+    for prev, cur in zip(order, order[1:]):
+        if keys[prev] == keys[cur]:
+            rest[cur] = max((dates[cur] - dates[prev]).days - 1, 0)
+    return rest
+
+
+def all_star_breaks(seasons, dates, known=ALL_STAR_DATES):
+    """{season: date that splits its games into pre and post All-Star}.
+
+    `seasons` and `dates` are per game. Seasons in `known` use that date.
+    For the others it is the day after the last game before the longest
+    gap between game dates (of every player in the log) inside
+    ALL_STAR_WINDOW, if that gap is at least MIN_BREAK_DAYS. A season that
+    has played past the window without such a gap is warned about and gets
+    no pre/post All-Star rows.
+    """
+    by_season = {}
+    for season, d in zip(seasons, dates):
+        if d is not None:
+            by_season.setdefault(season, set()).add(d)
+    breaks = {s: parse_game_date(d) for s, d in known.items()}
+    start, end = ALL_STAR_WINDOW
+    for season, days in by_season.items():
+        if season in breaks:
+            continue
+        window = sorted(d for d in days if start <= (d.month, d.day) <= end)
+        gaps = [(b - a).days for a, b in zip(window, window[1:])]
+        if gaps and max(gaps) >= MIN_BREAK_DAYS:
+            breaks[season] = window[gaps.index(max(gaps))] + timedelta(days=1)
+        elif any(end < (d.month, d.day) < (10, 1) for d in days):
+            print(f"    Warning: no All-Star break found in the {season} game log; "
+                  f"add it to ALL_STAR_DATES for pre/post All-Star splits")
+    return breaks
+
+
+def _memberships(g, d, rest, all_star):
+    """(dimension, GROUP_VALUE) pairs a game belongs to."""
+    yield "overall", "Overall"
+    matchup = g.get("MATCHUP") or ""
+    if "vs." in matchup:
+        yield "location", "Home"
+    elif "@" in matchup:
+        yield "location", "Road"
+    if g.get("WL") == "W":
+        yield "win_loss", "Wins"
+    elif g.get("WL") == "L":
+        yield "win_loss", "Losses"
+    if d is not None:
+        yield "month", calendar.month_name[d.month]
+        if all_star is not None and d != all_star:
+            yield "pre_post_allstar", "Pre All-Star" if d < all_star else "Post All-Star"
+    if g.get("GS") is not None:
+        yield "starter_bench", "Starters" if g["GS"] else "Bench"
+    if rest is not None:
+        yield "days_rest", f"{rest} Days Rest" if rest < MAX_REST_DAYS else f"{MAX_REST_DAYS}+ Days Rest"
+    if matchup:
+        yield "opponent", matchup.split()[-1]
+
+
+def compute_splits(games, by="SEASON", seasons=None, all_star_dates=ALL_STAR_DATES):
+    """{group: {dimension: [SplitRow, ...]}} for a list of game-log rows.
+
+    `by` names the field (or tuple of fields, e.g. ("Player_ID", "SEASON"))
+    that separates independent groups; `seasons`, if given, limits the output
+    to those groups, in that order. Averages skip null cells; shooting
+    percentages are total made / total attempted.
+    """
+    fields = (by,) if isinstance(by, str) else tuple(by)
+    keys = [tuple(g.get(f) for f in fields) for g in games]
+    keys = [k[0] for k in keys] if len(fields) == 1 else keys
+    dates = [parse_game_date(g.get("GAME_DATE")) for g in games]
+    rest = _rest_days(games, keys, dates)
+    all_star = all_star_breaks([g.get("SEASON") for g in games], dates, all_star_dates)
+
+    groups = {}  # (key, dimension, value) -> code
+    game_idx, codes = [], []
+    for i, g in enumerate(games):
+        for dim, value in _memberships(g, dates[i], rest[i], all_star.get(g.get("SEASON"))):
+            code = groups.setdefault((keys[i], dim, value), len(groups))
+            game_idx.append(i)
+            codes.append(code)
+    if not groups:
+        return {}
+
+    values = np.array([[g.get(s) for s in AVG_STATS] for g in games], dtype=float)[game_idx]
+    won = np.array([g.get("WL") == "W" for g in games], dtype=float)[game_idx]
+    codes = np.array(codes)
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+    n = len(groups)
+    sums = np.stack([np.bincount(codes, weights=filled[:, j], minlength=n) for j in range(len(AVG_STATS))], axis=1)
+    counts = np.stack([np.bincount(codes, weights=present[:, j], minlength=n) for j in range(len(AVG_STATS))], axis=1)
+    gp = np.bincount(codes, minlength=n)
+    wins = np.bincount(codes, weights=won, minlength=n)
+
+    # Divide in NumPy (same IEEE result as Python), round in Python to keep its rounding.
+    means = (sums / np.maximum(counts, 1)).tolist()
+    has = (counts > 0).tolist()
+    totals = sums.tolist()
+    gp, wins = gp.tolist(), wins.tolist()
+    col = {s: j for j, s in enumerate(AVG_STATS)}
+    pct_cols = [(pct, col[made], col[att]) for pct, made, att in PCT_STATS]
+
+    out = {k: {} for k in (seasons or [])}
+    for (key, dim, value), code in groups.items():
+        if seasons is not None and key not in out:
+            continue
+        games_played, w = gp[code], int(wins[code])
+        row = {
+            "GROUP_SET": DIMENSIONS[dim],
+            "GROUP_VALUE": value,
+            "GP": games_played,
+            "W": w,
+            "L": games_played - w,
+            "W_PCT": round(w / games_played, 3) if games_played else 0,
+        }
+        mean, present, total = means[code], has[code], totals[code]
+        for j, s in enumerate(AVG_STATS):
+            row[s] = round(mean[j], 1) if present[j] else 0
+        for pct, made, att in pct_cols:
+            row[pct] = round(total[made] / total[att], 3) if total[att] > 0 else 0
+        out.setdefault(key, {}).setdefault(dim, []).append(row)
+
+    result = {}
+    for key, dims in out.items():
+        if not dims:
+            continue
+        result[key] = {}
+        for dim in DIMENSIONS:
+            rows = dims.get(dim, [])
+            if dim in ORDER:
+                rows.sort(key=lambda r: ORDER[dim](r["GROUP_VALUE"]))
+            result[key][dim] = [{k: r[k] for k in ROW_KEYS} for r in rows]
+    return result
+
@@ -0,0 +1,127 @@
+"""
+Local stand-in for stats.nba.com and basketball-reference.com.
+Replays a fixture directory recorded with --record (see fixtures.py), with
+optional latency and injected failures, so the fetch scripts can run end to
+end without the real sites.
+
+Usage:
+    python data/scripts/standin.py data/fixtures/2026-10 --port 8765 --latency 0.2 \\
+        --error-rate 0.1 --errors 429,timeout
+    BRAUNSTATS_STANDIN=http://127.0.0.1:8765 python data/scripts/fetch_stats.py --no-cache
+"""
+
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from fixtures import FixtureStore
+
+ERRORS = ("403", "429", "500", "503", "timeout")
+HANG_SECONDS = 90  # longer than either script's request timeout
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, store, port=0, latency=0.0, error_rate=0.0, errors=("429",), hang=HANG_SECONDS, seed=0):
+        super().__init__(("127.0.0.1", port), StandinHandler)
+        self.store = store
+        self.latency = latency
+        self.error_rate = error_rate
+        self.errors = tuple(errors)
+        self.hang = hang
+        self.counts = {"served": 0, "missing": 0, **{e: 0 for e in self.errors}}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def pick_error(self):
+        with self._lock:
+            if self.errors and self._rng.random() < self.error_rate:
+                return self._rng.choice(self.errors)
+        return None
+
+    def count(self, outcome):
+        with self._lock:
+            self.counts[outcome] += 1
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        error = server.pick_error()
+        if error is not None:
+            server.count(error)
+            if error == "timeout":
+                time.sleep(server.hang)
+                self.close_connection = True
+                return
+            self.send_response(int(error))
+            if error == "429":
+                self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        parts = urlsplit(self.path)
+        found = server.store.lookup(parts.path, dict(parse_qsl(parts.query, keep_blank_values=True)))
+        if found is None:
+            server.count("missing")
+            self.send_error(404, "not recorded")
+            return
+        body, content_type = found
+        server.count("served")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(fixtures, **options):
+    """Serve `fixtures` from a background thread; returns the server (see .url, .counts)."""
+    server = StandinServer(FixtureStore(fixtures), **options)
+    threading.Thread(target=server.serve_forever, name="standin", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", help="fixture directory written by --record")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests that fail (0-1)")
+    parser.add_argument("--errors", default="429",
+                        help=f"comma-separated failure kinds to inject: {', '.join(ERRORS)}")
+    parser.add_argument("--seed", type=int, default=0, help="seed for which requests fail")
+    args = parser.parse_args()
+
+    errors = [e for e in args.errors.split(",") if e]
+    unknown = set(errors) - set(ERRORS)
+    if unknown:
+        parser.error(f"unknown error kind: {', '.join(sorted(unknown))}")
+    server = StandinServer(FixtureStore(args.fixtures), port=args.port, latency=args.latency,
+                           error_rate=args.error_rate, errors=errors, seed=args.seed)
+    print(f"Serving {len(server.store.entries)} recorded responses at {server.url} (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Requests: {server.counts}")
+
+
+if __name__ == "__main__":
+    main()
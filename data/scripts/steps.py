@@ -0,0 +1,254 @@
+"""
+Step declarations and the DAG executor shared by the fetch scripts.
+A Step is one unit of a pipeline run: a name for logs and the run report,
+the function that does the work, the output files it writes (the first is
+the one it is known by) and the output files of other steps it reads.
+
+run_steps() orders steps by those declarations and runs every step whose
+upstream steps are done, concurrently. Documents a downstream step needs are
+handed over in memory (output.Handoff) instead of being read back from disk. A step
+with inputs is skipped when the content hash of its inputs matches the last
+successful run and its outputs on disk are the ones that run wrote; its
+StepContext can also tell which partitions (e.g. seasons) of an input
+changed, so only those are recomputed.
+
+A run can be narrowed to some steps (select_steps) and some seasons
+(select_seasons); print_plan() is the dry run of what its steps would
+request.
+"""
+
+import hashlib
+import json
+import os
+import re
+import traceback
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+# requests, if given, returns what the step will fetch, in the fetch module's
+# own terms (endpoint calls, page URLs); see print_plan().
+Step = namedtuple("Step", "name fn outputs inputs requests", defaults=((), None))
+
+STATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "steps")
+
+
+def by_output(steps):
+    """{primary output file: step} for a list of steps."""
+    return {step.outputs[0]: step for step in steps}
+
+
+def step_key(step):
+    """Command-line name of a step: "Game Logs" -> game_logs, "On/Off" -> on_off."""
+    return re.sub(r"[^a-z0-9]+", "_", step.name.lower()).strip("_")
+
+
+def select_steps(steps, keys):
+    """The steps named in `keys` ("game_logs,shot_chart"), in plan order; all of them if
+    `keys` is empty. Raises ValueError for a name no step has."""
+    wanted = [k.strip() for k in (keys or "").split(",") if k.strip()]
+    if not wanted:
+        return steps
+    known = {step_key(s): s for s in steps}
+    unknown = [k for k in wanted if k not in known]
+    if unknown:
+        raise ValueError(f"unknown step {', '.join(unknown)} (steps: {', '.join(known)})")
+    return [s for s in steps if step_key(s) in wanted]
+
+
+def select_seasons(seasons, labels, label=str):
+    """The entries of `seasons` whose label is listed in `labels` ("2024-25,2025-26").
+    Raises ValueError for a label none of them has."""
+    wanted = [x.strip() for x in labels.split(",") if x.strip()]
+    known = {label(s): s for s in seasons}
+    unknown = [x for x in wanted if x not in known]
+    if unknown:
+        raise ValueError(f"unknown season {', '.join(unknown)} (seasons: {', '.join(known)})")
+    return [s for s in seasons if label(s) in wanted]
+
+
+def state_path(script):
+    return os.path.join(STATE_DIR, f"{script}.json")
+
+
+def digest(value):
+    """Content hash of a JSON-able value, independent of key order."""
+    text = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def call(step, ctx):
+    """Invoke a step: steps with inputs take their StepContext, the rest take nothing."""
+    return step.fn(ctx) if step.inputs else step.fn()
+
+
+class StepContext:
+    """What a step with inputs is called with: its inputs' data, and what changed since its last run."""
+
+    def __init__(self, inputs, load=None, record=None):
+        self.inputs = inputs
+        self.partitions = {}
+        self._load = load
+        self._record = record or {}
+
+    def changed(self, filename, rows, field):
+        """Values of `field` whose rows of input `filename` differ from the last successful run
+        (every value on a first run)."""
+        groups = {}
+        for row in rows:
+            groups.setdefault(row.get(field), []).append(row)
+        digests = {str(value): digest(group) for value, group in groups.items()}
+        self.partitions[filename] = digests
+        before = self._record.get("partitions", {}).get(filename, {})
+        return {value for value in groups if before.get(str(value)) != digests[str(value)]}
+
+    def previous(self, filename):
+        """This step's own output from its last run, if the file on disk is still that output."""
+        if self._load is None:
+            return None
+        data = self._load(filename)
+        written = self._record.get("outputs", {}).get(filename)
+        return data if data is not None and written == digest(data) else None
+
+
+def _order(steps):
+    """Upstream step names of every step; raises ValueError on a cycle or duplicate output."""
+    producers = {}
+    for step in steps:
+        for f in step.outputs:
+            if f in producers:
+                raise ValueError(f"{f} is written by both {producers[f]} and {step.name}")
+            producers[f] = step.name
+    upstream = {s.name: {producers[f] for f in s.inputs if f in producers} for s in steps}
+    done, remaining = set(), dict(upstream)
+    while remaining:
+        ready = [name for name, deps in remaining.items() if deps <= done]
+        if not ready:
+            raise ValueError(f"steps depend on each other: {', '.join(sorted(remaining))}")
+        done.update(ready)
+        for name in ready:
+            del remaining[name]
+    return upstream
+
+
+def run_steps(steps, handoff, load, report=None, state=None, force=False):
+    """Run `steps` as a DAG; returns {step name: "ok" | "skipped" | exception}.
+
+    handoff is the Handoff the steps write through; load(filename) returns
+    an output's stored data, or None (for inputs no step in this run
+    produces, and for skip checks); report is the RunReport each step is timed in; state is the
+    path of the JSON file that remembers input hashes between runs; force
+    reruns every step. A step whose upstream failed still runs, on whatever
+    is on disk.
+    """
+    run = report.run if report is not None else (lambda name, fn: fn())
+    upstream = _order(steps)
+    derived = [s for s in steps if s.inputs]
+    handoff.keep |= {f for s in derived for f in s.inputs + s.outputs}
+    records = _load_state(state)
+    results = {}
+
+    def execute(step):
+        if not step.inputs:
+            run(step.name, step.fn)
+            return "ok"
+        inputs = {f: handoff.data[f] if f in handoff.data else load(f) for f in step.inputs}
+        key = digest([step.name, sorted((f, digest(data)) for f, data in inputs.items())])
+        record = records.get(step.name, {})
+        if not force and record.get("inputs") == key and all(
+            digest(load(f)) == record.get("outputs", {}).get(f) for f in step.outputs
+        ):
+            print(f"  {step.name}: inputs unchanged, skipping")
+            if report is not None:
+                report.skip(step.name)
+            return "skipped"
+        ctx = StepContext(inputs, load, record)
+        run(step.name, lambda: step.fn(ctx))
+        records[step.name] = {
+            "inputs": key,
+            "partitions": ctx.partitions,
+            "outputs": {f: digest(handoff.data.get(f)) for f in step.outputs},
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+        }
+        return "ok"
+
+    with ThreadPoolExecutor(max_workers=len(steps) or 1, thread_name_prefix="step") as pool:
+        running = {}
+        pending = list(steps)
+        while pending or running:
+            for step in [s for s in pending if upstream[s.name] <= results.keys()]:
+                pending.remove(step)
+                running[pool.submit(execute, step)] = step
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for job in done:
+                step = running.pop(job)
+                try:
+                    results[step.name] = job.result()
+                except Exception as e:
+                    results[step.name] = e
+    if state is not None:
+        _save_state(state, records)
+    return {s.name: results[s.name] for s in steps}
+
+
+def print_plan(steps, describe, cache, interval):
+    """Dry run: every request `steps` would make, what the response cache holds for it, and
+    the wall time the rest would spend in the rate limiter at one request per `interval` seconds.
+
+    describe(request) turns an item of step.requests() into (url, cache key).
+    Returns the number of requests that would go over the network.
+    """
+    seen = set()
+    network = cached = 0
+    for step in steps:
+        requests = step.requests() if step.requests is not None else []
+        if not requests:
+            source = f"computed from {', '.join(step.inputs)}" if step.inputs else "nothing to fetch"
+            print(f"{step.name}: no requests ({source})")
+            continue
+        print(f"{step.name}: {len(requests)} requests")
+        for request in requests:
+            url, key = describe(request)
+            if key in seen:
+                print(f"  {'shared':<8} {url}")
+                continue
+            seen.add(key)
+            status = cache.status(key)
+            if status == "hit":
+                cached += 1
+            else:
+                network += 1
+            print(f"  {status:<8} {url}")
+    wall = max(network - 1, 0) * interval  # the first request goes out at once
+    print("=" * 50)
+    print(f"{cached + network} requests: {cached} from cache, {network} over the network")
+    print(f"Rate limit: one request every {interval:g}s, at least {wall:.0f}s of wall time"
+          f"{' (offline: misses will fail)' if cache.offline and network else ''}")
+    return network
+
+
+def report_failures(results, show_traceback=False):
+    """Print the steps that raised; returns how many succeeded or were skipped."""
+    for name, outcome in results.items():
+        if isinstance(outcome, Exception):
+            print(f"  FAILED {name}: {outcome}")
+            if show_traceback:
+                traceback.print_exception(outcome)
+    return sum(not isinstance(outcome, Exception) for outcome in results.values())
+
+
+def _load_state(path):
+    if path is None:
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(path, records):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(records, f, indent=2)
+    os.replace(f"{path}.tmp", path)
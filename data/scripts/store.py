@@ -0,0 +1,422 @@
+"""
+SQLite store: the pipeline's system of record. The JSON files in data/ are
+exports of it.
+
+Documents are split by season. Row lists with a season field (games, shots,
+career rows) go one row per record into the games, shots and career
+tables, keyed by what identifies the record (a game by season type and
+game id, a shot by game and event id) with its place in the list kept in
+a `pos` column. Season-keyed objects ({"2024-25": ...}) are split the same
+way where their values are tables: on/off views go one row per measure and
+view into on_off, lineup tables one row per lineup into lineups. Other
+season-keyed objects (splits) go one record per season into splits. What
+is left (player info, ids, empty placeholders) is the document's skeleton,
+kept in `documents` with the order of every season container.
+
+Each row carries fetched_at, when its current content was first written.
+A write that changes or deletes a row first copies the old content into
+`superseded`, so the store keeps the history of every upsert even though
+the files only ever show the latest one.
+
+A write upserts the seasons it contains and leaves the store's other
+seasons alone. Within a season, rows are upserted by key and the stored
+rows the write no longer has are deleted. So a run limited to 2025-26
+updates that season and the export still has every other one. Writing the
+same document twice changes nothing. export() reassembles a file with the
+same content and key order as the document that was written. Row lists
+stream both ways: a generator of rows is inserted as it is consumed, and
+the export's top-level row lists are generators over a cursor, so game
+logs and shot charts are never held in memory as one document. A file the
+store has never seen is first loaded from its JSON in the output
+directory, so an existing data/ seeds an empty store.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from itertools import chain
+
+from columnar import read_json
+from incremental import parse_game_date
+from lineups import lineup_ids
+
+STORE_FILE = os.path.join(".cache", "store.sqlite")  # relative to the output directory
+SEASON_KEY_LENGTH = 7  # "2024-25"
+# Fields that give a row its season, in order of preference (career rows use GROUP_VALUE).
+SEASON_FIELDS = ("SEASON", "GROUP_VALUE")
+
+
+def _game_date(row, *_):
+    d = parse_game_date(row.get("GAME_DATE"))
+    return d.isoformat() if d else None
+
+
+def _court_status(row, *_):
+    status = row.get("COURT_STATUS") or row.get("GROUP_SET")
+    return status if status in ("On", "Off") else None
+
+
+def _on_off_records(value):
+    """(slot, row) records of an on/off season: one per measure and view
+    ({"base": {"jokic_on": row, ...}, ...}), or the whole value as one record for anything
+    else (a season's lineup_pairs row, a season without measures)."""
+    if isinstance(value, dict) and value and all(
+            isinstance(views, dict) and views and all(row is None or isinstance(row, dict) for row in views.values())
+            for views in value.values()):
+        return [((measure, view), row) for measure, views in value.items() for view, row in views.items()]
+    return [((), value)]
+
+
+def _lineup_records(value):
+    """(slot, row) records of a player's lineup season ({"2": rows, ..., "5": rows}): one per
+    lineup. A size without lineups is one record with no row."""
+    if isinstance(value, dict) and value and all(isinstance(rows, list) for rows in value.values()):
+        return [((size,), row) for size, rows in value.items() for row in rows or [None]]
+    return [((), value)]
+
+
+def _assemble(records, lists):
+    """A season value from its (slot, row) records, in order. With lists, a slot holds a
+    list of rows rather than one row."""
+    value = {}
+    for slot, row in records:
+        if not slot:
+            return row
+        parent = value
+        for key in slot[:-1]:
+            parent = parent.setdefault(key, {})
+        if lists:
+            rows = parent.setdefault(slot[-1], [])
+            if row is not None:
+                rows.append(row)
+        else:
+            parent[slot[-1]] = row
+    return value
+
+
+# Row tables: table -> ({key column: value}, {other indexed column: value}), each value a
+# function of (row, slot, owner); `owner` holds the meta and the scalar fields of the object
+# around the part (a pair's player_id and team_id). The key columns identify a row within its
+# file, part and season.
+ROW_TABLES = {
+    "games": ({"season_type": lambda r, *_: r.get("SEASON_TYPE"), "game_id": lambda r, *_: r.get("Game_ID")},
+              {"game_date": _game_date}),
+    # Shot charts without GAME_EVENT_ID (BBRef's, the generated one) fall back to the shot's
+    # number within its game; see _unique_key().
+    "shots": ({"game_id": lambda r, *_: r.get("GAME_ID"), "event_id": lambda r, *_: r.get("GAME_EVENT_ID")},
+              {"game_date": _game_date}),
+    "career": ({"team": lambda r, *_: r.get("TEAM_ABBREVIATION", r.get("TEAM_ID"))}, {}),
+    "on_off": ({"measure": lambda r, slot, _: slot[0] if slot else None,
+                "view": lambda r, slot, _: slot[-1] if slot else None},
+               {"team": lambda r, slot, owner: r.get("TEAM_ID", owner.get("team_id")),
+                "player": lambda r, slot, owner: owner.get("player_id"),
+                "vs_player": lambda r, *_: r.get("VS_PLAYER_ID"),
+                "court_status": _court_status}),
+    "lineups": ({"group_size": lambda r, slot, _: slot[0] if slot else None,
+                 "player_ids": lambda r, *_: "-".join(map(str, sorted(lineup_ids(r.get("GROUP_ID"))))) or None},
+                {}),
+    "splits": ({}, {}),
+}
+# Row tables filled from season-keyed objects: table -> (records of a season value, slots hold lists).
+# The others are filled from row lists.
+NESTED_TABLES = {
+    "on_off": (_on_off_records, False),
+    "lineups": (_lineup_records, True),
+    "splits": (lambda value: [((), value)], False),
+}
+# Output file -> the table its season parts go to. Other files are stored whole in `documents`.
+FILE_TABLES = {
+    "game_log.json": "games",
+    "shot_chart.json": "shots",
+    "career.json": "career",
+    "general_splits.json": "splits",
+    "shooting_splits.json": "splits",
+    "on_off_jokic.json": "on_off",
+    "on_off_pairs.json": "on_off",
+    "lineups.json": "lineups",
+}
+
+SCHEMA_VERSION = 4  # PRAGMA user_version; a store written by another version is rebuilt
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS documents (
+        file TEXT PRIMARY KEY, source TEXT, meta TEXT NOT NULL, skeleton TEXT NOT NULL,
+        layout TEXT NOT NULL, updated_at TEXT NOT NULL)""",
+    *(f"""CREATE TABLE IF NOT EXISTS {table} (
+        file TEXT NOT NULL, path TEXT NOT NULL, season TEXT NOT NULL,
+        {"".join(f"{column} TEXT NOT NULL, " for column in keys)}pos INTEGER NOT NULL,
+        {"slot TEXT NOT NULL, " if table in NESTED_TABLES else ""}{"".join(f"{column} TEXT, " for column in columns)}
+        row TEXT NOT NULL, fetched_at TEXT NOT NULL, written_at TEXT NOT NULL,
+        PRIMARY KEY (file, path, season{"".join(f", {column}" for column in keys)}))"""
+      for table, (keys, columns) in ROW_TABLES.items()),
+    *(f"CREATE INDEX IF NOT EXISTS {table}_order ON {table} (file, path, season, pos)" for table in ROW_TABLES),
+    # Every row content a write replaced or deleted, with when it was fetched and when it was superseded.
+    """CREATE TABLE IF NOT EXISTS superseded (
+        tbl TEXT NOT NULL, file TEXT NOT NULL, path TEXT NOT NULL, season TEXT NOT NULL, key TEXT NOT NULL,
+        row TEXT NOT NULL, fetched_at TEXT NOT NULL, superseded_at TEXT NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS superseded_file ON superseded (file, season, superseded_at)",
+    *(f"""CREATE TRIGGER IF NOT EXISTS {table}_superseded AFTER UPDATE OF row ON {table}
+        WHEN old.row IS NOT new.row BEGIN
+        INSERT INTO superseded VALUES ('{table}', old.file, old.path, old.season,
+            json_array({", ".join(f"old.{column}" for column in keys)}), old.row, old.fetched_at, new.written_at);
+        END""" for table, (keys, _) in ROW_TABLES.items()),
+    "CREATE INDEX IF NOT EXISTS games_date ON games (game_date)",
+    "CREATE INDEX IF NOT EXISTS games_game ON games (season, season_type, game_id)",
+    "CREATE INDEX IF NOT EXISTS shots_game ON shots (game_id, event_id)",
+    "CREATE INDEX IF NOT EXISTS shots_date ON shots (game_date)",
+    "CREATE INDEX IF NOT EXISTS on_off_team ON on_off (team, season, measure)",
+    "CREATE INDEX IF NOT EXISTS on_off_player ON on_off (player, vs_player, court_status)",
+    "CREATE INDEX IF NOT EXISTS lineups_group ON lineups (season, group_size, player_ids)",
+]
+
+
+def is_season(key):
+    """True for a season label such as "2024-25"."""
+    key = str(key)
+    return len(key) == SEASON_KEY_LENGTH and key[4] == "-" and key[:4].isdigit() and key[5:].isdigit()
+
+
+def season_field(rows):
+    """The field that holds the season of `rows` (a list of dicts), or None."""
+    if not rows or not all(isinstance(r, dict) for r in rows):
+        return None
+    return next((f for f in SEASON_FIELDS if is_season(rows[0].get(f, ""))), None)
+
+
+def split(data, rows):
+    """(skeleton, parts) of a document's data, with each part left empty in the skeleton.
+    With rows=True, parts is [(path, (season, row) pairs)] for the row lists (or row
+    generators, consumed lazily) that have a season field; otherwise it is
+    [(path, {season: value})] for the season-keyed objects. Parts are in document order."""
+    parts = []
+
+    def walk(value, path):
+        if isinstance(value, dict):
+            if not rows and value and all(is_season(k) for k in value):
+                parts.append((path, dict(value)))
+                return {}
+            return {k: walk(v, path + (str(k),)) for k, v in value.items()}
+        if not rows or not isinstance(value, (list, Iterator)):
+            return list(value) if isinstance(value, Iterator) else value
+        if isinstance(value, Iterator):
+            # A row generator: its first row tells whether it is a season part.
+            first = next(value, None)
+            field = season_field([first]) if first is not None else None
+            value = chain([first], value) if first is not None else []
+            if field is None:
+                return list(value)
+        else:
+            field = season_field(value)
+            if field is None:
+                return value
+        parts.append((path, ((str(row.get(field) or ""), row) for row in value)))
+        return []
+
+    return walk(data, ()), parts
+
+
+def season_order(old, new):
+    """Order of a part's seasons after `new` is written over `old`. A write that covers every
+    stored season sets the order. A partial write keeps it. Otherwise the union is sorted the
+    way `new` is sorted."""
+    if set(new) >= set(old):
+        return list(new)
+    if set(new) <= set(old):
+        return list(old)
+    return sorted(set(old) | set(new), reverse=len(new) > 1 and new[0] > new[-1])
+
+
+def _unique_key(key, taken):
+    """`key`, or if it is already in `taken` (two rows of a season with the same key, such as
+    shots without an event id), the first of key#2, key#3, ... that is not."""
+    n = 1
+    unique = key
+    while unique in taken:
+        n += 1
+        unique = (*key[:-1], f"{key[-1]}#{n}")
+    taken.add(unique)
+    return unique
+
+
+def _at(data, path):
+    for key in path:
+        data = data[key]
+    return data
+
+
+class Store:
+    def __init__(self, path, output_dir):
+        self.path = path
+        self.output_dir = output_dir
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.RLock()
+        with self._db:
+            if self._db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                # Tables of an older layout; the store reloads the JSON exports as files are written.
+                # superseded is kept.
+                for table in ("documents", *ROW_TABLES):
+                    self._db.execute(f"DROP TABLE IF EXISTS {table}")
+                self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            for statement in SCHEMA:
+                self._db.execute(statement)
+
+    def write(self, filename, data, meta):
+        """Upsert a document; returns the file's data as exported afterwards, with its
+        top-level row lists as generators that read from the store."""
+        with self._lock:
+            self._seed(filename)
+            self._upsert(filename, data, meta)
+            return self._export(filename, stream=True)
+
+    def data(self, filename, source=None):
+        """The exported data of `filename`, or None if the store has none (or, given `source`,
+        none written by that source)."""
+        with self._lock:
+            if self.meta(filename, source) is None:
+                return None
+            return self._export(filename)
+
+    def meta(self, filename, source=None):
+        """The meta last written with `filename`, or None, as for data()."""
+        with self._lock:
+            self._seed(filename)
+            row = self._db.execute("SELECT source, meta FROM documents WHERE file = ?", (filename,)).fetchone()
+            if row is None or (source is not None and row[0] != source):
+                return None
+            return json.loads(row[1])
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _seed(self, filename):
+        """Load a file the store has never seen from its JSON export, if there is one."""
+        if self._db.execute("SELECT 1 FROM documents WHERE file = ?", (filename,)).fetchone():
+            return
+        try:
+            doc = read_json(os.path.join(self.output_dir, filename))
+        except (OSError, ValueError):
+            return
+        if isinstance(doc.get("data"), dict):
+            self._upsert(filename, doc["data"], doc.get("meta", {}))
+
+    def _upsert(self, filename, data, meta):
+        table = FILE_TABLES.get(filename)
+        if table:
+            skeleton, parts = split(data, rows=table in ROW_TABLES and table not in NESTED_TABLES)
+        else:
+            skeleton, parts = {k: list(v) if isinstance(v, Iterator) else v for k, v in data.items()}, []
+        source = meta.get("source")
+        written_at = datetime.now(timezone.utc).isoformat()
+        old = self._db.execute("SELECT source, layout FROM documents WHERE file = ?", (filename,)).fetchone()
+        layout = {}
+        with self._db:
+            if old is not None and old[0] == source:
+                layout = {tuple(path): seasons for path, seasons in json.loads(old[1])}
+            elif table:
+                # A document from another source replaces the file rather than mixing with it.
+                self._retire(table, "file = ?", (filename,), written_at)
+            new_layout = []
+            for path, groups in parts:
+                key = json.dumps(path)
+                if table in NESTED_TABLES:
+                    records, _ = NESTED_TABLES[table]
+                    owner = {**meta, **{k: v for k, v in _at(skeleton, path[:-1]).items()
+                                        if not isinstance(v, (dict, list))}}
+                    seasons = list(groups)
+                    self._insert_rows(table, filename, key, owner, written_at, (
+                        (season, slot, row) for season, value in groups.items() for slot, row in records(value)))
+                else:
+                    seasons = self._insert_rows(table, filename, key, meta, written_at,
+                                                ((season, (), row) for season, row in groups))
+                new_layout.append((list(path), season_order(layout.pop(path, []), seasons)))
+            for path in layout:
+                # The document no longer has this part (e.g. an on/off view that was dropped).
+                self._retire(table, "file = ? AND path = ?", (filename, json.dumps(path)), written_at)
+            self._db.execute(
+                "INSERT OR REPLACE INTO documents (file, source, meta, skeleton, layout, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (filename, source, json.dumps(meta), json.dumps(skeleton), json.dumps(new_layout), written_at),
+            )
+
+    def _insert_rows(self, table, filename, key, owner, written_at, rows):
+        """Upsert a part's (season, slot, row) records by key as they are consumed; returns its
+        seasons in order. Each row's `pos` is its place in the season, and the season's stored
+        rows whose key the part no longer has are deleted. Seasons the part does not have are
+        left alone. A row's fetched_at is when its current content was first written."""
+        keys, columns = ROW_TABLES[table]
+        slot_column = ["slot"] if table in NESTED_TABLES else []
+        values = ["pos", *slot_column, *columns, "row", "written_at"]
+        names = ", ".join(["file", "path", "season", *keys, *values, "fetched_at"])
+        marks = ", ".join("?" * (len(keys) + len(values) + 4))
+        updates = ", ".join([*(f"{column} = excluded.{column}" for column in values),
+                             f"fetched_at = CASE WHEN {table}.row = excluded.row THEN {table}.fetched_at "
+                             "ELSE excluded.fetched_at END"])
+        conflict = ", ".join(["file", "path", "season", *keys])
+        counts = {}
+        taken = {}  # season -> keys written
+
+        def records():
+            for season, slot, row in rows:
+                pos = counts.get(season, 0)
+                counts[season] = pos + 1
+                fields = row if isinstance(row, dict) else {}
+                ident = tuple("" if (v := fn(fields, slot, owner)) is None else str(v) for fn in keys.values())
+                yield (filename, key, season, *_unique_key(ident, taken.setdefault(season, set())), pos,
+                       *([json.dumps(slot)] if slot_column else []),
+                       *(fn(fields, slot, owner) for fn in columns.values()), json.dumps(row), written_at, written_at)
+
+        self._db.executemany(f"INSERT INTO {table} ({names}) VALUES ({marks}) "
+                             f"ON CONFLICT ({conflict}) DO UPDATE SET {updates}", records())
+        for season in counts:
+            self._retire(table, "file = ? AND path = ? AND season = ? AND written_at != ?",
+                         (filename, key, season, written_at), written_at)
+        return list(counts)
+
+    def _retire(self, table, where, params, superseded_at):
+        """Delete the rows of `table` that match `where`, keeping their content in superseded."""
+        keys, _ = ROW_TABLES[table]
+        self._db.execute(f"INSERT INTO superseded SELECT '{table}', file, path, season, json_array({', '.join(keys)}), "
+                         f"row, fetched_at, ? FROM {table} WHERE {where}", (superseded_at, *params))
+        self._db.execute(f"DELETE FROM {table} WHERE {where}", params)
+
+    def _export(self, filename, stream=False):
+        skeleton, layout = self._db.execute(
+            "SELECT skeleton, layout FROM documents WHERE file = ?", (filename,)).fetchone()
+        data = json.loads(skeleton)
+        table = FILE_TABLES.get(filename)
+        for path, seasons in json.loads(layout):
+            key = json.dumps(path)
+            container = _at(data, path)
+            if table in NESTED_TABLES:
+                _, lists = NESTED_TABLES[table]
+                records = {}
+                for season, slot, row in self._db.execute(
+                        f"SELECT season, slot, row FROM {table} WHERE file = ? AND path = ? ORDER BY season, pos",
+                        (filename, key)):
+                    records.setdefault(season, []).append((tuple(json.loads(slot)), json.loads(row)))
+                container.update((season, _assemble(records[season], lists)) for season in seasons if season in records)
+            else:
+                rows = self._rows(table, filename, key, seasons)
+                if stream and len(path) == 1:
+                    data[path[0]] = rows
+                else:
+                    container.extend(rows)
+        return data
+
+    def _rows(self, table, filename, key, seasons):
+        """A part's rows in season order. They are read on a connection of their own, so the
+        generator can be consumed after write() has returned and released the lock."""
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            for season in seasons:
+                for (row,) in db.execute(
+                        f"SELECT row FROM {table} WHERE file = ? AND path = ? AND season = ? ORDER BY pos",
+                        (filename, key, season)):
+                    yield json.loads(row)
+        finally:
+            db.close()
@@ -0,0 +1,62 @@
+"""
+Golden-file tests for the Basketball Reference parsers.
+data/fixtures/parsers/pages/ holds saved pages with BBRef's markup (tables
+inside HTML comments, over-headers, repeated header rows, DNP rows) and
+golden/ the parse_* output expected from each. A parser change that alters
+the output fails here; when the change is intended, rewrite the golden set
+and commit it with the change.
+
+Usage:
+    python -m pytest data/scripts/test_parsers.py
+    python data/scripts/test_parsers.py --update
+"""
+
+import json
+import os
+import sys
+import unittest
+
+import fetch_bbref
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "parsers")
+PAGES = {
+    "player.html": (fetch_bbref.parse_player_page, None),
+    "gamelog_2025.html": (fetch_bbref.parse_game_log_page, 2025),
+    "shooting_2025.html": (fetch_bbref.parse_shooting_page, 2025),
+    "onoff_2025.html": (fetch_bbref.parse_on_off_page, 2025),
+}
+
+
+def parse(page):
+    """The parser output for `page`, as plain JSON data (tuples become lists)."""
+    parser, year = PAGES[page]
+    with open(os.path.join(FIXTURES, "pages", page), encoding="utf-8") as f:
+        return json.loads(json.dumps(parser(f.read(), year)))
+
+
+def golden_path(page):
+    return os.path.join(FIXTURES, "golden", page.replace(".html", ".json"))
+
+
+def update():
+    os.makedirs(os.path.join(FIXTURES, "golden"), exist_ok=True)
+    for page in PAGES:
+        with open(golden_path(page), "w") as f:
+            json.dump(parse(page), f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"  -> Wrote {os.path.relpath(golden_path(page), FIXTURES)}")
+
+
+class ParserGoldenTest(unittest.TestCase):
+    def test_pages_match_golden(self):
+        for page in PAGES:
+            with self.subTest(page=page):
+                with open(golden_path(page)) as f:
+                    self.assertEqual(parse(page), json.load(f))
+
+
+if __name__ == "__main__":
+    if "--update" in sys.argv:
+        update()
+    else:
+        unittest.main()
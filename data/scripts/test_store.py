@@ -0,0 +1,178 @@
+"""
+Tests for the SQLite store: documents split into the row tables and
+exported back unchanged, upserts by key, partial writes such as a
+--seasons run, a file changing source, and the superseded history.
+
+Usage:
+    python -m pytest data/scripts/test_store.py
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from store import Store, split
+
+NBA = {"source": "stats.nba.com"}
+BBREF = {"source": "basketball-reference.com"}
+
+
+def game(season, game_id, pts, season_type="Regular Season"):
+    return {"SEASON": season, "SEASON_TYPE": season_type, "Game_ID": game_id,
+            "GAME_DATE": "2024-11-0" + game_id[-1], "PTS": pts}
+
+
+def shot(season, game_id, event_id, made):
+    return {"SEASON": season, "GAME_ID": game_id, "GAME_EVENT_ID": event_id, "SHOT_MADE_FLAG": made}
+
+
+def view(team, vs_player, status, rating):
+    return {"TEAM_ID": team, "VS_PLAYER_ID": vs_player, "COURT_STATUS": status, "OFF_RATING": rating}
+
+
+def lineup(*ids):
+    return {"GROUP_ID": "-" + "-".join(map(str, ids)) + "-", "MIN": 10.0 * len(ids)}
+
+
+GAME_LOG = {"games": [game("2024-25", "0022400001", 10), game("2024-25", "0022400002", 12),
+                      game("2024-25", "0042400001", 8, "Playoffs"), game("2025-26", "0022500001", 15)]}
+SHOT_CHART = {"shots": [shot("2024-25", "0022400001", 7, 1), shot("2024-25", "0022400001", 19, 0),
+                        shot("2025-26", "0022500001", 4, 1)]}
+ON_OFF = {
+    "on_off": {
+        season: {"base": {"jokic_on": view(1610612743, 203999, "On", 120.1),
+                          "jokic_off": view(1610612743, 203999, "Off", 104.3)},
+                 "advanced": {"jokic_on": None, "jokic_off": view(1610612743, 203999, "Off", 99.0)}}
+        for season in ("2024-25", "2025-26")
+    },
+    "lineup_pairs": {"2024-25": lineup(1631128, 203999), "2025-26": None},
+}
+LINEUPS = {"players": {"1631128": {
+    "2024-25": {"2": [lineup(1631128, 203999), lineup(1631128, 1629008)], "3": [], "5": [lineup(5, 4, 3, 2, 1631128)]},
+}}}
+SPLITS = {"2025-26": {"home": {"PTS": 11.0}}, "2024-25": {"home": {"PTS": 9.0}}}
+OVERVIEW = {"info": {"name": "Christian Braun"}, "headline": {"PTS": 12.0}}
+
+
+def exported(data):
+    """Store output as plain JSON data (row generators become lists)."""
+    return json.loads(json.dumps(data, default=list))
+
+
+class StoreTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.store = self.open()
+
+    def open(self):
+        store = Store(os.path.join(self.dir.name, "store.sqlite"), self.dir.name)
+        self.addCleanup(store.close)
+        return store
+
+    def write(self, filename, data, meta=NBA):
+        return exported(self.store.write(filename, json.loads(json.dumps(data)), dict(meta)))
+
+    def query(self, sql, *params):
+        return self.store._db.execute(sql, params).fetchall()
+
+    def test_round_trip(self):
+        for filename, data in [("game_log.json", GAME_LOG), ("shot_chart.json", SHOT_CHART),
+                               ("on_off_jokic.json", ON_OFF), ("lineups.json", LINEUPS),
+                               ("general_splits.json", SPLITS), ("player_overview.json", OVERVIEW)]:
+            with self.subTest(filename=filename):
+                self.assertEqual(self.write(filename, data), data)
+                # Key order too: the export is the file that gets written.
+                self.assertEqual(json.dumps(exported(self.store.data(filename))), json.dumps(data))
+
+    def test_streamed_rows(self):
+        out = self.store.write("game_log.json", {"games": iter(GAME_LOG["games"])}, dict(NBA))
+        self.assertEqual(list(out["games"]), GAME_LOG["games"])
+
+    def test_split(self):
+        skeleton, parts = split(ON_OFF, rows=False)
+        self.assertEqual(skeleton, {"on_off": {}, "lineup_pairs": {}})
+        self.assertEqual([path for path, _ in parts], [("on_off",), ("lineup_pairs",)])
+        skeleton, parts = split(GAME_LOG, rows=True)
+        self.assertEqual(skeleton, {"games": []})
+        self.assertEqual([season for season, _ in parts[0][1]], ["2024-25"] * 3 + ["2025-26"])
+
+    def test_row_columns(self):
+        self.write("on_off_jokic.json", ON_OFF, {**NBA, "player_id": 1631128})
+        self.write("lineups.json", LINEUPS)
+        self.assertIn(("2024-25", "base", "jokic_off", "1610612743", "1631128", "203999", "Off"), self.query(
+            "SELECT season, measure, view, team, player, vs_player, court_status FROM on_off"))
+        self.assertEqual(self.query("SELECT group_size, player_ids FROM lineups ORDER BY pos"),
+                         [("2", "203999-1631128"), ("2", "1629008-1631128"), ("3", ""), ("5", "2-3-4-5-1631128")])
+
+    def test_upsert_by_key(self):
+        self.write("game_log.json", GAME_LOG)
+        games = GAME_LOG["games"]
+        changed = [dict(games[1], PTS=30), games[0], games[2], games[3]]
+        self.assertEqual(self.write("game_log.json", {"games": changed}), {"games": changed})
+        rows = self.query("SELECT game_id, pos, row FROM games WHERE season = '2024-25' ORDER BY pos")
+        self.assertEqual([(g, p) for g, p, _ in rows], [("0022400002", 0), ("0022400001", 1), ("0042400001", 2)])
+        self.assertEqual(self.query("SELECT key, row FROM superseded"),
+                         [('["Regular Season","0022400002"]', json.dumps(games[1]))])
+
+    def test_same_write_changes_nothing(self):
+        self.write("game_log.json", GAME_LOG)
+        fetched = self.query("SELECT game_id, fetched_at FROM games")
+        self.write("game_log.json", GAME_LOG)
+        self.assertEqual(self.query("SELECT game_id, fetched_at FROM games"), fetched)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM superseded"), [(0,)])
+
+    def test_partial_season_write(self):
+        # A --seasons 2025-26 run writes that season only; 2024-25 stays in the store and the file.
+        self.write("game_log.json", GAME_LOG)
+        fresh = [game("2025-26", "0022500001", 17), game("2025-26", "0022500002", 21)]
+        self.assertEqual(self.write("game_log.json", {"games": fresh}), {"games": GAME_LOG["games"][:3] + fresh})
+        self.write("general_splits.json", SPLITS)
+        self.assertEqual(self.write("general_splits.json", {"2024-25": {"home": {"PTS": 9.5}}}),
+                         {"2025-26": SPLITS["2025-26"], "2024-25": {"home": {"PTS": 9.5}}})
+
+    def test_written_season_drops_missing_rows(self):
+        self.write("shot_chart.json", SHOT_CHART)
+        kept = SHOT_CHART["shots"][:1]
+        self.assertEqual(self.write("shot_chart.json", {"shots": kept}), {"shots": kept + SHOT_CHART["shots"][2:]})
+        self.assertEqual(self.query("SELECT tbl, key FROM superseded"), [("shots", '["0022400001","19"]')])
+
+    def test_rows_without_key(self):
+        shots = [{"SEASON": "2024-25", "GAME_ID": "1", "LOC_X": x} for x in (3, 3, 5)]
+        self.assertEqual(self.write("shot_chart.json", {"shots": shots}), {"shots": shots})
+        self.assertEqual(self.query("SELECT event_id FROM shots ORDER BY pos"), [("",), ("#2",), ("#3",)])
+
+    def test_source_replaces_file(self):
+        self.write("game_log.json", GAME_LOG)
+        bbref = {"games": [game("2025-26", "1", 15)]}
+        self.assertEqual(self.write("game_log.json", bbref, BBREF), bbref)
+        self.assertIsNone(self.store.data("game_log.json", source=NBA["source"]))
+        self.assertEqual(self.query("SELECT COUNT(*) FROM superseded WHERE tbl = 'games'"), [(4,)])
+
+    def test_dropped_part(self):
+        self.write("on_off_jokic.json", ON_OFF)
+        self.assertEqual(self.write("on_off_jokic.json", {"on_off": ON_OFF["on_off"]}), {"on_off": ON_OFF["on_off"]})
+        self.assertEqual(self.query("SELECT COUNT(*) FROM on_off WHERE path = '[\"lineup_pairs\"]'"), [(0,)])
+
+    def test_seeds_from_export(self):
+        with open(os.path.join(self.dir.name, "game_log.json"), "w") as f:
+            json.dump({"meta": NBA, "data": GAME_LOG}, f)
+        self.assertEqual(exported(self.store.data("game_log.json")), GAME_LOG)
+
+    def test_old_layout_is_rebuilt(self):
+        self.store.close()
+        path = os.path.join(self.dir.name, "store.sqlite")
+        db = sqlite3.connect(path)
+        db.execute("PRAGMA user_version = 1")
+        db.execute("DROP TABLE games")
+        db.execute("CREATE TABLE games (file TEXT, path TEXT, season TEXT, pos INTEGER, row TEXT)")
+        db.commit()
+        db.close()
+        self.store = self.open()
+        self.assertEqual(self.write("game_log.json", GAME_LOG), GAME_LOG)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,7 @@ import type {
   CareerData,
   ShotChartData,
 } from '../types'
+import { decodeData, type OutputFile } from '../utils/columnar'
 
 import playerOverviewJson from '../../data/player_overview.json'
 import gameLogJson from '../../data/game_log.json'
@@ -19,9 +20,9 @@ import shotChartJson from '../../data/shot_chart.json'
 export const meta = playerOverviewJson.meta
 
 export const playerOverview = playerOverviewJson.data as unknown as PlayerOverviewData
-export const gameLog = gameLogJson.data as unknown as GameLogData
+export const gameLog = decodeData(gameLogJson as unknown as OutputFile) as unknown as GameLogData
 export const onOffJokic = onOffJson.data as unknown as OnOffJokicData
 export const generalSplits = generalSplitsJson.data as unknown as GeneralSplitsData
 export const shootingSplits = shootingSplitsJson.data as unknown as ShootingSplitsData
 export const career = careerJson.data as unknown as CareerData
-export const shotChart = shotChartJson.data as unknown as ShotChartData
+export const shotChart = decodeData(shotChartJson as unknown as OutputFile) as unknown as ShotChartData
@@ -218,6 +218,7 @@ export interface SeasonSplits {
   pre_post_allstar?: SplitRow[]
   starter_bench?: SplitRow[]
   days_rest?: SplitRow[]
+  opponent?: SplitRow[]
 }
 
 export type GeneralSplitsData = Record<string, SeasonSplits>
@@ -0,0 +1,83 @@
+// Decoder for the columnar output format (data/scripts/columnar.py).
+
+type Value = string | number | null
+
+type Column =
+  | { enc: 'const'; value: Value }
+  | { enc: 'plain'; values: Value[] }
+  | { enc: 'dict'; values: Value[]; codes: number[] }
+  | { enc: 'date'; format: '%Y-%m-%d' | '%Y%m%d'; values: number[] }
+  | { enc: 'delta'; width?: number; values: number[] }
+
+interface RowBlock {
+  length: number
+  columns: Record<string, Column>
+  absent?: Record<string, number[]>
+}
+
+export interface OutputFile {
+  meta: { format?: string; schema_version?: number }
+  data: Record<string, unknown>
+}
+
+const SCHEMA_VERSION = 1
+const UNIX_EPOCH_ORDINAL = 719163 // Python date(1970, 1, 1).toordinal()
+const DAY_MS = 86_400_000
+
+function undelta(deltas: number[]): number[] {
+  let total = 0
+  return deltas.map((d) => (total += d))
+}
+
+function formatOrdinal(ordinal: number, format: string): string {
+  const iso = new Date((ordinal - UNIX_EPOCH_ORDINAL) * DAY_MS).toISOString().slice(0, 10)
+  return format === '%Y%m%d' ? iso.replaceAll('-', '') : iso
+}
+
+function decodeColumn(col: Column, length: number): Value[] {
+  switch (col.enc) {
+    case 'const':
+      return Array(length).fill(col.value)
+    case 'plain':
+      return col.values
+    case 'dict':
+      return col.codes.map((c) => col.values[c])
+    case 'date':
+      return undelta(col.values).map((d) => formatOrdinal(d, col.format))
+    case 'delta': {
+      const nums = undelta(col.values)
+      const width = col.width
+      return width ? nums.map((n) => String(n).padStart(width, '0')) : nums
+    }
+  }
+}
+
+function decodeRows(block: RowBlock): Record<string, Value>[] {
+  const names = Object.keys(block.columns)
+  const cols = names.map((n) => decodeColumn(block.columns[n], block.length))
+  const absent = Object.fromEntries(
+    Object.entries(block.absent ?? {}).map(([n, idx]) => [n, new Set(idx)]),
+  )
+  return Array.from({ length: block.length }, (_, i) => {
+    const row: Record<string, Value> = {}
+    names.forEach((n, j) => {
+      if (!absent[n]?.has(i)) row[n] = cols[j][i]
+    })
+    return row
+  })
+}
+
+function isRowBlock(value: unknown): value is RowBlock {
+  return typeof value === 'object' && value !== null && 'columns' in value && 'length' in value
+}
+
+/** The `data` of an output file in row format, whichever format it was written in. */
+export function decodeData(file: OutputFile): Record<string, unknown> {
+  if (file.meta.format !== 'columnar') return file.data
+  if (file.meta.schema_version !== SCHEMA_VERSION) {
+    throw new Error(`Unsupported columnar schema version ${file.meta.schema_version}`)
+  }
+  return Object.fromEntries(
+    Object.entries(file.data).map(([k, v]) => [k, isRowBlock(v) ? decodeRows(v) : v]),
+  )
+}